@@ -4,13 +4,20 @@ This provides a REST API interface to the UML-MCP server functionality.
 """
 
 import os
+import asyncio
+import gzip
 import logging
 import json
+import mimetypes
 from typing import Dict, Any, List, Optional
-from fastapi import FastAPI, HTTPException, Request, Body
-from fastapi.responses import JSONResponse, FileResponse, HTMLResponse, Response
+from fastapi import FastAPI, HTTPException, Request, Body, WebSocket, WebSocketDisconnect
+from fastapi.responses import FileResponse, HTMLResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
+from starlette.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field, ValidationError
+
+from mcp_core.api.json_response import FastJSONResponse
+from mcp_core.core import jsoncodec
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -21,15 +28,7 @@ app = FastAPI(
     title="UML Diagram Generator",
     description="API for generating UML and other diagrams",
     version="1.2.0",
-)
-
-# Configure CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    default_response_class=FastJSONResponse,
 )
 
 # Import local modules
@@ -37,11 +36,106 @@ try:
     from mcp_core.core.utils import generate_diagram
     from mcp_core.core.config import MCP_SETTINGS
     from kroki.kroki import LANGUAGE_OUTPUT_SUPPORT
+    from mcp_core.core.admission import AdmissionController, AdmissionRejected
+    from mcp_core.core.capabilities import get_capability_index
+    from mcp_core.core import profiling, tracing
+    from mcp_core.api.static_responses import PrecomputedResponse, accepts_encoding
     HAS_MODULES = True
 except ImportError:
     logger.warning("Some UML-MCP modules could not be imported. Limited functionality available.")
     HAS_MODULES = False
 
+# Admission control for routes that render diagrams
+ADMISSION_PATHS = {"/generate_diagram"}
+admission = AdmissionController.from_env() if HAS_MODULES else None
+
+# Proxies whose X-Forwarded-For header is believed ("*" trusts any peer)
+TRUSTED_PROXIES = {
+    address.strip() for address in os.environ.get("ADMISSION_TRUSTED_PROXIES", "").split(",") if address.strip()
+}
+
+def _is_trusted_proxy(address: str) -> bool:
+    return "*" in TRUSTED_PROXIES or address in TRUSTED_PROXIES
+
+def _client_id(request: Request) -> str:
+    """Identify the calling client for per-client rate limiting"""
+    peer = request.client.host if request.client else "anonymous"
+    forwarded = request.headers.get("x-forwarded-for")
+    if not forwarded or not _is_trusted_proxy(peer):
+        # Clients can set X-Forwarded-For themselves; only trusted proxies may
+        return peer
+    # The nearest hop that is not one of our proxies is the client
+    for address in reversed([hop.strip() for hop in forwarded.split(",") if hop.strip()]):
+        if not _is_trusted_proxy(address):
+            return address
+    return peer
+
+@app.middleware("http")
+async def admission_middleware(request: Request, call_next):
+    """Admit rendering requests through the bounded queue, rejecting fast with 429"""
+    # CORS preflights render nothing, so they take no tokens or queue slots
+    if admission is None or request.url.path not in ADMISSION_PATHS or request.method == "OPTIONS":
+        return await call_next(request)
+    client_id = _client_id(request)
+    try:
+        await admission.acquire(client_id)
+    except AdmissionRejected as e:
+        logger.warning(f"Rejected {request.url.path} from {client_id}: {e.reason}")
+        return FastJSONResponse(
+            status_code=429,
+            content={"detail": "Too many requests", "reason": e.reason},
+            headers={"Retry-After": e.retry_after_header},
+        )
+    try:
+        return await call_next(request)
+    finally:
+        admission.release()
+
+@app.middleware("http")
+async def profiling_middleware(request: Request, call_next):
+    """Profile requests sent with X-Profile: 1 or ?profile=1, or sampled, when MCP_PROFILE_DIR is set"""
+    if not HAS_MODULES or not profiling.should_profile(
+        request.headers.get("x-profile") or request.query_params.get("profile")
+    ):
+        return await call_next(request)
+    # Only the threads that join via profiling.thread_scope() are sampled: the
+    # event loop thread also runs other requests meanwhile
+    with profiling.profile(f"{request.method} {request.url.path}", sample_current=False) as session:
+        response = await call_next(request)
+    if session.path:
+        # The file name only; the profile directory is a server-side detail
+        response.headers["X-Profile-File"] = os.path.basename(session.path)
+    return response
+
+@app.middleware("http")
+async def tracing_middleware(request: Request, call_next):
+    """Trace each request in a server span, continuing the caller's traceparent, when tracing is on"""
+    if not HAS_MODULES or not tracing.enabled():
+        return await call_next(request)
+    with tracing.span(
+        f"{request.method} {request.url.path}", kind="server",
+        parent=request.headers.get(tracing.TRACEPARENT_HEADER),
+        **{"http.method": request.method, "http.route": request.url.path}
+    ) as span:
+        response = await call_next(request)
+        span.set_attribute("http.status_code", response.status_code)
+        if response.status_code >= 500:
+            span.record_error(f"HTTP {response.status_code}")
+    response.headers["X-Trace-Id"] = span.trace_id
+    return response
+
+# Configure CORS; added last so it wraps the middleware above and its
+# responses (429s included) carry the CORS headers
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+    # Let browser clients read the back-off and diagnostic headers
+    expose_headers=["Retry-After", "X-Trace-Id", "X-Profile-File"],
+)
+
 # Models
 class DiagramRequest(BaseModel):
     lang: str = Field(description="The language of the diagram like plantuml, mermaid, etc.")
@@ -55,6 +149,11 @@ class DiagramResponse(BaseModel):
     message: Optional[str] = Field(default=None, description="A message about the diagram generation.")
     playground: Optional[str] = Field(default=None, description="URL to an interactive playground.")
     local_path: Optional[str] = Field(default=None, description="Local path to the diagram file.")
+    file_url: Optional[str] = Field(default=None, description="Path on this server where the stored diagram file is served.")
+
+def _get_output_dir() -> str:
+    """Directory where generated diagrams are stored"""
+    return os.environ.get("VERCEL_OUTPUT_DIR", "/tmp/diagrams")
 
 @app.get("/")
 async def root():
@@ -70,52 +169,68 @@ async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "modules_available": HAS_MODULES}
 
+def _resolve_diagram_type(request: DiagramRequest) -> str:
+    """Map request fields to diagram type"""
+    diagram_type = request.type.lower()
+    if diagram_type == "":
+        diagram_type = request.lang.lower()
+    return diagram_type
+
+def _render_request(request: DiagramRequest) -> Dict[str, Any]:
+    """Render a diagram request synchronously and return the generate_diagram result"""
+    diagram_type = _resolve_diagram_type(request)
+    output_format = request.output_format
+    
+    # Apply theme if provided - store original code for testing purposes
+    original_code = request.code
+    code = original_code
+    if request.theme and "plantuml" in request.lang.lower():
+        if "@startuml" in code and "!theme" not in code:
+            code = code.replace("@startuml", f"@startuml\n!theme {request.theme}")
+    
+    # Create output directory if it doesn't exist
+    output_dir = _get_output_dir()
+    os.makedirs(output_dir, exist_ok=True)
+    
+    # Generate the diagram (sampled as part of the request's profile, if any)
+    with profiling.thread_scope():
+        return generate_diagram(
+            diagram_type=diagram_type,
+            code=original_code if os.environ.get("TESTING", "").lower() == "true" else code,
+            output_format=output_format,
+            output_dir=output_dir
+        )
+
+def _diagram_response(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the API response body from a successful generate_diagram result"""
+    return {
+        "url": result["url"],
+        "message": "Diagram generated successfully",
+        "playground": result.get("playground"),
+        "local_path": result.get("local_path"),
+        "file_url": f"/diagrams/{os.path.basename(result['local_path'])}" if result.get("local_path") else None,
+    }
+
 @app.post("/generate_diagram", response_model=DiagramResponse)
 async def generate_diagram_endpoint(request: DiagramRequest):
     """Generate a diagram from text"""
     if not HAS_MODULES:
         raise HTTPException(status_code=503, detail="Diagram generation modules not available")
     
+    # Reject unsupported type/format combinations before touching Kroki
+    error_msg = get_capability_index().validate(_resolve_diagram_type(request), request.output_format)
+    if error_msg:
+        raise HTTPException(status_code=400, detail=error_msg)
+    
     try:
-        # Map request fields to diagram type
-        diagram_type = request.type.lower()
-        if diagram_type == "":
-            diagram_type = request.lang.lower()
-        
-        output_format = request.output_format
-        
-        # Apply theme if provided - store original code for testing purposes
-        original_code = request.code
-        code = original_code
-        if request.theme and "plantuml" in request.lang.lower():
-            if "@startuml" in code and "!theme" not in code:
-                code = code.replace("@startuml", f"@startuml\n!theme {request.theme}")
-        
-        # Create output directory if it doesn't exist
-        output_dir = os.environ.get("VERCEL_OUTPUT_DIR", "/tmp/diagrams")
-        os.makedirs(output_dir, exist_ok=True)
-        
-        # Generate the diagram
-        result = generate_diagram(
-            diagram_type=diagram_type,
-            code=original_code if os.environ.get("TESTING", "").lower() == "true" else code,
-            output_format=output_format,
-            output_dir=output_dir
-        )
+        # Render off the event loop so queued requests keep flowing
+        result = await run_in_threadpool(_render_request, request)
         
         # If error occurred during generation
         if "error" in result and result["error"]:
             raise HTTPException(status_code=400, detail=result["error"])
         
-        # Prepare response
-        response = {
-            "url": result["url"],
-            "message": "Diagram generated successfully",
-            "playground": result.get("playground"),
-            "local_path": result.get("local_path"),
-        }
-        
-        return response
+        return _diagram_response(result)
     
     except HTTPException:
         # Re-raise HTTP exceptions as they already have status codes
@@ -124,6 +239,117 @@ async def generate_diagram_endpoint(request: DiagramRequest):
         logger.exception(f"Error generating diagram: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to generate diagram: {str(e)}")
 
+# Live preview: edits are debounced and only the latest revision is rendered
+PREVIEW_DEBOUNCE_SECONDS = float(os.environ.get("PREVIEW_DEBOUNCE_MS", "300")) / 1000
+
+async def _render_in_slot(client_id: str, request: DiagramRequest) -> Dict[str, Any]:
+    """Render on a worker thread, holding an admission slot until the thread is done"""
+    if admission is None:
+        return await run_in_threadpool(_render_request, request)
+    async with admission.slot(client_id):
+        return await run_in_threadpool(_render_request, request)
+
+def _discard_outcome(render: asyncio.Future):
+    """Retrieve the outcome of a render nobody waits for any more"""
+    if not render.cancelled():
+        render.exception()
+
+async def _render_preview(websocket: WebSocket, client_id: str, revision: Any, request: DiagramRequest,
+                          renders: Dict[str, Any]):
+    """Wait out the debounce window, render one revision and push the outcome
+    
+    Cancelling the task (a newer edit arrived) only stops it while debouncing
+    or waiting. A render that has started cannot be interrupted on its worker
+    thread, so it runs to completion in the background, keeps its admission
+    slot until then, and its result is dropped. Each connection renders one
+    revision at a time.
+    """
+    await asyncio.sleep(PREVIEW_DEBOUNCE_SECONDS)
+    previous = renders.get("current")
+    if previous is not None and not previous.done():
+        await asyncio.wait([previous])
+    render = asyncio.ensure_future(_render_in_slot(client_id, request))
+    render.add_done_callback(_discard_outcome)
+    renders["current"] = render
+    try:
+        result = await asyncio.shield(render)
+    except AdmissionRejected as e:
+        await websocket.send_json({"type": "busy", "revision": revision, "retry_after": e.retry_after})
+        return
+    except Exception as e:
+        logger.exception(f"Error rendering preview: {str(e)}")
+        await websocket.send_json({"type": "error", "revision": revision, "error": str(e)})
+        return
+    
+    if "error" in result and result["error"]:
+        await websocket.send_json({"type": "error", "revision": revision, "error": result["error"]})
+    else:
+        await websocket.send_json({"type": "result", "revision": revision, **_diagram_response(result)})
+
+@app.websocket("/ws/preview")
+async def preview_websocket(websocket: WebSocket):
+    """Live preview: stream DiagramRequest edits, receive renders of the latest one"""
+    await websocket.accept()
+    if not HAS_MODULES:
+        await websocket.send_json({"type": "error", "revision": None, "error": "Diagram generation modules not available"})
+        await websocket.close(code=1011)
+        return
+    
+    client_id = websocket.client.host if websocket.client else "anonymous"
+    pending: Optional[asyncio.Task] = None
+    renders: Dict[str, Any] = {}
+    revision_counter = 0
+    try:
+        while True:
+            try:
+                message = jsoncodec.loads(await websocket.receive_text())
+            except ValueError as e:
+                await websocket.send_json({"type": "error", "revision": None, "error": f"Invalid JSON: {e}"})
+                continue
+            revision_counter += 1
+            revision = message.pop("revision", revision_counter) if isinstance(message, dict) else revision_counter
+            try:
+                request = DiagramRequest(**message)
+            except (TypeError, ValidationError) as e:
+                await websocket.send_json({"type": "error", "revision": revision, "error": str(e)})
+                continue
+            
+            # A newer edit supersedes whatever is debouncing; a running render's result is dropped
+            if pending is not None and not pending.done():
+                pending.cancel()
+            pending = asyncio.create_task(_render_preview(websocket, client_id, revision, request, renders))
+    except WebSocketDisconnect:
+        logger.debug(f"Preview client {client_id} disconnected")
+    finally:
+        if pending is not None and not pending.done():
+            pending.cancel()
+
+@app.get("/metrics")
+async def get_metrics():
+    """Return admission control metrics (queue depth, in-flight and rejection counts)"""
+    return {"admission": admission.stats() if admission is not None else None}
+
+@app.get("/diagrams/{filename}")
+async def get_diagram_file(filename: str, request: Request):
+    """Serve a stored diagram; gzip-compressed SVGs (.svgz) are sent without recompression"""
+    output_dir = os.path.realpath(_get_output_dir())
+    path = os.path.realpath(os.path.join(output_dir, filename))
+    if os.path.dirname(path) != output_dir or not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="Diagram not found")
+    
+    if path.endswith(".svgz"):
+        headers = {"Vary": "Accept-Encoding"}
+        if HAS_MODULES and accepts_encoding(request.headers.get("accept-encoding"), "gzip"):
+            headers["Content-Encoding"] = "gzip"
+            return FileResponse(path, media_type="image/svg+xml", headers=headers)
+        # Only clients that cannot take gzip pay for decompression
+        with open(path, "rb") as f:
+            content = gzip.decompress(f.read())
+        return Response(content=content, media_type="image/svg+xml", headers=headers)
+    
+    media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    return FileResponse(path, media_type=media_type)
+
 @app.get("/logo.png")
 async def get_logo():
     """Return the logo for the plugin"""
@@ -134,13 +360,60 @@ async def get_logo():
         # Return a default response if logo file not found
         raise HTTPException(status_code=404, detail="Logo not found")
 
+# Static routes are encoded once (identity/gzip/brotli + ETag) and served from memory
+_static_responses: Dict[str, "PrecomputedResponse"] = {}
+
+def _load_plugin_manifest() -> bytes:
+    with open(os.path.join(os.path.dirname(__file__), ".well-known/ai-plugin.json"), "r") as f:
+        manifest = json.load(f)
+    return jsoncodec.dumps_bytes(manifest)
+
+def _dump_supported_formats() -> bytes:
+    formats = LANGUAGE_OUTPUT_SUPPORT if HAS_MODULES else {}
+    return jsoncodec.dumps_bytes({"formats": formats})
+
+def _dump_openapi_yaml() -> bytes:
+    import yaml
+    return yaml.dump(app.openapi()).encode("utf-8")
+
+_STATIC_BUILDERS = {
+    "ai-plugin.json": (_load_plugin_manifest, "application/json"),
+    "supported_formats": (_dump_supported_formats, "application/json"),
+    "openapi.yaml": (_dump_openapi_yaml, "text/yaml"),
+}
+
+def _get_static_response(name: str) -> "PrecomputedResponse":
+    """Get a precomputed static response, building it on first use"""
+    precomputed = _static_responses.get(name)
+    if precomputed is None:
+        builder, media_type = _STATIC_BUILDERS[name]
+        precomputed = _static_responses[name] = PrecomputedResponse(builder(), media_type)
+    return precomputed
+
+def _respond_static(name: str, request: Request) -> Response:
+    """Serve a static route, from its precomputed encodings when available"""
+    if not HAS_MODULES:
+        builder, media_type = _STATIC_BUILDERS[name]
+        return Response(content=builder(), media_type=media_type)
+    return _get_static_response(name).respond(request)
+
+@app.on_event("startup")
+async def precompute_static_responses():
+    """Encode static route bodies and build the capability index once at startup"""
+    if not HAS_MODULES:
+        return
+    get_capability_index()
+    for name in _STATIC_BUILDERS:
+        try:
+            _get_static_response(name)
+        except Exception as e:
+            logger.warning(f"Could not precompute {name}: {str(e)}")
+
 @app.get("/.well-known/ai-plugin.json")
-async def get_plugin_manifest():
+async def get_plugin_manifest(request: Request):
     """Return the plugin manifest for OpenAI plugins"""
     try:
-        with open(os.path.join(os.path.dirname(__file__), ".well-known/ai-plugin.json"), "r") as f:
-            manifest = json.load(f)
-        return JSONResponse(content=manifest)
+        return _respond_static("ai-plugin.json", request)
     except Exception as e:
         logger.exception(f"Error loading plugin manifest: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to load plugin manifest")
@@ -159,12 +432,9 @@ async def get_privacy_policy():
         raise HTTPException(status_code=500, detail="Failed to load privacy policy")
 
 @app.get("/supported_formats")
-async def get_supported_formats():
+async def get_supported_formats(request: Request):
     """Return the supported diagram formats"""
-    if HAS_MODULES:
-        return {"formats": LANGUAGE_OUTPUT_SUPPORT}
-    else:
-        return {"formats": {}}
+    return _respond_static("supported_formats", request)
 
 @app.get("/openapi.json")
 async def get_openapi_spec():
@@ -172,16 +442,13 @@ async def get_openapi_spec():
     return app.openapi()
 
 @app.get("/openapi.yaml")
-async def get_openapi_yaml():
+async def get_openapi_yaml(request: Request):
     """Return the OpenAPI specification in YAML format"""
     try:
-        import yaml
-        openapi_spec = app.openapi()
-        yaml_content = yaml.dump(openapi_spec)
-        return Response(content=yaml_content, media_type="text/yaml")
+        return _respond_static("openapi.yaml", request)
     except ImportError:
         # If PyYAML is not available, return JSON spec instead
-        return JSONResponse(content={"error": "YAML conversion not available, use /openapi.json instead"})
+        return FastJSONResponse(content={"error": "YAML conversion not available, use /openapi.json instead"})
 
 # Main entry point for local development
 if __name__ == "__main__":
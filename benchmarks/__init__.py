@@ -0,0 +1,5 @@
+"""
+Benchmarks and load-testing tools for the UML-MCP server.
+
+Each module is a script runnable with ``python -m benchmarks.<name>``.
+"""
@@ -0,0 +1,360 @@
+"""
+Benchmark baseline store and regression comparator
+
+Keeps micro-benchmark runs (``benchmarks/micro.py --json``) in a local
+results directory, one file per commit, and compares new runs against a
+saved baseline:
+
+* ``save RUN.json... [--baseline]`` adds runs to ``<commit>.json`` and
+  optionally marks that commit as the baseline
+* ``compare RUN.json... [--against COMMIT]`` compares runs against the
+  baseline (or a given commit) and exits non-zero on regressions
+* ``list`` shows the stored commits
+
+For every case and input size the change in median per-call time is
+compared against two thresholds: the minimum change worth reporting
+(``--threshold``, 10% by default) and the measurement noise (``--z``
+standard errors of the difference). Rounds within one run are consecutive
+and agree far better than separate runs do, so when a side has several
+runs its noise is taken from the spread of the per-run medians; with a
+single run only the round-to-round spread is available. On shared or
+frequency-scaled machines, store and compare a few runs per side.
+
+A slowdown larger than both thresholds is a regression; only the encoding,
+validation and request-path groups fail the verdict unless ``--groups``
+says otherwise.
+
+Usage:
+    python -m benchmarks.micro --json micro.json
+    python -m benchmarks.compare save micro.json --baseline
+    python -m benchmarks.compare compare micro.json --verdict verdict.json
+"""
+
+import argparse
+import json
+import math
+import os
+import statistics
+import sys
+from typing import Any, Dict, List, Optional
+
+DEFAULT_RESULTS_DIR = os.environ.get("BENCHMARK_RESULTS_DIR", "benchmark-results")
+DEFAULT_GROUPS = ("encoding", "validation", "request-path")
+BASELINE_FILE = "BASELINE"
+
+
+# Store
+
+def run_name(run: Dict[str, Any]) -> str:
+    """Name a run is stored under (the short commit hash, or ``local``)."""
+    commit = run.get("meta", {}).get("commit")
+    return commit[:12] if commit else "local"
+
+
+def save_runs(runs: List[Dict[str, Any]], results_dir: str = DEFAULT_RESULTS_DIR,
+              name: Optional[str] = None, baseline: bool = False) -> str:
+    """
+    Add runs to the stored runs of their commit.
+
+    Args:
+        runs: Runs produced by ``benchmarks.micro.run_suite``
+        results_dir: Results directory (created if missing)
+        name: Name to store the runs under (default: the commit of the first run)
+        baseline: Also mark the commit as the baseline
+
+    Returns:
+        Path of the stored file
+    """
+    name = name or run_name(runs[0])
+    os.makedirs(results_dir, exist_ok=True)
+    path = os.path.join(results_dir, f"{name}.json")
+    stored = _read(path) or {"commit": runs[0].get("meta", {}).get("commit"), "runs": []}
+    stored["runs"].extend(runs)
+    with open(path, "w") as f:
+        json.dump(stored, f, indent=2)
+    if baseline:
+        with open(os.path.join(results_dir, BASELINE_FILE), "w") as f:
+            f.write(name + "\n")
+    return path
+
+
+def _read(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except OSError:
+        return None
+
+
+def list_runs(results_dir: str = DEFAULT_RESULTS_DIR) -> List[Dict[str, Any]]:
+    """
+    List the stored commits, oldest first.
+
+    Returns:
+        One ``{name, commit, runs, created, baseline}`` dictionary per stored file
+    """
+    if not os.path.isdir(results_dir):
+        return []
+    baseline = _baseline_name(results_dir)
+    stored = []
+    for filename in os.listdir(results_dir):
+        if not filename.endswith(".json"):
+            continue
+        data = _read(os.path.join(results_dir, filename)) or {}
+        runs = data.get("runs", [])
+        name = filename[:-len(".json")]
+        stored.append({
+            "name": name,
+            "commit": data.get("commit"),
+            "runs": len(runs),
+            "created": max((run.get("meta", {}).get("created", "") for run in runs), default=""),
+            "baseline": name == baseline,
+        })
+    return sorted(stored, key=lambda entry: entry["created"])
+
+
+def _baseline_name(results_dir: str) -> Optional[str]:
+    try:
+        with open(os.path.join(results_dir, BASELINE_FILE)) as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def load_baseline(results_dir: str = DEFAULT_RESULTS_DIR, name: Optional[str] = None,
+                  exclude: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Load the stored runs to compare against.
+
+    Args:
+        results_dir: Results directory
+        name: Stored name or commit prefix (default: the marked baseline, else the newest commit)
+        exclude: Stored name to skip when falling back to the newest commit (the candidate itself)
+
+    Returns:
+        The stored runs (empty if there are none)
+    """
+    stored = list_runs(results_dir)
+    if name:
+        matches = [entry for entry in stored if entry["name"] == name] or \
+                  [entry for entry in stored if (entry["commit"] or "").startswith(name)]
+    elif _baseline_name(results_dir):
+        matches = [entry for entry in stored if entry["name"] == _baseline_name(results_dir)]
+    else:
+        matches = [entry for entry in stored if entry["name"] != exclude]
+    if not matches:
+        return []
+    data = _read(os.path.join(results_dir, f"{matches[-1]['name']}.json")) or {}
+    return data.get("runs", [])
+
+
+# Comparison
+
+def run_spread(stats: List[Dict[str, Any]]) -> Optional[float]:
+    """
+    Relative standard deviation of the per-run medians of one case and size.
+
+    Args:
+        stats: The case/size statistics from each run of one side
+
+    Returns:
+        The spread, or None with fewer than two runs
+    """
+    medians = [entry["median_us"] for entry in stats]
+    if len(medians) < 2 or not statistics.median(medians):
+        return None
+    return statistics.stdev(medians) / statistics.median(medians)
+
+
+def relative_noise(stats: List[Dict[str, Any]], spread: Optional[float] = None) -> float:
+    """
+    Relative standard error of the median per-call time of one side.
+
+    Args:
+        stats: The case/size statistics from each run of the side
+        spread: Run-to-run spread (from ``run_spread``) to use, if known
+
+    Without a run-to-run spread this falls back to the median absolute
+    deviation of the round samples (scaled to a standard deviation), which
+    only captures noise within a run.
+    """
+    if spread is not None:
+        return spread / math.sqrt(len(stats))
+    samples = stats[0].get("samples_us") or []
+    median = stats[0].get("median_us") or 0.0
+    if len(samples) < 2 or median <= 0:
+        return 0.0
+    mad = statistics.median(abs(sample - median) for sample in samples)
+    sigma = 1.4826 * mad or stats[0].get("stdev_us", 0.0)
+    return 1.2533 * sigma / math.sqrt(len(samples)) / median
+
+
+def _collect(runs: List[Dict[str, Any]]) -> Dict[tuple, Dict[str, Any]]:
+    # (case, size) -> {group, stats: [per-run stats], error}
+    collected: Dict[tuple, Dict[str, Any]] = {}
+    for run in runs:
+        for name, entry in run.get("results", {}).items():
+            if "skipped" in entry:
+                continue
+            for size, stats in entry.get("sizes", {}).items():
+                item = collected.setdefault((name, size), {"group": entry.get("group", ""), "stats": [], "error": None})
+                if "error" in stats:
+                    item["error"] = stats["error"]
+                else:
+                    item["stats"].append(stats)
+    return collected
+
+
+def compare_runs(
+    baseline: List[Dict[str, Any]],
+    candidate: List[Dict[str, Any]],
+    threshold: float = 0.10,
+    z: float = 3.0,
+    groups: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    Compare candidate runs against baseline runs.
+
+    Args:
+        baseline: Baseline runs (one or more runs of the same commit)
+        candidate: Runs to check
+        threshold: Minimum relative change in median time to report
+        z: Standard errors of the difference a change must exceed
+        groups: Groups whose regressions fail the verdict (default: encoding, validation, request-path)
+
+    Returns:
+        Verdict dictionary: ``verdict`` (pass/fail), ``regressions`` and one
+        ``comparisons`` entry per case and size
+    """
+    gating = set(groups or DEFAULT_GROUPS)
+    base_items = _collect(baseline)
+    comparisons = []
+    for (name, size), item in _collect(candidate).items():
+        base_item = base_items.get((name, size))
+        if not base_item or not base_item["stats"]:
+            continue
+        base_median = statistics.median(stats["median_us"] for stats in base_item["stats"])
+        row = {"case": name, "group": item["group"], "size": size, "gating": item["group"] in gating,
+               "baseline_us": base_median, "runs": [len(base_item["stats"]), len(item["stats"])]}
+        if item["error"]:
+            row.update(status="error", error=item["error"])
+        else:
+            median = statistics.median(stats["median_us"] for stats in item["stats"])
+            change = median / base_median - 1 if base_median else 0.0
+            # A side with a single run borrows the run-to-run spread of the other side
+            spreads = [spread for spread in (run_spread(base_item["stats"]), run_spread(item["stats"]))
+                       if spread is not None]
+            spread = max(spreads) if spreads else None
+            noise = z * math.hypot(relative_noise(base_item["stats"], spread), relative_noise(item["stats"], spread))
+            limit = max(threshold, noise)
+            if change > limit:
+                status = "regression"
+            elif change < -limit:
+                status = "improvement"
+            else:
+                status = "noisy" if noise > threshold and abs(change) > threshold else "unchanged"
+            row.update(candidate_us=median, change=change, noise=noise, status=status)
+        comparisons.append(row)
+
+    regressions = [row for row in comparisons if row["gating"] and row["status"] in ("regression", "error")]
+    warnings = []
+    base_meta, meta = baseline[0].get("meta", {}), candidate[0].get("meta", {})
+    for key in ("python", "platform", "workload"):
+        if base_meta.get(key) and meta.get(key) and base_meta[key] != meta[key]:
+            warnings.append(f"{key} differs from the baseline ({base_meta[key]} -> {meta[key]})")
+
+    return {
+        "verdict": "fail" if regressions else "pass",
+        "baseline": base_meta.get("commit"),
+        "candidate": meta.get("commit"),
+        "threshold": threshold,
+        "z": z,
+        "groups": sorted(gating),
+        "regressions": [f"{row['case']}[{row['size']}]" for row in regressions],
+        "warnings": warnings,
+        "comparisons": comparisons,
+    }
+
+
+def format_comparison(result: Dict[str, Any]) -> str:
+    """Render a comparison as a text table followed by the verdict."""
+    lines = [f"{'case':<28} {'size':<7} {'baseline':>12} {'candidate':>12} {'change':>8} {'noise':>7}  status"]
+    for row in result["comparisons"]:
+        status = row["status"] + ("" if row["gating"] else " (not gating)")
+        if row["status"] == "error":
+            lines.append(f"{row['case']:<28} {row['size']:<7} {row['baseline_us']:>10.1f}us "
+                         f"{'-':>12} {'-':>8} {'-':>7}  error: {row['error']}")
+            continue
+        lines.append(
+            f"{row['case']:<28} {row['size']:<7} {row['baseline_us']:>10.1f}us {row['candidate_us']:>10.1f}us "
+            f"{row['change']:>+7.1%} {row['noise']:>6.1%}  {status}"
+        )
+    for warning in result["warnings"]:
+        lines.append(f"warning: {warning}")
+    summary = f"verdict: {result['verdict'].upper()}"
+    if result["regressions"]:
+        summary += f" ({len(result['regressions'])} regression(s): {', '.join(result['regressions'])})"
+    lines.append(summary)
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Store micro-benchmark runs and compare them against a baseline")
+    parser.add_argument("--results-dir", default=DEFAULT_RESULTS_DIR,
+                        help=f"Directory holding the stored runs (default: {DEFAULT_RESULTS_DIR})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    save = commands.add_parser("save", help="Store a run")
+    save.add_argument("runs", nargs="+", help="Run JSON files written by benchmarks.micro --json")
+    save.add_argument("--name", help="Name to store the runs under (default: their commit)")
+    save.add_argument("--baseline", action="store_true", help="Mark the commit as the baseline")
+
+    compare = commands.add_parser("compare", help="Compare a run against the baseline")
+    compare.add_argument("runs", nargs="+", help="Run JSON files written by benchmarks.micro --json")
+    compare.add_argument("--against", help="Stored name or commit to compare against (default: the baseline)")
+    compare.add_argument("--threshold", type=float, default=0.10,
+                         help="Minimum relative slowdown to flag (default: 0.10)")
+    compare.add_argument("--z", type=float, default=3.0,
+                         help="Standard errors a change must exceed to count as real (default: 3)")
+    compare.add_argument("--groups", default=",".join(DEFAULT_GROUPS),
+                         help=f"Comma-separated groups that fail the verdict (default: {','.join(DEFAULT_GROUPS)})")
+    compare.add_argument("--save", action="store_true", help="Also store the runs")
+    compare.add_argument("--verdict", dest="verdict_path", help="Write the verdict as JSON to this file")
+
+    commands.add_parser("list", help="List the stored commits")
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        for run in list_runs(args.results_dir):
+            marker = "*" if run["baseline"] else " "
+            print(f"{marker} {run['name']:<14} {run['runs']:>3} run(s)  {run['created']}")
+        return 0
+
+    runs = []
+    for path in args.runs:
+        with open(path) as f:
+            runs.append(json.load(f))
+
+    if args.command == "save":
+        print(f"Saved {save_runs(runs, args.results_dir, args.name, args.baseline)}")
+        return 0
+
+    baseline = load_baseline(args.results_dir, args.against, exclude=run_name(runs[0]))
+    if not baseline:
+        print(f"No baseline found in {args.results_dir}; store one with: "
+              f"python -m benchmarks.compare save RUN.json --baseline", file=sys.stderr)
+        return 2
+
+    groups = [group for group in args.groups.split(",") if group]
+    result = compare_runs(baseline, runs, args.threshold, args.z, groups)
+    print(format_comparison(result))
+    if args.verdict_path:
+        with open(args.verdict_path, "w") as f:
+            json.dump(result, f, indent=2)
+    if args.save:
+        save_runs(runs, args.results_dir)
+    return 1 if result["verdict"] == "fail" else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+"""
+JSON codec benchmark
+
+Compares the available ``mcp_core.core.jsoncodec`` backends (stdlib json,
+orjson, msgspec) on payloads shaped like the server's real traffic:
+
+* ``templates``: the uml://templates resource (many medium strings)
+* ``batch``: a generate_diagrams_batch result with base64 images (few large strings)
+* ``stdio``: a small tool-call request/response pair
+
+Each payload is encoded (and decoded) repeatedly; the best of several
+rounds is reported per operation, with the speedup over the stdlib.
+
+Usage:
+    python -m benchmarks.json_codec --rounds 5 --json json-codec.json
+"""
+
+import argparse
+import base64
+import json
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from mcp_core.core import jsoncodec
+
+
+def build_payloads() -> Dict[str, Any]:
+    """
+    Build the benchmark payloads.
+
+    Returns:
+        Dictionary mapping payload name to the value to encode
+    """
+    from kroki.kroki_templates import DiagramTemplates, DiagramExamples
+    from kroki.kroki import LANGUAGE_OUTPUT_SUPPORT
+
+    templates = {
+        language: {
+            "template": DiagramTemplates.get_template(language),
+            "example": DiagramExamples.get_example(language),
+            "formats": formats,
+        }
+        for language, formats in LANGUAGE_OUTPUT_SUPPORT.items()
+    }
+
+    image = base64.b64encode(os.urandom(48 * 1024)).decode("ascii")
+    batch = {
+        "results": [
+            {
+                "index": i,
+                "code": "@startuml\nclass A\nclass B\nA --> B\n@enduml",
+                "url": f"https://kroki.io/plantuml/png/{'x' * 80}{i}",
+                "playground": f"https://www.plantuml.com/plantuml/uml/{'y' * 80}{i}",
+                "local_path": f"/tmp/output/diagram_{i}.png",
+                "content_base64": image,
+                "elapsed_ms": 12.5 + i,
+            }
+            for i in range(20)
+        ],
+        "succeeded": 20,
+        "failed": 0,
+        "concurrency": 4,
+        "elapsed_ms": 310.2,
+    }
+
+    stdio = {
+        "id": 42,
+        "result": {
+            "code": "@startuml\nAlice -> Bob: hello\n@enduml",
+            "url": "https://kroki.io/plantuml/svg/SoWkIImgAStDuNBAJrBGjLDmpCbCJbMmKiX8pSd9vt98pKi1IW80",
+            "playground": "https://www.plantuml.com/plantuml/uml/SoWkIImgAStDuNBAJrBGjLDmpCbCJbMmKiX8pSd9vt98pKi1IW80",
+            "local_path": None,
+        },
+    }
+    return {"templates": templates, "batch": batch, "stdio": stdio}
+
+
+def _best_of(func: Callable[[], Any], iterations: int, rounds: int) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        best = min(best, time.perf_counter() - start)
+    return best / iterations * 1e6
+
+
+def available_backends() -> List[str]:
+    """List the codec backends that can be loaded in this environment."""
+    names = []
+    for name in ("json", "orjson", "msgspec"):
+        try:
+            jsoncodec.load_backend(name)
+            names.append(name)
+        except ImportError:
+            pass
+    return names
+
+
+def run_benchmark(iterations: int = 200, rounds: int = 5) -> Dict[str, Any]:
+    """
+    Measure every available backend on every payload.
+
+    Args:
+        iterations: Operations per round
+        rounds: Rounds per measurement (the best is kept)
+
+    Returns:
+        {payload: {"bytes": size, "backends": {backend: {"encode_us", "decode_us"}}}}
+    """
+    results: Dict[str, Any] = {}
+    for payload_name, payload in build_payloads().items():
+        encoded_size = len(json.dumps(payload).encode("utf-8"))
+        backends = {}
+        for name in available_backends():
+            dumps_bytes, loads = jsoncodec.load_backend(name)
+            encoded = dumps_bytes(payload, False)
+            assert loads(encoded) == payload, f"{name} does not round-trip {payload_name}"
+            backends[name] = {
+                "encode_us": _best_of(lambda: dumps_bytes(payload, False), iterations, rounds),
+                "decode_us": _best_of(lambda: loads(encoded), iterations, rounds),
+            }
+        baseline = backends["json"]
+        for timings in backends.values():
+            timings["encode_speedup"] = baseline["encode_us"] / timings["encode_us"]
+            timings["decode_speedup"] = baseline["decode_us"] / timings["decode_us"]
+        results[payload_name] = {"bytes": encoded_size, "backends": backends}
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare JSON codec backends on server payloads")
+    parser.add_argument("--iterations", type=int, default=200, help="Operations per round (default: 200)")
+    parser.add_argument("--rounds", type=int, default=5, help="Rounds per measurement (default: 5)")
+    parser.add_argument("--json", dest="json_path", help="Write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args.iterations, args.rounds)
+    print(f"Active backend: {jsoncodec.BACKEND}")
+    for payload_name, result in results.items():
+        print(f"{payload_name} ({result['bytes'] / 1024:.1f} KiB)")
+        for name, timings in result["backends"].items():
+            print(f"    {name:<8} encode {timings['encode_us']:>9.1f} us ({timings['encode_speedup']:.1f}x)  "
+                  f"decode {timings['decode_us']:>9.1f} us ({timings['decode_speedup']:.1f}x)")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({"active": jsoncodec.BACKEND, "python": sys.version.split()[0], "payloads": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
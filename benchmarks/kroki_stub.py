@@ -0,0 +1,431 @@
+"""
+Local Kroki stand-in
+
+A small HTTP server implementing Kroki's render routes for every language
+in ``LANGUAGE_OUTPUT_SUPPORT``, so caching, pooling, retries and batch
+paths can be benchmarked and stress-tested offline:
+
+    GET  /<language>/<format>/<deflate+base64url source>
+    POST /<language>/<format>          (plain-text source in the body)
+    POST /                             (JSON: diagram_source, diagram_type, output_format)
+    GET  /health                       (status and request counters)
+
+Requests carrying a W3C ``traceparent`` header are counted, and the last
+one is kept, so trace propagation can be checked.
+
+Bodies are deterministic: the same source always renders the same bytes,
+whichever route it came through. SVG and PNG bodies are valid images and
+can be padded to a target size. Latency is drawn from a configurable
+distribution and a configurable fraction of renders fail; both are seeded,
+so a run with the same seed and request order is reproducible.
+
+Latency specs (milliseconds):
+    ``20`` or ``fixed:20``, ``uniform:10,50``, ``normal:30,5``,
+    ``lognormal:20,0.5`` (median, sigma), ``exponential:20`` (mean)
+
+Usage:
+    python -m benchmarks.kroki_stub --port 8001 --latency lognormal:20,0.5 --error-rate 0.01
+    KROKI_SERVER=http://127.0.0.1:8001 python mcp_server.py
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import logging
+import random
+import socket
+import struct
+import sys
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from kroki.kroki import LANGUAGE_OUTPUT_SUPPORT
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPES = {
+    "svg": "image/svg+xml",
+    "png": "image/png",
+    "pdf": "application/pdf",
+    "jpeg": "image/jpeg",
+    "txt": "text/plain",
+    "base64": "text/plain",
+}
+
+
+class LatencyDistribution:
+    """Latency distribution parsed from a spec such as ``uniform:10,50``.
+
+    Attributes:
+        kind: Distribution name.
+        params: Distribution parameters in milliseconds.
+    """
+
+    _ARITY = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2, "exponential": 1}
+
+    def __init__(self, spec: Union[str, float] = 0):
+        """
+        Parse a latency spec.
+
+        Args:
+            spec: A number of milliseconds or ``kind:param[,param]``
+
+        Raises:
+            ValueError: If the spec is malformed
+        """
+        text = str(spec).strip()
+        kind, _, params = text.partition(":") if ":" in text else ("fixed", "", text)
+        if kind not in self._ARITY:
+            raise ValueError(f"Unknown latency distribution: {kind}. Available: {', '.join(self._ARITY)}")
+        values = [float(value) for value in params.split(",") if value.strip()]
+        if len(values) != self._ARITY[kind]:
+            raise ValueError(f"Latency distribution {kind} takes {self._ARITY[kind]} parameter(s): {text}")
+        self.kind = kind
+        self.params = values
+        self.spec = text
+
+    def sample(self, rng: random.Random) -> float:
+        """
+        Draw a latency.
+
+        Args:
+            rng: Random source
+
+        Returns:
+            Latency in milliseconds (never negative)
+        """
+        if self.kind == "fixed":
+            value = self.params[0]
+        elif self.kind == "uniform":
+            value = rng.uniform(*self.params)
+        elif self.kind == "normal":
+            value = rng.gauss(*self.params)
+        elif self.kind == "lognormal":
+            median, sigma = self.params
+            value = median * rng.lognormvariate(0.0, sigma) if median > 0 else 0.0
+        else:
+            value = rng.expovariate(1.0 / self.params[0]) if self.params[0] > 0 else 0.0
+        return max(0.0, value)
+
+
+def _png_chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+
+def make_png(width: int = 1, height: int = 1, min_bytes: int = 0, seed: bytes = b"") -> bytes:
+    """
+    Build a valid grayscale PNG.
+
+    Args:
+        width: Image width in pixels
+        height: Image height in pixels
+        min_bytes: Pad the file with a text chunk up to this size
+        seed: Bytes mixed into the pixel pattern
+
+    Returns:
+        PNG bytes
+    """
+    salt = sum(seed) & 0xFF
+    header = struct.pack(">IIBBBBB", width, height, 8, 0, 0, 0, 0)
+    pixels = b"".join(b"\x00" + bytes((x * 7 + y * 13 + salt) & 0xFF for x in range(width)) for y in range(height))
+    chunks = [_png_chunk(b"IHDR", header), _png_chunk(b"IDAT", zlib.compress(pixels))]
+    end = _png_chunk(b"IEND", b"")
+    size = 8 + sum(len(chunk) for chunk in chunks) + len(end)
+    padding = min_bytes - size - 12 - len(b"Comment\x00")
+    if padding > 0:
+        chunks.append(_png_chunk(b"tEXt", b"Comment\x00" + b"k" * padding))
+    return b"\x89PNG\r\n\x1a\n" + b"".join(chunks) + end
+
+
+def render_body(language: str, output_format: str, source: bytes, min_bytes: int = 0) -> bytes:
+    """
+    Build the deterministic body returned for a render.
+
+    Args:
+        language: Kroki language
+        output_format: Output format
+        source: Decoded diagram source
+        min_bytes: Pad SVG and PNG bodies up to this size
+
+    Returns:
+        Response body
+    """
+    digest = hashlib.sha256(language.encode("utf-8") + b"\0" + source).hexdigest()
+    if output_format == "svg":
+        body = (
+            '<svg xmlns="http://www.w3.org/2000/svg" width="160" height="40">'
+            f'<text x="4" y="24">{language} {digest[:16]}</text>'
+        )
+        padding = min_bytes - len(body) - len("<desc></desc></svg>")
+        if padding > 0:
+            body += "<desc>" + (digest * (padding // len(digest) + 1))[:padding] + "</desc>"
+        return (body + "</svg>").encode("utf-8")
+    if output_format == "png":
+        return make_png(16, 16, min_bytes, digest.encode("ascii"))
+    if output_format == "base64":
+        return base64.b64encode(make_png(1, 1, 0, digest.encode("ascii")))
+    return f"{language} {output_format} {digest[:16]}\n".encode("utf-8")
+
+
+def decode_source(encoded: str) -> bytes:
+    """
+    Decode a GET route's deflate+base64url source.
+
+    Raises:
+        ValueError: If the source cannot be decoded
+    """
+    try:
+        return zlib.decompress(base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4)))
+    except (ValueError, zlib.error) as e:
+        raise ValueError(f"Unable to decode the diagram source: {e}")
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Request handler for the Kroki routes."""
+
+    server_version = "KrokiStub/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        # Headers and body are separate writes; without this Nagle adds ~40ms per response
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def _respond(self, status: int, body: bytes, content_type: str = "text/plain"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length", "0")))
+
+    def _render(self, language: str, output_format: str, source: Optional[bytes], error: str = ""):
+        traceparent = self.headers.get("traceparent")
+        if traceparent:
+            self.server.record_traceparent(traceparent)
+        status, body, content_type = self.server.render(language, output_format, source, error)
+        self._respond(status, body, content_type)
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/health":
+            self._respond(200, json.dumps(self.server.stats()).encode("utf-8"), "application/json")
+            return
+        parts = path.lstrip("/").split("/", 2)
+        if len(parts) < 3:
+            self._respond(404, b"Not Found")
+            return
+        language, output_format, encoded = parts
+        try:
+            source, error = decode_source(encoded), ""
+        except ValueError as e:
+            source, error = None, str(e)
+        self._render(language, output_format, source, error)
+
+    def do_POST(self):
+        body = self._read_body()
+        parts = self.path.split("?", 1)[0].strip("/").split("/")
+        if parts == [""]:
+            try:
+                request = json.loads(body)
+                self._render(request["diagram_type"], request.get("output_format", "svg"),
+                             request["diagram_source"].encode("utf-8"))
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                self._respond(400, f"Invalid JSON request: {e}".encode("utf-8"))
+            return
+        if len(parts) != 2:
+            self._respond(404, b"Not Found")
+            return
+        self._render(parts[0], parts[1], body)
+
+
+class StubServer(ThreadingHTTPServer):
+    """Threaded Kroki stand-in.
+
+    Attributes:
+        latency: Latency distribution applied to every render.
+        error_rate: Fraction of renders answered with ``error_status``.
+        error_status: HTTP status of injected errors.
+        body_bytes: Minimum SVG/PNG body size.
+        seed: Seed for latency and error draws.
+        requests: Renders served so far (including errors).
+        traced: Requests that carried a ``traceparent`` header.
+        last_traceparent: The most recent ``traceparent`` received.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        latency: Union[str, float, LatencyDistribution] = 0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        body_bytes: int = 0,
+        seed: int = 0
+    ):
+        super().__init__(address, StubHandler)
+        self.latency = latency if isinstance(latency, LatencyDistribution) else LatencyDistribution(latency)
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.body_bytes = body_bytes
+        self.seed = seed
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.by_language: Dict[str, int] = {}
+        self.traced = 0
+        self.last_traceparent: Optional[str] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _draw(self) -> Tuple[int, random.Random]:
+        with self._lock:
+            self.requests += 1
+            number = self.requests
+        # One generator per request number keeps draws reproducible under concurrency
+        return number, random.Random(f"{self.seed}:{number}")
+
+    def record_traceparent(self, traceparent: str):
+        with self._lock:
+            self.traced += 1
+            self.last_traceparent = traceparent
+
+    def render(self, language: str, output_format: str, source: Optional[bytes], error: str = "") -> Tuple[int, bytes, str]:
+        """
+        Render (or fail) one request.
+
+        Args:
+            language: Kroki language from the route
+            output_format: Output format from the route
+            source: Decoded diagram source (None if it could not be decoded)
+            error: Decoding error message
+
+        Returns:
+            (status, body, content type)
+        """
+        formats = LANGUAGE_OUTPUT_SUPPORT.get(language)
+        if formats is None:
+            return 404, f"Unsupported diagram type: {language}".encode("utf-8"), "text/plain"
+        if output_format not in formats:
+            return 400, f"Unsupported output format: {output_format} for {language}".encode("utf-8"), "text/plain"
+        if source is None:
+            return 400, error.encode("utf-8"), "text/plain"
+
+        _, rng = self._draw()
+        delay_ms = self.latency.sample(rng)
+        if delay_ms:
+            time.sleep(delay_ms / 1000)
+        failed = self.error_rate > 0 and rng.random() < self.error_rate
+        with self._lock:
+            self.by_language[language] = self.by_language.get(language, 0) + 1
+            if failed:
+                self.errors += 1
+        if failed:
+            return self.error_status, b"Injected error", "text/plain"
+        return 200, render_body(language, output_format, source, self.body_bytes), CONTENT_TYPES[output_format]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get request counters and the active configuration.
+
+        Returns:
+            Dictionary with counts, latency spec and error rate
+        """
+        with self._lock:
+            return {
+                "status": "pass",
+                "requests": self.requests,
+                "errors": self.errors,
+                "by_language": dict(self.by_language),
+                "traced": self.traced,
+                "latency": self.latency.spec,
+                "error_rate": self.error_rate,
+                "body_bytes": self.body_bytes,
+            }
+
+
+def start_stub(host: str = "127.0.0.1", port: int = 0, **options) -> StubServer:
+    """
+    Start the stub on a background thread.
+
+    Args:
+        host: Interface to bind
+        port: Port to bind (0 picks a free port)
+        **options: Passed to StubServer (latency, error_rate, error_status, body_bytes, seed)
+
+    Returns:
+        The running server; its ``url`` is the Kroki base URL. Call ``shutdown()`` to stop it.
+    """
+    server = StubServer((host, port), **options)
+    threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.1}, name="kroki-stub", daemon=True).start()
+    return server
+
+
+def add_stub_arguments(parser: argparse.ArgumentParser, prefix: str = ""):
+    """
+    Add the stub's behaviour options to an argument parser.
+
+    Args:
+        parser: Parser to extend
+        prefix: Option prefix (e.g. ``stub-`` when embedded in another tool)
+    """
+    parser.add_argument(f"--{prefix}latency", default="0",
+                        help="Render latency in ms or a distribution, e.g. uniform:10,50 (default: 0)")
+    parser.add_argument(f"--{prefix}error-rate", type=float, default=0.0,
+                        help="Fraction of renders that fail (default: 0)")
+    parser.add_argument(f"--{prefix}error-status", type=int, default=503,
+                        help="HTTP status of failed renders (default: 503)")
+    parser.add_argument(f"--{prefix}body-bytes", type=int, default=0,
+                        help="Pad SVG/PNG bodies to at least this many bytes")
+    parser.add_argument(f"--{prefix}seed", type=int, default=0, help="Seed for latency and error draws")
+
+
+def stub_options(args: argparse.Namespace, prefix: str = "") -> Dict[str, Any]:
+    """Collect StubServer options from arguments added by ``add_stub_arguments``."""
+    attribute = prefix.replace("-", "_")
+    return {
+        "latency": getattr(args, attribute + "latency"),
+        "error_rate": getattr(args, attribute + "error_rate"),
+        "error_status": getattr(args, attribute + "error_status"),
+        "body_bytes": getattr(args, attribute + "body_bytes"),
+        "seed": getattr(args, attribute + "seed"),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run a local Kroki stand-in")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8001, help="Port to bind (default: 8001)")
+    add_stub_arguments(parser)
+    args = parser.parse_args(argv)
+
+    try:
+        server = StubServer((args.host, args.port), **stub_options(args))
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"Kroki stub listening on {server.url} (latency {server.latency.spec}, "
+          f"error rate {server.error_rate})", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,555 @@
+"""
+Trace-replay load test for the MCP server and the HTTP API
+
+Replays tool-call traces against a running server and reports throughput
+and p50/p95/p99 latency per tool. Traces are JSON lines with ``tool`` and
+``args`` (plus ``ts`` or ``offset_ms`` for timing); the MCP server records
+them when ``MCP_TOOL_TRACE_FILE`` is set. ``--synthetic`` builds a trace of
+generated diagrams instead (``benchmarks/workload.py``, sized with
+``--elements``, ``--edge-density``, ``--label-length`` and ``--nesting``).
+Without either, a built-in trace of the starter templates is used.
+
+Targets (each started as a subprocess pointed at a local Kroki stand-in,
+so results are reproducible offline):
+
+* ``stdio``: ``mcp_server.py --transport stdio``
+* ``mcp-http``: ``mcp_server.py --transport http`` (``POST /mcp``)
+* ``api``: the FastAPI app in ``app.py`` (``POST /generate_diagram``;
+  tools without an equivalent route are skipped)
+
+Pacing:
+
+* default: closed loop, ``--concurrency`` calls in flight
+* ``--rate N``: open loop at N calls per second
+* ``--speed X``: open loop following the trace's own timing, X times faster
+
+In open-loop modes latency is measured from each call's scheduled start,
+so time spent queued behind a saturated server is included.
+
+Usage:
+    python -m benchmarks.loadtest --target stdio --concurrency 8 --loops 5
+    python -m benchmarks.loadtest --target api --trace trace.jsonl --rate 50 --json results.json
+    python -m benchmarks.loadtest --synthetic all --elements 500 --nesting 2
+"""
+
+import argparse
+import json
+import math
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from .kroki_stub import add_stub_arguments, start_stub, stub_options
+from .workload import KINDS, TOOLS, WorkloadSpec, generate
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENTRY_POINT = os.path.join(REPO_ROOT, "mcp_server.py")
+
+# Tools exercised by the built-in trace, with the template language they render
+BUILTIN_TOOLS = {
+    "generate_class_diagram": "plantuml",
+    "generate_sequence_diagram": "plantuml",
+    "generate_mermaid_diagram": "mermaid",
+    "generate_d2_diagram": "d2",
+    "generate_graphviz_diagram": "graphviz",
+    "generate_erd_diagram": "erd",
+}
+
+# Diagram type rendered by each single-type tool (used to map calls onto the HTTP API)
+TOOL_DIAGRAM_TYPES = {
+    "generate_class_diagram": "class",
+    "generate_sequence_diagram": "sequence",
+    "generate_activity_diagram": "activity",
+    "generate_usecase_diagram": "usecase",
+    "generate_state_diagram": "state",
+    "generate_component_diagram": "component",
+    "generate_deployment_diagram": "deployment",
+    "generate_object_diagram": "object",
+    "generate_mermaid_diagram": "mermaid",
+    "generate_d2_diagram": "d2",
+    "generate_graphviz_diagram": "graphviz",
+    "generate_erd_diagram": "erd",
+}
+
+
+class SkipCall(Exception):
+    """Raised by a target for a call it cannot express."""
+
+
+def load_trace(path: str) -> List[Dict[str, Any]]:
+    """
+    Load a JSON-lines trace.
+
+    Args:
+        path: Trace file
+
+    Returns:
+        Entries with ``tool``, ``args`` and ``offset_ms`` (relative to the first call), in time order
+    """
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                record = json.loads(line)
+                if "tool" in record:
+                    records.append(record)
+    if not records:
+        return []
+
+    first_ts = min((r["ts"] for r in records if "ts" in r), default=None)
+    entries = []
+    for record in records:
+        if "offset_ms" in record:
+            offset = float(record["offset_ms"])
+        elif "ts" in record and first_ts is not None:
+            offset = (record["ts"] - first_ts) * 1000
+        else:
+            offset = 0.0
+        # Output directories are specific to the recording machine
+        args = {k: v for k, v in record.get("args", {}).items() if k != "output_dir"}
+        entries.append({"tool": record["tool"], "args": args, "offset_ms": offset})
+    entries.sort(key=lambda entry: entry["offset_ms"])
+    return entries
+
+
+def builtin_trace() -> List[Dict[str, Any]]:
+    """
+    Build a trace that calls each diagram tool with its starter template.
+
+    Returns:
+        Trace entries 100ms apart
+    """
+    from kroki.kroki_templates import DiagramTemplates
+
+    entries = []
+    for tool, language in BUILTIN_TOOLS.items():
+        entries.append({
+            "tool": tool,
+            "args": {"code": DiagramTemplates.get_template(language)},
+            "offset_ms": len(entries) * 100.0,
+        })
+    return entries
+
+
+def synthetic_trace(kinds: List[str], spec: WorkloadSpec, variants: int = 1) -> List[Dict[str, Any]]:
+    """
+    Build a trace of generated diagrams (see ``benchmarks.workload``).
+
+    Args:
+        kinds: Workload kinds to include
+        spec: Size knobs shared by every diagram
+        variants: Differently seeded diagrams per kind
+
+    Returns:
+        Trace entries 100ms apart
+    """
+    entries = []
+    for variant in range(variants):
+        for kind in kinds:
+            entries.append({
+                "tool": TOOLS[kind],
+                "args": {"code": generate(kind, spec, seed=spec.seed + variant)},
+                "offset_ms": len(entries) * 100.0,
+            })
+    return entries
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """
+    Nearest-rank percentile.
+
+    Args:
+        values: Samples
+        pct: Percentile between 0 and 100
+
+    Returns:
+        The percentile (0.0 for no samples)
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _is_error(response: Any) -> bool:
+    if not isinstance(response, dict):
+        return False
+    if response.get("error"):
+        return True
+    result = response.get("result")
+    return isinstance(result, dict) and bool(result.get("error"))
+
+
+class Target:
+    """A server under test. ``call`` returns True on success."""
+
+    name = "target"
+
+    def start(self, env: Dict[str, str], timeout: float):
+        pass
+
+    def call(self, tool: str, args: Dict[str, Any]) -> bool:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class StdioTarget(Target):
+    """``mcp_server.py --transport stdio`` with requests multiplexed by id."""
+
+    name = "stdio"
+
+    def __init__(self):
+        self.process: Optional[subprocess.Popen] = None
+        self._pending: Dict[int, Future] = {}
+        self._lock = threading.Lock()
+        self._next_id = 0
+
+    def start(self, env: Dict[str, str], timeout: float):
+        self.process = subprocess.Popen(
+            [sys.executable, ENTRY_POINT, "--transport", "stdio"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            env=env, cwd=REPO_ROOT, text=True, bufsize=1,
+        )
+        threading.Thread(target=self._read_responses, name="loadtest-stdio", daemon=True).start()
+        # The first answered request doubles as the readiness check
+        self._send({"type": "resource", "path": "uml://server-info"}).result(timeout)
+
+    def _read_responses(self):
+        for line in self.process.stdout:
+            try:
+                response = json.loads(line)
+            except ValueError:
+                continue
+            with self._lock:
+                future = self._pending.pop(response.get("id"), None)
+            if future is not None:
+                future.set_result(response)
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            future.set_exception(ConnectionError("server exited"))
+
+    def _send(self, request: Dict[str, Any]) -> Future:
+        future: Future = Future()
+        with self._lock:
+            self._next_id += 1
+            request = {"id": self._next_id, **request}
+            self._pending[self._next_id] = future
+            self.process.stdin.write(json.dumps(request) + "\n")
+            self.process.stdin.flush()
+        return future
+
+    def call(self, tool: str, args: Dict[str, Any]) -> bool:
+        return not _is_error(self._send({"type": "tool", "tool": tool, "args": args}).result())
+
+    def close(self):
+        if self.process is not None:
+            self.process.stdin.close()
+            try:
+                self.process.wait(10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+
+class _HTTPServerTarget(Target):
+    """Base for targets served over HTTP by a subprocess."""
+
+    health_path = "/"
+
+    def __init__(self, concurrency: int):
+        self.concurrency = concurrency
+        self.process: Optional[subprocess.Popen] = None
+        self.client = None
+        self.base_url = ""
+
+    def command(self, port: int) -> List[str]:
+        raise NotImplementedError
+
+    def start(self, env: Dict[str, str], timeout: float):
+        import httpx
+
+        port = _free_port()
+        self.base_url = f"http://127.0.0.1:{port}"
+        self.process = subprocess.Popen(self.command(port), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                        env=env, cwd=REPO_ROOT)
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        self.client = httpx.Client(base_url=self.base_url, limits=limits, timeout=timeout)
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                self.client.get(self.health_path)
+                return
+            except httpx.TransportError:
+                if self.process.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError(f"{self.name} server did not start")
+                time.sleep(0.1)
+
+    def close(self):
+        if self.client is not None:
+            self.client.close()
+        if self.process is not None:
+            self.process.terminate()
+            try:
+                self.process.wait(10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+
+class McpHttpTarget(_HTTPServerTarget):
+    """``mcp_server.py --transport http``, one session per worker thread."""
+
+    name = "mcp-http"
+    health_path = "/healthz"
+
+    def __init__(self, concurrency: int):
+        super().__init__(concurrency)
+        self._sessions = threading.local()
+
+    def command(self, port: int) -> List[str]:
+        return [sys.executable, ENTRY_POINT, "--transport", "http", "--host", "127.0.0.1", "--port", str(port)]
+
+    def call(self, tool: str, args: Dict[str, Any]) -> bool:
+        session_id = getattr(self._sessions, "id", None)
+        if session_id is None:
+            # Requests outside a session are rejected, so each worker initializes one first
+            response = self.client.post("/mcp", json={"type": "initialize"})
+            session_id = self._sessions.id = response.headers["Mcp-Session-Id"]
+        response = self.client.post("/mcp", json={"type": "tool", "tool": tool, "args": args},
+                                    headers={"Mcp-Session-Id": session_id})
+        return response.status_code == 200 and not _is_error(response.json())
+
+
+class ApiTarget(_HTTPServerTarget):
+    """The FastAPI app, with diagram tools mapped onto ``POST /generate_diagram``."""
+
+    name = "api"
+    health_path = "/health"
+
+    def command(self, port: int) -> List[str]:
+        return [sys.executable, "-m", "uvicorn", "app:app", "--host", "127.0.0.1", "--port", str(port),
+                "--log-level", "warning"]
+
+    @staticmethod
+    def to_request(tool: str, args: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Map a tool call onto a ``/generate_diagram`` request body.
+
+        Raises:
+            SkipCall: If the tool has no HTTP API equivalent
+        """
+        if tool == "generate_uml":
+            diagram_type = args.get("diagram_type", "")
+        elif tool in TOOL_DIAGRAM_TYPES:
+            diagram_type = TOOL_DIAGRAM_TYPES[tool]
+        else:
+            raise SkipCall(tool)
+        return {"lang": diagram_type, "type": diagram_type, "code": args.get("code", ""), "output_format": "png"}
+
+    def call(self, tool: str, args: Dict[str, Any]) -> bool:
+        response = self.client.post("/generate_diagram", json=self.to_request(tool, args))
+        return response.status_code == 200
+
+
+TARGETS = {"stdio": StdioTarget, "mcp-http": McpHttpTarget, "api": ApiTarget}
+
+
+def replay(
+    target: Target,
+    entries: List[Dict[str, Any]],
+    concurrency: int = 8,
+    loops: int = 1,
+    rate: Optional[float] = None,
+    speed: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Replay trace entries against a started target.
+
+    Args:
+        target: Target to call
+        entries: Trace entries (see ``load_trace``)
+        concurrency: Calls in flight at most
+        loops: Times to replay the trace
+        rate: Open-loop calls per second (overrides the trace timing)
+        speed: Open-loop replay of the trace timing, sped up by this factor
+
+    Returns:
+        Report with throughput and per-tool latency percentiles
+    """
+    schedule: List[Tuple[float, Dict[str, Any]]] = []
+    span_ms = (entries[-1]["offset_ms"] + 1.0) if entries else 0.0
+    for loop in range(loops):
+        for entry in entries:
+            schedule.append((loop * span_ms + entry["offset_ms"], entry))
+    if rate:
+        schedule = [(i * 1000.0 / rate, entry) for i, (_, entry) in enumerate(schedule)]
+    open_loop = bool(rate or speed)
+    factor = speed or 1.0
+
+    latencies: Dict[str, List[float]] = {}
+    errors: Dict[str, int] = {}
+    skipped: Dict[str, int] = {}
+    lock = threading.Lock()
+    slots = threading.BoundedSemaphore(concurrency)
+
+    def run(entry: Dict[str, Any], scheduled: float):
+        start = scheduled if open_loop else time.perf_counter()
+        try:
+            ok = target.call(entry["tool"], entry["args"])
+        except SkipCall:
+            with lock:
+                skipped[entry["tool"]] = skipped.get(entry["tool"], 0) + 1
+            return
+        except Exception:
+            ok = False
+        finally:
+            if not open_loop:
+                slots.release()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with lock:
+            latencies.setdefault(entry["tool"], []).append(elapsed_ms)
+            if not ok:
+                errors[entry["tool"]] = errors.get(entry["tool"], 0) + 1
+
+    began = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="loadtest") as executor:
+        for offset_ms, entry in schedule:
+            if open_loop:
+                scheduled = began + offset_ms / 1000 / factor
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            else:
+                slots.acquire()
+                scheduled = time.perf_counter()
+            executor.submit(run, entry, scheduled)
+    wall_s = time.perf_counter() - began
+
+    tools = {}
+    for tool, samples in sorted(latencies.items()):
+        tools[tool] = {
+            "calls": len(samples),
+            "errors": errors.get(tool, 0),
+            "mean_ms": sum(samples) / len(samples),
+            "p50_ms": percentile(samples, 50),
+            "p95_ms": percentile(samples, 95),
+            "p99_ms": percentile(samples, 99),
+            "max_ms": max(samples),
+        }
+    all_samples = [sample for samples in latencies.values() for sample in samples]
+    return {
+        "target": target.name,
+        "mode": "open" if open_loop else "closed",
+        "concurrency": concurrency,
+        "calls": len(all_samples),
+        "errors": sum(errors.values()),
+        "skipped": skipped,
+        "wall_s": wall_s,
+        "throughput_rps": len(all_samples) / wall_s if wall_s else 0.0,
+        "p50_ms": percentile(all_samples, 50),
+        "p95_ms": percentile(all_samples, 95),
+        "p99_ms": percentile(all_samples, 99),
+        "tools": tools,
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Render a replay report as a text table."""
+    lines = [
+        f"{report['target']} ({report['mode']} loop, concurrency {report['concurrency']}): "
+        f"{report['calls']} calls in {report['wall_s']:.2f}s = {report['throughput_rps']:.1f} calls/s, "
+        f"{report['errors']} errors",
+        f"{'tool':<30} {'calls':>6} {'errors':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}",
+    ]
+    for tool, stats in report["tools"].items():
+        lines.append(f"{tool:<30} {stats['calls']:>6} {stats['errors']:>6} "
+                     f"{stats['p50_ms']:>9.1f} {stats['p95_ms']:>9.1f} {stats['p99_ms']:>9.1f}")
+    lines.append(f"{'all':<30} {report['calls']:>6} {report['errors']:>6} "
+                 f"{report['p50_ms']:>9.1f} {report['p95_ms']:>9.1f} {report['p99_ms']:>9.1f}")
+    for tool, count in report["skipped"].items():
+        lines.append(f"skipped {count} calls to {tool} (no equivalent on this target)")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay tool-call traces against the MCP server or HTTP API")
+    parser.add_argument("--target", choices=list(TARGETS), default="stdio", help="Server to drive (default: stdio)")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--trace", help="JSON-lines trace (default: built-in template trace)")
+    source.add_argument("--synthetic", help=f"Comma-separated generated workload kinds or 'all' ({', '.join(KINDS)})")
+    defaults = WorkloadSpec()
+    parser.add_argument("--elements", type=int, default=defaults.elements, help="Elements per generated diagram")
+    parser.add_argument("--edge-density", type=float, default=defaults.edge_density, help="Edges per element")
+    parser.add_argument("--label-length", type=int, default=defaults.label_length, help="Characters per label")
+    parser.add_argument("--nesting", type=int, default=defaults.nesting, help="Depth of nested groups")
+    parser.add_argument("--seed", type=int, default=defaults.seed, help="Seed for generated diagrams")
+    parser.add_argument("--variants", type=int, default=1, help="Differently seeded diagrams per kind (default: 1)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Calls in flight (default: 8)")
+    parser.add_argument("--loops", type=int, default=10, help="Times to replay the trace (default: 10)")
+    pacing = parser.add_mutually_exclusive_group()
+    pacing.add_argument("--rate", type=float, help="Open loop at this many calls per second")
+    pacing.add_argument("--speed", type=float, help="Open loop following the trace timing, this many times faster")
+    parser.add_argument("--kroki", help="Kroki server to use instead of the local stand-in")
+    add_stub_arguments(parser, prefix="stub-")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Startup and request timeout in seconds")
+    parser.add_argument("--json", dest="json_path", help="Write the report as JSON to this file")
+    args = parser.parse_args(argv)
+
+    if args.synthetic:
+        kinds = list(KINDS) if args.synthetic == "all" else [kind for kind in args.synthetic.split(",") if kind]
+        unknown = [kind for kind in kinds if kind not in KINDS]
+        if unknown:
+            parser.error(f"Unknown workload kind: {unknown[0]}. Available: {', '.join(KINDS)}")
+        spec = WorkloadSpec(args.elements, args.edge_density, args.label_length, args.nesting, args.seed)
+        entries = synthetic_trace(kinds, spec, max(1, args.variants))
+    else:
+        entries = load_trace(args.trace) if args.trace else builtin_trace()
+    if not entries:
+        print("Trace is empty", file=sys.stderr)
+        return 1
+
+    stub = None if args.kroki else start_stub(**stub_options(args, prefix="stub-"))
+    output_dir = tempfile.mkdtemp(prefix="loadtest-")
+    env = dict(os.environ)
+    env.update({
+        "MOCK_FASTMCP": "true",
+        "KROKI_SERVER": args.kroki or stub.url,
+        "MCP_OUTPUT_DIR": output_dir,
+        "PYTHONPATH": REPO_ROOT + os.pathsep + env.get("PYTHONPATH", ""),
+    })
+    env.pop("MCP_TOOL_TRACE_FILE", None)
+
+    target_class = TARGETS[args.target]
+    target = target_class() if target_class is StdioTarget else target_class(args.concurrency)
+    try:
+        target.start(env, args.timeout)
+        report = replay(target, entries, args.concurrency, args.loops, args.rate, args.speed)
+    finally:
+        target.close()
+        if stub is not None:
+            stub.shutdown()
+
+    print(format_report(report))
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
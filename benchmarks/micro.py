@@ -0,0 +1,360 @@
+"""
+Micro-benchmark suite
+
+Times the hot paths of the request pipeline in isolation, each over
+small, medium and very large inputs:
+
+* encoding: ``Kroki.deflate_and_encode``, ``Kroki.encode_plantuml``,
+  ``mermaid.serialize_state``, ``D2.d2.encode``
+* validation: ``SVGConstraints.validate_svg``
+* rendering: ai_uml block drawing to SVG
+* request-path: ``mcp_core.core.utils.generate_diagram`` against the local
+  Kroki stand-in (no network)
+
+Diagram inputs come from the synthetic workload generator
+(``benchmarks/workload.py``); each size sets the element count and
+``--edge-density``, ``--label-length`` and ``--nesting`` shape the rest.
+
+Each case is auto-ranged like ``timeit`` (enough calls per round to run
+for ``--min-time`` seconds) and repeated ``--repeat`` times; per-call
+statistics and the raw round samples are written as JSON so runs can be
+stored and compared (``benchmarks/compare.py``). Cases whose optional
+dependencies are missing are reported as skipped, and sizes a code path
+cannot handle are reported with the error.
+
+Usage:
+    python -m benchmarks.micro --json micro.json
+    python -m benchmarks.micro --filter encode --sizes small,medium
+    python -m benchmarks.micro --filter encode --nesting 3 --label-length 40
+"""
+
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, replace
+from typing import Any, Callable, ContextManager, Dict, List, Optional, Tuple
+
+from .workload import WorkloadSpec, generate
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Element count of each input size
+SIZES = {
+    "small": 10,
+    "medium": 200,
+    "large": 5000,
+}
+
+# A case setup takes the workload and yields (zero-argument callable to time, input size in bytes)
+CaseSetup = Callable[[WorkloadSpec], ContextManager[Tuple[Callable[[], Any], int]]]
+
+CASES: Dict[str, Tuple[str, CaseSetup]] = {}
+
+
+def case(name: str, group: str) -> Callable[[CaseSetup], CaseSetup]:
+    """
+    Register a benchmark case.
+
+    Args:
+        name: Case name (e.g. ``kroki.deflate_and_encode``)
+        group: Group used when comparing runs (encoding, validation, rendering, request-path)
+
+    Returns:
+        Decorator for a context-manager setup taking the ``WorkloadSpec``
+    """
+    def decorator(setup: CaseSetup) -> CaseSetup:
+        CASES[name] = (group, setup)
+        return setup
+    return decorator
+
+
+# Inputs
+
+def svg_source(elements: int) -> str:
+    """SVG document with ``elements`` shapes, all allowed by the default SVGConstraints."""
+    shapes = []
+    for i in range(elements):
+        x, y = (i * 17) % 1000, (i * 31) % 1000
+        kind = i % 3
+        if kind == 0:
+            shapes.append(f'<rect x="{x}" y="{y}" width="20" height="10" fill="#aed6f1" stroke="black"/>')
+        elif kind == 1:
+            shapes.append(f'<circle cx="{x}" cy="{y}" r="5" fill="none" stroke="#333"/>')
+        else:
+            shapes.append(f'<path d="M{x} {y} L{x + 20} {y + 10}" stroke="black" stroke-width="2"/>')
+    return (
+        '<svg xmlns="http://www.w3.org/2000/svg" width="1000" height="1000" viewBox="0 0 1000 1000">'
+        + "<g>" + "".join(shapes) + "</g></svg>"
+    )
+
+
+# Cases
+
+@case("kroki.deflate_and_encode", "encoding")
+@contextlib.contextmanager
+def _kroki_deflate(spec: WorkloadSpec):
+    from kroki.kroki import Kroki
+    client = Kroki()
+    source = generate("plantuml-class", spec)
+    yield (lambda: client.deflate_and_encode(source)), len(source.encode("utf-8"))
+
+
+@case("kroki.encode_plantuml", "encoding")
+@contextlib.contextmanager
+def _kroki_encode_plantuml(spec: WorkloadSpec):
+    from kroki.kroki import Kroki
+    client = Kroki()
+    source = generate("plantuml-class", spec)
+    yield (lambda: client.encode_plantuml(source)), len(source.encode("utf-8"))
+
+
+@case("mermaid.serialize_state", "encoding")
+@contextlib.contextmanager
+def _mermaid_serialize(spec: WorkloadSpec):
+    from mermaid.mermaid import generate_diagram_state, serialize_state
+    state = generate_diagram_state(generate("mermaid", spec))
+    yield (lambda: serialize_state(state)), len(state["code"].encode("utf-8"))
+
+
+@case("d2.encode", "encoding")
+@contextlib.contextmanager
+def _d2_encode(spec: WorkloadSpec):
+    from D2.d2 import encode
+    source = generate("d2", spec)
+    yield (lambda: encode(source)), len(source.encode("utf-8"))
+
+
+@case("svg.validate_svg", "validation")
+@contextlib.contextmanager
+def _validate_svg(spec: WorkloadSpec):
+    from ai_uml.src.diagram.utils.svg_validator import SVGConstraints
+    svg = svg_source(spec.elements)
+    constraints = SVGConstraints(max_svg_size=len(svg.encode("utf-8")) + 1)
+    yield (lambda: constraints.validate_svg(svg)), len(svg.encode("utf-8"))
+
+
+@case("ai_uml.render_blocks", "rendering")
+@contextlib.contextmanager
+def _render_blocks(spec: WorkloadSpec):
+    import svgwrite
+    from ai_uml.src.diagram.core.json_parser import BLOCK_TYPES
+    from ai_uml.src.diagram.utils.geometry import draw_connection_line, get_left_connection, get_right_connection
+
+    block_classes = list(BLOCK_TYPES.values())
+    blocks = [
+        block_classes[i % len(block_classes)](f"Block {i}", 50 + i * 150, 125, 100, 50)
+        for i in range(spec.elements)
+    ]
+
+    def render() -> str:
+        # Same drawing steps as VaeDiagram.draw, serialized instead of saved
+        drawing = svgwrite.Drawing(profile="full", size=(f"{50 + 150 * len(blocks)}px", "300px"))
+        for block in blocks:
+            block.draw(drawing)
+        for left, right in zip(blocks, blocks[1:]):
+            draw_connection_line(drawing, get_right_connection(left), get_left_connection(right))
+        return drawing.tostring()
+
+    yield render, len(render().encode("utf-8"))
+
+
+@case("generate_diagram", "request-path")
+@contextlib.contextmanager
+def _generate_diagram(spec: WorkloadSpec):
+    from mcp_core.core import utils
+    from mcp_core.core.config import MCP_SETTINGS
+    from .kroki_stub import start_stub
+
+    stub = start_stub()
+    client = utils.get_kroki_client()
+    saved = (client.base_url, MCP_SETTINGS.render_cache_path)
+    client.base_url = stub.url
+    # Measure the full render path, not cache hits
+    MCP_SETTINGS.render_cache_path = ""
+    output_dir = tempfile.mkdtemp(prefix="bench-")
+    source = generate("plantuml-class", spec)
+    try:
+        yield (lambda: utils.generate_diagram("class", source, "svg", output_dir)), len(source.encode("utf-8"))
+    finally:
+        client.base_url, MCP_SETTINGS.render_cache_path = saved
+        stub.shutdown()
+        stub.server_close()
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+
+# Runner
+
+def measure(func: Callable[[], Any], min_time: float = 0.05, repeat: int = 5) -> Dict[str, Any]:
+    """
+    Time a callable.
+
+    Args:
+        func: Zero-argument callable
+        min_time: Minimum seconds per round (sets the calls per round)
+        repeat: Rounds
+
+    Returns:
+        Per-call statistics in microseconds plus the raw round samples
+    """
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number = max(number * 2, int(number * min_time / elapsed) + 1) if elapsed > 0 else number * 10
+
+    samples = [elapsed / number * 1e6]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number * 1e6)
+
+    median = statistics.median(samples)
+    return {
+        "number": number,
+        "rounds": len(samples),
+        "min_us": min(samples),
+        "median_us": median,
+        "mean_us": statistics.fmean(samples),
+        "stdev_us": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "ops_per_s": 1e6 / median if median else 0.0,
+        "samples_us": samples,
+    }
+
+
+def _commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(
+    filters: Optional[List[str]] = None,
+    sizes: Optional[List[str]] = None,
+    min_time: float = 0.05,
+    repeat: int = 5,
+    workload: Optional[WorkloadSpec] = None
+) -> Dict[str, Any]:
+    """
+    Run the registered cases.
+
+    Args:
+        filters: Only run cases whose name contains one of these strings
+        sizes: Input sizes to run (default: all)
+        min_time: Minimum seconds per round
+        repeat: Rounds per measurement
+        workload: Shape of the generated diagram inputs; each size sets its element count
+
+    Returns:
+        Dictionary with ``meta`` and ``results`` ({case: {group, sizes: {size: stats}}})
+    """
+    workload = workload or WorkloadSpec()
+    results: Dict[str, Any] = {}
+    for name, (group, setup) in CASES.items():
+        if filters and not any(f in name for f in filters):
+            continue
+        entry: Dict[str, Any] = {"group": group, "sizes": {}}
+        for size in sizes or list(SIZES):
+            try:
+                with setup(replace(workload, elements=SIZES[size])) as (func, input_bytes):
+                    # The warm-up call also catches inputs the code path cannot handle,
+                    # which would otherwise be timed as a (fast) error path
+                    outcome = func()
+                    if isinstance(outcome, dict) and outcome.get("error"):
+                        entry["sizes"][size] = {"input_bytes": input_bytes, "error": outcome["error"]}
+                        continue
+                    stats = measure(func, min_time, repeat)
+            except ImportError as e:
+                entry["skipped"] = str(e)
+                break
+            stats["input_bytes"] = input_bytes
+            entry["sizes"][size] = stats
+        results[name] = entry
+
+    return {
+        "meta": {
+            "commit": _commit(),
+            "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "min_time": min_time,
+            "repeat": repeat,
+            "workload": {key: value for key, value in asdict(workload).items() if key != "elements"},
+        },
+        "results": results,
+    }
+
+
+def format_results(run: Dict[str, Any]) -> str:
+    """Render suite results as a text table."""
+    lines = [f"{'case':<28} {'size':<7} {'input':>10} {'median':>12} {'stdev':>10} {'ops/s':>12}"]
+    for name, entry in run["results"].items():
+        if "skipped" in entry:
+            lines.append(f"{name:<28} skipped: {entry['skipped']}")
+            continue
+        for size, stats in entry["sizes"].items():
+            if "error" in stats:
+                lines.append(f"{name:<28} {size:<7} {stats['input_bytes']:>9}B error: {stats['error']}")
+                continue
+            lines.append(
+                f"{name:<28} {size:<7} {stats['input_bytes']:>9}B {stats['median_us']:>10.1f}us "
+                f"{stats['stdev_us']:>8.1f}us {stats['ops_per_s']:>12.1f}"
+            )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the micro-benchmark suite")
+    parser.add_argument("--filter", action="append", help="Only run cases containing this string (repeatable)")
+    parser.add_argument("--sizes", default=",".join(SIZES), help=f"Comma-separated input sizes (default: {','.join(SIZES)})")
+    parser.add_argument("--min-time", type=float, default=0.05, help="Minimum seconds per round (default: 0.05)")
+    parser.add_argument("--repeat", type=int, default=5, help="Rounds per measurement (default: 5)")
+    defaults = WorkloadSpec()
+    parser.add_argument("--edge-density", type=float, default=defaults.edge_density,
+                        help=f"Edges per element in generated diagrams (default: {defaults.edge_density})")
+    parser.add_argument("--label-length", type=int, default=defaults.label_length,
+                        help=f"Characters per label in generated diagrams (default: {defaults.label_length})")
+    parser.add_argument("--nesting", type=int, default=defaults.nesting,
+                        help=f"Depth of nested groups in generated diagrams (default: {defaults.nesting})")
+    parser.add_argument("--seed", type=int, default=defaults.seed, help="Seed for generated diagrams")
+    parser.add_argument("--list", action="store_true", help="List the cases and exit")
+    parser.add_argument("--json", dest="json_path", help="Write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, (group, _) in CASES.items():
+            print(f"{name:<28} {group}")
+        return 0
+
+    sizes = [size for size in args.sizes.split(",") if size]
+    unknown = [size for size in sizes if size not in SIZES]
+    if unknown:
+        parser.error(f"Unknown sizes: {', '.join(unknown)}. Available: {', '.join(SIZES)}")
+
+    workload = WorkloadSpec(edge_density=args.edge_density, label_length=args.label_length,
+                            nesting=args.nesting, seed=args.seed)
+    run = run_suite(args.filter, sizes, args.min_time, max(2, args.repeat), workload)
+    print(format_results(run))
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(run, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
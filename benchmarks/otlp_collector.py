@@ -0,0 +1,230 @@
+"""
+Local OTLP collector stand-in
+
+A small HTTP server accepting OTLP/HTTP trace exports in JSON encoding,
+so tracing (``MCP_TRACING_OTLP_ENDPOINT``) can be tried and tested
+without running a real collector:
+
+    POST /v1/traces     ExportTraceServiceRequest (JSON)
+    GET  /spans         received spans (``?trace_id=`` filters one trace)
+    GET  /health        status and counters
+
+Spans are kept in memory (the most recent ``--max-spans``) and can also be
+appended to a JSONL file, in the same record format ``MCP_TRACING_FILE``
+writes. Protobuf-encoded exports are rejected with 415.
+
+Usage:
+    python -m benchmarks.otlp_collector --port 4318 --out spans.jsonl
+    MCP_TRACING_OTLP_ENDPOINT=http://127.0.0.1:4318 python mcp_server.py
+"""
+
+import argparse
+import collections
+import json
+import logging
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from mcp_core.core.tracing import SPAN_KINDS
+
+logger = logging.getLogger(__name__)
+
+KIND_NAMES = {number: name for name, number in SPAN_KINDS.items()}
+
+
+def _attribute_value(value: Dict[str, Any]) -> Any:
+    if "intValue" in value:
+        return int(value["intValue"])
+    for key in ("stringValue", "boolValue", "doubleValue"):
+        if key in value:
+            return value[key]
+    return value
+
+
+def _attributes(items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {item["key"]: _attribute_value(item.get("value", {})) for item in items or []}
+
+
+def flatten_export(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Turn an OTLP/JSON export request into one record per span.
+
+    Args:
+        payload: Decoded ``ExportTraceServiceRequest``
+
+    Returns:
+        Span records (trace_id, span_id, parent_id, name, kind, start,
+        duration_ms, status, error, attributes, service)
+    """
+    records = []
+    for resource_spans in payload.get("resourceSpans", []):
+        resource = _attributes(resource_spans.get("resource", {}).get("attributes", []))
+        for scope_spans in resource_spans.get("scopeSpans", []):
+            for span in scope_spans.get("spans", []):
+                start, end = int(span["startTimeUnixNano"]), int(span["endTimeUnixNano"])
+                status = span.get("status", {})
+                failed = status.get("code") == 2
+                records.append({
+                    "trace_id": span["traceId"],
+                    "span_id": span["spanId"],
+                    "parent_id": span.get("parentSpanId") or None,
+                    "name": span["name"],
+                    "kind": KIND_NAMES.get(span.get("kind"), "internal"),
+                    "start": start / 1e9,
+                    "duration_ms": round((end - start) / 1e6, 3),
+                    "status": "error" if failed else "ok",
+                    "error": status.get("message") if failed else None,
+                    "attributes": _attributes(span.get("attributes", [])),
+                    "service": resource.get("service.name"),
+                })
+    return records
+
+
+class CollectorHandler(BaseHTTPRequestHandler):
+    """Request handler for the collector routes."""
+
+    server_version = "OTLPCollectorStub/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def _respond(self, status: int, body: Any):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        path, _, query = self.path.partition("?")
+        if path == "/health":
+            self._respond(200, self.server.stats())
+        elif path == "/spans":
+            trace_id = parse_qs(query).get("trace_id", [None])[0]
+            self._respond(200, self.server.spans(trace_id))
+        else:
+            self._respond(404, {"error": "Not Found"})
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", "0")))
+        if self.path.split("?", 1)[0] != "/v1/traces":
+            self._respond(404, {"error": "Not Found"})
+            return
+        if "json" not in self.headers.get("Content-Type", ""):
+            self._respond(415, {"error": "Only the JSON encoding is supported"})
+            return
+        try:
+            records = flatten_export(json.loads(body))
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            self._respond(400, {"error": f"Invalid export request: {e}"})
+            return
+        self.server.add(records)
+        self._respond(200, {"partialSuccess": {}})
+
+
+class CollectorServer(ThreadingHTTPServer):
+    """Threaded OTLP collector stand-in.
+
+    Attributes:
+        out: JSONL file receiving every span, if set.
+        exports: Export requests received.
+        received: Spans received.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], out: Optional[str] = None, max_spans: int = 100000):
+        super().__init__(address, CollectorHandler)
+        self.out = out
+        self._lock = threading.Lock()
+        self._spans: "collections.deque[Dict[str, Any]]" = collections.deque(maxlen=max_spans)
+        self._file = open(out, "a", encoding="utf-8") if out else None
+        self.exports = 0
+        self.received = 0
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def add(self, records: List[Dict[str, Any]]):
+        with self._lock:
+            self.exports += 1
+            self.received += len(records)
+            self._spans.extend(records)
+            if self._file is not None:
+                self._file.write("".join(json.dumps(record) + "\n" for record in records))
+                self._file.flush()
+
+    def spans(self, trace_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get received spans, oldest first.
+
+        Args:
+            trace_id: Only spans of this trace
+
+        Returns:
+            Span records
+        """
+        with self._lock:
+            return [span for span in self._spans if trace_id is None or span["trace_id"] == trace_id]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "status": "pass",
+                "exports": self.exports,
+                "spans": self.received,
+                "traces": len({span["trace_id"] for span in self._spans}),
+            }
+
+    def server_close(self):
+        super().server_close()
+        if self._file is not None:
+            self._file.close()
+
+
+def start_collector(host: str = "127.0.0.1", port: int = 0, **options) -> CollectorServer:
+    """
+    Start the collector on a background thread.
+
+    Args:
+        host: Interface to bind
+        port: Port to bind (0 picks a free port)
+        **options: Passed to CollectorServer (out, max_spans)
+
+    Returns:
+        The running server; its ``url`` is the OTLP endpoint. Call ``shutdown()`` to stop it.
+    """
+    server = CollectorServer((host, port), **options)
+    threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.1},
+                     name="otlp-collector", daemon=True).start()
+    return server
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run a local OTLP/HTTP (JSON) trace collector")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=4318, help="Port to bind (default: 4318)")
+    parser.add_argument("--out", help="Append received spans to this JSONL file")
+    parser.add_argument("--max-spans", type=int, default=100000, help="Spans kept in memory for /spans")
+    args = parser.parse_args(argv)
+
+    server = CollectorServer((args.host, args.port), out=args.out, max_spans=args.max_spans)
+    print(f"OTLP collector listening on {server.url}/v1/traces", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
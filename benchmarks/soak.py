@@ -0,0 +1,352 @@
+"""
+Memory soak test and leak detector
+
+Drives a long stream of synthetic tool calls through the stdio pipeline in
+this process (``serve_stdio`` -> ``FastMCP._handle_request`` -> middleware
+-> tools -> Kroki client -> file write) against a local Kroki stand-in run
+as a subprocess, so its allocations stay out of the measurements.
+
+``tracemalloc`` snapshots are taken after a warm-up (the baseline) and then
+every ``--interval`` calls. The report shows RSS and traced memory over
+time, the allocation sites that grew most since the baseline, and the
+sites that look like leaks: those that grew by at least ``--min-growth``
+bytes and kept growing through most intervals, rather than filling once
+like a cache. The exit status is 1 when leaks are suspected.
+
+Usage:
+    python -m benchmarks.soak --calls 1000000 --interval 50000
+    python -m benchmarks.soak --duration 3600 --frames 10 --json soak.json
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+from .kroki_stub import add_stub_arguments, stub_options
+from .loadtest import REPO_ROOT, _free_port, _is_error
+from .workload import KINDS, TOOLS, WorkloadSpec, generate
+
+# Allocations made by the harness itself (request source, response sink and the
+# per-checkpoint site names; mcp_core.core.memory is only used by the harness here)
+HARNESS_FILES = [
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "*"),
+    os.path.join(REPO_ROOT, "mcp_core", "core", "memory.py"),
+]
+
+# Sites tracked per checkpoint to judge how steadily they grow
+TRACKED_SITES = 200
+
+
+class RequestSource:
+    """
+    Line-oriented stand-in for stdin producing tool-call requests on demand.
+
+    Cycles through ``distinct`` generated diagrams so millions of calls need
+    no more memory than a few hundred, and calls ``on_checkpoint`` from the
+    reader thread after the warm-up and every ``interval`` calls after it.
+    """
+
+    def __init__(
+        self,
+        calls: int,
+        distinct: int,
+        spec: WorkloadSpec,
+        warmup: int,
+        interval: int,
+        on_checkpoint: Callable[[int], None],
+        deadline: Optional[float] = None
+    ):
+        from mcp_core.core import jsoncodec
+
+        kinds = list(KINDS)
+        self.bodies = []
+        for index in range(max(1, distinct)):
+            kind = kinds[index % len(kinds)]
+            request = {"type": "tool", "tool": TOOLS[kind],
+                       "args": {"code": generate(kind, spec, seed=spec.seed + index)}}
+            # Encoded without the opening brace so each line only prepends its id
+            self.bodies.append(jsoncodec.dumps(request)[1:])
+        self.calls = calls
+        self.warmup = warmup
+        self.interval = max(1, interval)
+        self.on_checkpoint = on_checkpoint
+        self.deadline = deadline
+        self.sent = 0
+
+    def readline(self) -> str:
+        if self.sent >= self.calls or (self.deadline is not None and time.monotonic() >= self.deadline):
+            return ""
+        if self.sent >= self.warmup and (self.sent - self.warmup) % self.interval == 0:
+            self.on_checkpoint(self.sent)
+        body = self.bodies[self.sent % len(self.bodies)]
+        self.sent += 1
+        return f'{{"id":{self.sent},{body}\n'
+
+
+class ResponseSink:
+    """Stand-in for stdout that counts responses and errors and keeps nothing."""
+
+    def __init__(self):
+        from mcp_core.core import jsoncodec
+        self._loads = jsoncodec.loads
+        self.responses = 0
+        self.errors = 0
+        self.last_error: Optional[str] = None
+
+    def write(self, data: str):
+        for line in data.splitlines():
+            self.responses += 1
+            response = self._loads(line)
+            if _is_error(response):
+                self.errors += 1
+                result = response.get("result")
+                self.last_error = str(response.get("error") or (result or {}).get("error"))
+
+    def flush(self):
+        pass
+
+
+class MemoryTracker:
+    """Takes the periodic snapshots and keeps what the report needs."""
+
+    def __init__(self, top: int = 10, key_type: str = "lineno"):
+        self.top = top
+        self.key_type = key_type
+        self.started = time.perf_counter()
+        self.baseline: Optional[tracemalloc.Snapshot] = None
+        self.latest: Optional[tracemalloc.Snapshot] = None
+        self.checkpoints: List[Dict[str, Any]] = []
+
+    def checkpoint(self, calls: int):
+        from mcp_core.core.memory import rss_bytes, site_name, take_snapshot
+
+        snapshot = take_snapshot(exclude=HARNESS_FILES)
+        traced, _ = tracemalloc.get_traced_memory()
+        if self.baseline is None:
+            self.baseline = snapshot
+        self.latest = snapshot
+        # Only the largest sites are kept per checkpoint, so memory stays bounded
+        sites = {}
+        for stat in snapshot.statistics(self.key_type)[:TRACKED_SITES]:
+            sites[site_name(stat.traceback)] = stat.size
+        self.checkpoints.append({
+            "calls": calls,
+            "elapsed_s": time.perf_counter() - self.started,
+            "rss_bytes": rss_bytes(),
+            "traced_bytes": traced,
+            "sites": sites,
+        })
+        print(_format_checkpoint(self.checkpoints[-1], self.checkpoints[0]), file=sys.stderr, flush=True)
+
+
+def _format_checkpoint(checkpoint: Dict[str, Any], first: Dict[str, Any]) -> str:
+    rss = checkpoint["rss_bytes"] or 0
+    rss_delta = rss - (first["rss_bytes"] or 0)
+    traced_delta = checkpoint["traced_bytes"] - first["traced_bytes"]
+    return (f"{checkpoint['calls']:>10} calls {checkpoint['elapsed_s']:>8.1f}s  rss {rss / 2**20:8.1f} MiB "
+            f"({rss_delta / 2**20:+.1f})  traced {checkpoint['traced_bytes'] / 2**20:8.1f} MiB "
+            f"({traced_delta / 2**20:+.2f})")
+
+
+def find_leaks(checkpoints: List[Dict[str, Any]], growth: List[Dict[str, Any]],
+               min_growth: int = 64 * 1024, steadiness: float = 0.75) -> List[Dict[str, Any]]:
+    """
+    Pick the growing sites that look like leaks.
+
+    Args:
+        checkpoints: Checkpoints with per-site sizes, baseline first
+        growth: Sites that grew since the baseline (``compare_snapshots`` output)
+        min_growth: Bytes a site must have grown by
+        steadiness: Fraction of intervals in which the site must have grown
+
+    Returns:
+        Suspected sites with their growth per call
+    """
+    if len(checkpoints) < 3:
+        return []
+    calls = checkpoints[-1]["calls"] - checkpoints[0]["calls"]
+    suspects = []
+    for site in growth:
+        if site["size_diff_bytes"] < min_growth:
+            continue
+        series = [checkpoint["sites"].get(site["site"], 0) for checkpoint in checkpoints]
+        rises = sum(1 for before, after in zip(series, series[1:]) if after > before)
+        if rises / (len(series) - 1) >= steadiness:
+            suspects.append({
+                **site,
+                "grew_in_intervals": f"{rises}/{len(series) - 1}",
+                "bytes_per_call": site["size_diff_bytes"] / calls if calls else 0.0,
+            })
+    return suspects
+
+
+def run_soak(
+    calls: int,
+    interval: int,
+    warmup: int,
+    concurrency: int,
+    distinct: int,
+    spec: WorkloadSpec,
+    frames: int = 1,
+    top: int = 10,
+    duration: Optional[float] = None,
+    min_growth: int = 64 * 1024
+) -> Dict[str, Any]:
+    """
+    Run the soak in this process against ``KROKI_SERVER``.
+
+    Args:
+        calls: Tool calls to make (stops earlier when ``duration`` runs out)
+        interval: Calls between snapshots
+        warmup: Calls before the baseline snapshot
+        concurrency: stdio worker threads
+        distinct: Distinct diagrams cycled through
+        spec: Size of the generated diagrams
+        frames: Frames stored per allocation
+        top: Sites per list in the report
+        duration: Maximum seconds to run
+        min_growth: Bytes a site must grow by to be suspected
+
+    Returns:
+        Report with checkpoints, growth since the baseline and suspected leaks
+    """
+    import asyncio
+    from mcp_core.core.memory import compare_snapshots, top_sites
+    from mcp_core.core.server import create_mcp_server
+    from mcp_core.server.stdio_transport import serve_stdio
+
+    server = create_mcp_server()
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start(frames)
+    tracker = MemoryTracker(top)
+    deadline = time.monotonic() + duration if duration else None
+    source = RequestSource(calls, distinct, spec, warmup, interval, tracker.checkpoint, deadline)
+    sink = ResponseSink()
+    try:
+        asyncio.run(serve_stdio(server._handle_request, source, sink, max_workers=concurrency))
+        if not tracker.checkpoints or tracker.checkpoints[-1]["calls"] != source.sent:
+            tracker.checkpoint(source.sent)
+        frames = tracemalloc.get_traceback_limit()
+        growth = compare_snapshots(tracker.baseline, tracker.latest, max(top, 50), tracker.key_type)
+        top_now = top_sites(tracker.latest, top, tracker.key_type)
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+
+    checkpoints = tracker.checkpoints
+    first, last = checkpoints[0], checkpoints[-1]
+    measured_calls = last["calls"] - first["calls"]
+    return {
+        "calls": source.sent,
+        "responses": sink.responses,
+        "errors": sink.errors,
+        "last_error": sink.last_error,
+        "wall_s": last["elapsed_s"],
+        "frames": frames,
+        "rss_growth_bytes": (last["rss_bytes"] or 0) - (first["rss_bytes"] or 0),
+        "traced_growth_bytes": last["traced_bytes"] - first["traced_bytes"],
+        "traced_bytes_per_call": (last["traced_bytes"] - first["traced_bytes"]) / measured_calls
+        if measured_calls else 0.0,
+        "checkpoints": [{key: value for key, value in checkpoint.items() if key != "sites"}
+                        for checkpoint in checkpoints],
+        "top": top_now,
+        "growth": growth[:top],
+        "suspected_leaks": find_leaks(checkpoints, growth, min_growth),
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Render a soak report as text."""
+    lines = [
+        f"{report['calls']} calls in {report['wall_s']:.1f}s ({report['errors']} errors), "
+        f"RSS {report['rss_growth_bytes'] / 2**20:+.1f} MiB, traced {report['traced_growth_bytes'] / 2**20:+.2f} MiB "
+        f"({report['traced_bytes_per_call']:+.1f} B/call) since the baseline",
+    ]
+    if report["last_error"]:
+        lines.append(f"last error: {report['last_error']}")
+    lines.append("")
+    lines.append("Growth since the baseline:")
+    for site in report["growth"]:
+        lines.append(f"  {site['size_diff_bytes'] / 1024:+10.1f} KiB {site['count_diff']:+8} blocks  {site['site']}")
+    lines.append("")
+    if report["suspected_leaks"]:
+        lines.append("Suspected leaks:")
+        for site in report["suspected_leaks"]:
+            lines.append(f"  {site['bytes_per_call']:+8.2f} B/call  grew in {site['grew_in_intervals']} intervals  "
+                         f"{site['site']}")
+    else:
+        lines.append("No suspected leaks")
+    return "\n".join(lines)
+
+
+def _start_stub(options: Dict[str, Any], timeout: float = 10.0):
+    import httpx
+
+    port = _free_port()
+    argv = [sys.executable, "-m", "benchmarks.kroki_stub", "--port", str(port)]
+    for key, value in options.items():
+        argv += [f"--{key.replace('_', '-')}", str(value)]
+    process = subprocess.Popen(argv, cwd=REPO_ROOT, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(url + "/health", timeout=1.0)
+            return process, url
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f"Kroki stand-in did not start on {url}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    defaults = WorkloadSpec(elements=10)
+    parser = argparse.ArgumentParser(description="Soak the stdio pipeline and report memory growth by allocation site")
+    parser.add_argument("--calls", type=int, default=1_000_000, help="Tool calls to make (default: 1000000)")
+    parser.add_argument("--duration", type=float, help="Stop after this many seconds")
+    parser.add_argument("--interval", type=int, default=50_000, help="Calls between snapshots (default: 50000)")
+    parser.add_argument("--warmup", type=int, default=5_000, help="Calls before the baseline snapshot (default: 5000)")
+    parser.add_argument("--concurrency", type=int, default=8, help="stdio worker threads (default: 8)")
+    parser.add_argument("--distinct", type=int, default=500, help="Distinct diagrams cycled through (default: 500)")
+    parser.add_argument("--elements", type=int, default=defaults.elements, help="Elements per generated diagram")
+    parser.add_argument("--frames", type=int, default=1, help="Frames stored per allocation (default: 1)")
+    parser.add_argument("--top", type=int, default=10, help="Sites per list (default: 10)")
+    parser.add_argument("--min-growth", type=int, default=64 * 1024,
+                        help="Bytes a site must grow by to be suspected (default: 65536)")
+    parser.add_argument("--kroki", help="Kroki server to use instead of the local stand-in")
+    add_stub_arguments(parser, prefix="stub-")
+    parser.add_argument("--json", dest="json_path", help="Write the report as JSON to this file")
+    args = parser.parse_args(argv)
+
+    stub, url = (None, args.kroki) if args.kroki else _start_stub(stub_options(args, prefix="stub-"))
+    output_dir = tempfile.mkdtemp(prefix="soak-")
+    # Settings are read at import, so the environment is set before mcp_core loads
+    os.environ.update({"MOCK_FASTMCP": "true", "KROKI_SERVER": url, "MCP_OUTPUT_DIR": output_dir})
+    os.environ.pop("MCP_TOOL_TRACE_FILE", None)
+    try:
+        report = run_soak(args.calls, args.interval, args.warmup, args.concurrency, args.distinct,
+                          WorkloadSpec(elements=args.elements), args.frames, args.top, args.duration,
+                          args.min_growth)
+    finally:
+        if stub is not None:
+            stub.terminate()
+            stub.wait()
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    print(format_report(report))
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+    return 1 if report["suspected_leaks"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,239 @@
+"""
+Startup-time benchmark for the MCP server entry point
+
+MCP clients spawn ``mcp_server.py`` on demand, so process startup is
+user-visible latency. This benchmark measures two scenarios:
+
+* ``list-tools``: ``mcp_server.py --list-tools`` from spawn to exit
+* ``handshake``: ``mcp_server.py --transport stdio`` from spawn to the first
+  response on stdout
+
+Each run is executed with ``-X importtime``; the slowest imports of the
+median run are reported so regressions can be traced to a module. The
+script exits with status 1 when a scenario's median exceeds its budget.
+
+Usage:
+    MOCK_FASTMCP=true python -m benchmarks.startup --runs 5 --budget-ms list-tools=1500 --json startup.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENTRY_POINT = os.path.join(REPO_ROOT, "mcp_server.py")
+
+# Default budgets in milliseconds
+DEFAULT_BUDGETS = {
+    "list-tools": 1500.0,
+    "handshake": 1000.0,
+}
+
+# First request sent for the handshake scenario, by protocol
+HANDSHAKE_MESSAGES = {
+    # The mock FastMCP server speaks line-delimited {"type": ...} requests
+    "mock": {"type": "resource", "path": "uml://server-info"},
+    "jsonrpc": {
+        "jsonrpc": "2.0",
+        "id": 1,
+        "method": "initialize",
+        "params": {
+            "protocolVersion": "2024-11-05",
+            "capabilities": {},
+            "clientInfo": {"name": "startup-benchmark", "version": "1.0"},
+        },
+    },
+}
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """
+    Parse ``-X importtime`` output.
+
+    Args:
+        stderr: Standard error of the measured process
+
+    Returns:
+        List of (module, self_us, cumulative_us)
+    """
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3:
+            continue
+        try:
+            imports.append((fields[2].strip(), int(fields[0]), int(fields[1])))
+        except ValueError:
+            # Header line ("self [us] | cumulative | imported package")
+            continue
+    return imports
+
+
+def top_imports(imports: List[Tuple[str, int, int]], limit: int = 10) -> List[Dict[str, Any]]:
+    """
+    Get the imports that spent the most time in their own module body.
+
+    Args:
+        imports: Parsed importtime records
+        limit: Number of records to return
+
+    Returns:
+        List of {"module", "self_ms", "cumulative_ms"} dictionaries
+    """
+    ranked = sorted(imports, key=lambda record: record[1], reverse=True)[:limit]
+    return [
+        {"module": module, "self_ms": round(self_us / 1000, 1), "cumulative_ms": round(cumulative / 1000, 1)}
+        for module, self_us, cumulative in ranked
+    ]
+
+
+def _command(args: List[str]) -> List[str]:
+    return [sys.executable, "-X", "importtime", ENTRY_POINT] + args
+
+
+def run_list_tools(env: Dict[str, str], timeout: float) -> Tuple[float, str]:
+    """
+    Time ``mcp_server.py --list-tools`` from spawn to exit.
+
+    Returns:
+        (elapsed milliseconds, stderr)
+    """
+    start = time.perf_counter()
+    completed = subprocess.run(
+        _command(["--list-tools"]), cwd=REPO_ROOT, env=env,
+        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+        timeout=timeout, text=True,
+    )
+    elapsed = (time.perf_counter() - start) * 1000
+    if completed.returncode != 0:
+        raise RuntimeError(f"--list-tools exited with {completed.returncode}: {completed.stderr[-500:]}")
+    return elapsed, completed.stderr
+
+
+def run_handshake(env: Dict[str, str], timeout: float, protocol: str) -> Tuple[float, str]:
+    """
+    Time a stdio server from spawn to its first response.
+
+    Returns:
+        (elapsed milliseconds, stderr)
+    """
+    message = json.dumps(HANDSHAKE_MESSAGES[protocol]) + "\n"
+    # stderr goes to a file: importtime output can exceed the pipe buffer before the first response
+    with tempfile.TemporaryFile(mode="w+") as stderr_file:
+        start = time.perf_counter()
+        process = subprocess.Popen(
+            _command(["--transport", "stdio"]), cwd=REPO_ROOT, env=env,
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=stderr_file, text=True,
+        )
+        try:
+            process.stdin.write(message)
+            process.stdin.flush()
+            response = process.stdout.readline()
+            elapsed = (time.perf_counter() - start) * 1000
+            process.stdin.close()
+            process.wait(timeout=timeout)
+        except BaseException:
+            process.kill()
+            process.wait()
+            raise
+        finally:
+            process.stdout.close()
+        stderr_file.seek(0)
+        stderr = stderr_file.read()
+    if not response:
+        raise RuntimeError(f"stdio server closed without responding: {stderr[-500:]}")
+    json.loads(response)
+    return elapsed, stderr
+
+
+def run_scenario(name: str, runs: int, env: Dict[str, str], timeout: float, protocol: str) -> Dict[str, Any]:
+    """
+    Run a scenario several times and summarize it.
+
+    Returns:
+        Dictionary with per-run timings, median/min/max, total import time and the
+        slowest imports of the median run
+    """
+    samples = []
+    for _ in range(runs):
+        if name == "list-tools":
+            samples.append(run_list_tools(env, timeout))
+        else:
+            samples.append(run_handshake(env, timeout, protocol))
+
+    timings = [elapsed for elapsed, _ in samples]
+    median = statistics.median(timings)
+    median_run = min(samples, key=lambda sample: abs(sample[0] - median))
+    imports = parse_importtime(median_run[1])
+    return {
+        "runs_ms": [round(t, 1) for t in timings],
+        "median_ms": round(median, 1),
+        "min_ms": round(min(timings), 1),
+        "max_ms": round(max(timings), 1),
+        "import_ms": round(sum(record[1] for record in imports) / 1000, 1),
+        "top_imports": top_imports(imports),
+    }
+
+
+def _parse_budgets(values: Optional[List[str]]) -> Dict[str, float]:
+    budgets = dict(DEFAULT_BUDGETS)
+    for value in values or []:
+        name, _, budget = value.partition("=")
+        if name not in DEFAULT_BUDGETS or not budget:
+            raise SystemExit(f"Invalid budget '{value}', expected one of {', '.join(DEFAULT_BUDGETS)}=<ms>")
+        budgets[name] = float(budget)
+    return budgets
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure MCP server startup time against a budget")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per scenario (default: 5)")
+    parser.add_argument("--scenario", choices=list(DEFAULT_BUDGETS), action="append",
+                        help="Scenario to run (default: all)")
+    parser.add_argument("--budget-ms", action="append", metavar="SCENARIO=MS",
+                        help="Override a scenario budget, e.g. handshake=800")
+    parser.add_argument("--protocol", choices=list(HANDSHAKE_MESSAGES),
+                        help="Handshake protocol (default: mock when MOCK_FASTMCP is set, else jsonrpc)")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-run timeout in seconds")
+    parser.add_argument("--json", dest="json_path", help="Write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    budgets = _parse_budgets(args.budget_ms)
+    env = dict(os.environ)
+    protocol = args.protocol or (
+        "mock" if env.get("MOCK_FASTMCP", "false").lower() in ("true", "1", "yes") else "jsonrpc"
+    )
+
+    results = {}
+    failed = False
+    for name in args.scenario or list(DEFAULT_BUDGETS):
+        result = run_scenario(name, args.runs, env, args.timeout, protocol)
+        result["budget_ms"] = budgets[name]
+        result["within_budget"] = result["median_ms"] <= budgets[name]
+        failed = failed or not result["within_budget"]
+        results[name] = result
+
+        status = "ok" if result["within_budget"] else "OVER BUDGET"
+        print(f"{name:<12} median {result['median_ms']:>8.1f} ms  "
+              f"(min {result['min_ms']:.1f}, max {result['max_ms']:.1f}, budget {budgets[name]:.0f}, "
+              f"imports {result['import_ms']:.1f})  {status}")
+        for record in result["top_imports"][:5]:
+            print(f"    {record['self_ms']:>8.1f} ms  {record['module']}")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({"protocol": protocol, "python": sys.version.split()[0], "scenarios": results}, f, indent=2)
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,329 @@
+"""
+Synthetic diagram workload generator
+
+Produces seeded, reproducible diagram sources far larger than the starter
+templates, for the micro-benchmarks and the load test:
+
+* ``plantuml-class``: classes with attributes and methods, nested packages
+* ``plantuml-sequence``: participants and messages, nested ``group`` blocks
+* ``mermaid``: flowchart nodes and labelled edges, nested subgraphs
+* ``graphviz``: DOT digraph, nested ``cluster`` subgraphs
+* ``d2``: shapes and labelled connections, nested containers
+* ``erd``: entities with attributes and cardinality relationships
+  (ERD has no grouping, so ``nesting`` is ignored)
+
+The knobs are the number of elements (classes, participants, nodes or
+entities), the edge density (edges per element), the label length in
+characters and the nesting depth. Elements are spread over groups three
+wide at each nesting level. When there are at least ``elements - 1`` edges
+the first ones form a random spanning tree, so the diagram is connected.
+Renderers have their own limits (Mermaid rejects sources over 50,000
+characters or 500 edges by default), which large workloads will hit.
+
+Usage:
+    python -m benchmarks.workload --kind mermaid --elements 500 --nesting 2
+    python -m benchmarks.workload --kind all --elements 200 --out workloads/
+"""
+
+import argparse
+import os
+import random
+import sys
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional, Tuple
+
+# Workload kind -> Kroki language
+KINDS = {
+    "plantuml-class": "plantuml",
+    "plantuml-sequence": "plantuml",
+    "mermaid": "mermaid",
+    "graphviz": "graphviz",
+    "d2": "d2",
+    "erd": "erd",
+}
+
+# Workload kind -> MCP tool that renders it
+TOOLS = {
+    "plantuml-class": "generate_class_diagram",
+    "plantuml-sequence": "generate_sequence_diagram",
+    "mermaid": "generate_mermaid_diagram",
+    "graphviz": "generate_graphviz_diagram",
+    "d2": "generate_d2_diagram",
+    "erd": "generate_erd_diagram",
+}
+
+EXTENSIONS = {
+    "plantuml-class": "puml",
+    "plantuml-sequence": "puml",
+    "mermaid": "mmd",
+    "graphviz": "dot",
+    "d2": "d2",
+    "erd": "er",
+}
+
+# Groups per nesting level
+BRANCHING = 3
+
+WORDS = (
+    "account", "order", "invoice", "customer", "payment", "shipment", "catalog", "review",
+    "session", "token", "report", "metric", "queue", "worker", "cache", "index",
+    "profile", "address", "ledger", "policy", "region", "tenant", "audit", "event",
+)
+
+
+@dataclass(frozen=True)
+class WorkloadSpec:
+    """Size knobs of a synthetic diagram."""
+    elements: int = 20
+    edge_density: float = 1.5
+    label_length: int = 12
+    nesting: int = 0
+    seed: int = 0
+
+
+class _Builder:
+    """Seeded elements, edges, labels and groups shared by the language writers."""
+
+    def __init__(self, kind: str, spec: WorkloadSpec):
+        self.spec = spec
+        self.rng = random.Random(f"{spec.seed}:{kind}")
+        self.count = max(1, spec.elements)
+        self.edges = self._edges()
+        self.groups = self._groups()
+        self.tree = self._tree()
+
+    def label(self) -> str:
+        """Words (letters and spaces only) cut to the label length."""
+        length = max(1, self.spec.label_length)
+        words: List[str] = []
+        while sum(len(word) + 1 for word in words) <= length:
+            words.append(self.rng.choice(WORDS))
+        return " ".join(words)[:length].strip() or "x"
+
+    def identifier(self) -> str:
+        return self.label().replace(" ", "_")
+
+    def _edges(self) -> List[Tuple[int, int]]:
+        wanted = round(self.count * max(0.0, self.spec.edge_density))
+        if self.count < 2:
+            return []
+        edges = []
+        if wanted >= self.count - 1:
+            edges = [(self.rng.randrange(i), i) for i in range(1, self.count)]
+        while len(edges) < wanted:
+            source, target = self.rng.randrange(self.count), self.rng.randrange(self.count)
+            if source != target:
+                edges.append((source, target))
+        return edges
+
+    def _groups(self) -> Dict[Tuple[int, ...], List[int]]:
+        # Group path (one index per nesting level) -> elements directly in that group
+        groups: Dict[Tuple[int, ...], List[int]] = {}
+        for element in range(self.count):
+            path = tuple(self.rng.randrange(BRANCHING) for _ in range(max(0, self.spec.nesting)))
+            groups.setdefault(path, []).append(element)
+        return groups
+
+    def _tree(self) -> Dict[Tuple[int, ...], List[Tuple[int, ...]]]:
+        # Group path -> child group paths, including the intermediate groups
+        children: Dict[Tuple[int, ...], List[Tuple[int, ...]]] = {(): []}
+        for path in sorted(self.groups):
+            for depth in range(1, len(path) + 1):
+                parent, child = path[:depth - 1], path[:depth]
+                if child not in children:
+                    children[child] = []
+                    children.setdefault(parent, []).append(child)
+        return children
+
+    def walk(self, open_group, close_group, element, path: Tuple[int, ...] = (), depth: int = 0) -> List[str]:
+        """Render the group tree with callbacks returning lines for each part."""
+        lines = []
+        for index in self.groups.get(path, []):
+            lines.extend(element(index, depth))
+        for child in self.tree.get(path, []):
+            lines.extend(open_group(child, depth))
+            lines.extend(self.walk(open_group, close_group, element, child, depth + 1))
+            lines.extend(close_group(child, depth))
+        return lines
+
+
+def _indent(depth: int) -> str:
+    return "  " * depth
+
+
+def _group_name(path: Tuple[int, ...]) -> str:
+    return "group_" + "_".join(str(i) for i in path)
+
+
+def _plantuml_class(b: _Builder) -> str:
+    def open_group(path, depth):
+        return [f'{_indent(depth)}package "{b.label()} {_group_name(path)}" {{']
+
+    def close_group(path, depth):
+        return [f"{_indent(depth)}}}"]
+
+    def element(index, depth):
+        pad = _indent(depth)
+        return [
+            f'{pad}class "{b.label()}" as C{index} {{',
+            f"{pad}  +{b.identifier()}: String",
+            f"{pad}  -{b.identifier()}: int",
+            f"{pad}  +{b.identifier()}(): void",
+            f"{pad}}}",
+        ]
+
+    arrows = ("-->", "..>", "--|>", "--o", "--*")
+    lines = ["@startuml", "set separator none"]
+    lines.extend(b.walk(open_group, close_group, element))
+    lines.extend(f"C{source} {b.rng.choice(arrows)} C{target} : {b.label()}" for source, target in b.edges)
+    lines.append("@enduml")
+    return "\n".join(lines)
+
+
+def _plantuml_sequence(b: _Builder) -> str:
+    lines = ["@startuml"]
+    lines.extend(f'participant "{b.label()}" as P{index}' for index in range(b.count))
+    # Messages are spread over the groups in order; nesting opens one block per level
+    messages = [f"P{source} -> P{target} : {b.label()}" for source, target in b.edges]
+    per_group = max(1, len(messages) // max(1, len(b.groups)))
+    for offset in range(0, len(messages), per_group):
+        depth = max(0, b.spec.nesting)
+        for level in range(depth):
+            lines.append(f"{_indent(level)}group {b.label()}")
+        lines.extend(_indent(depth) + message for message in messages[offset:offset + per_group])
+        for level in reversed(range(depth)):
+            lines.append(f"{_indent(level)}end")
+    lines.append("@enduml")
+    return "\n".join(lines)
+
+
+def _mermaid(b: _Builder) -> str:
+    def open_group(path, depth):
+        return [f'{_indent(depth + 1)}subgraph {_group_name(path)} ["{b.label()}"]']
+
+    def close_group(path, depth):
+        return [f"{_indent(depth + 1)}end"]
+
+    def element(index, depth):
+        return [f'{_indent(depth + 1)}n{index}["{b.label()}"]']
+
+    lines = ["flowchart TD"]
+    lines.extend(b.walk(open_group, close_group, element))
+    lines.extend(f"  n{source} -->|{b.label()}| n{target}" for source, target in b.edges)
+    return "\n".join(lines)
+
+
+def _graphviz(b: _Builder) -> str:
+    def open_group(path, depth):
+        pad = _indent(depth + 1)
+        return [f"{pad}subgraph cluster_{_group_name(path)} {{", f'{pad}  label="{b.label()}";']
+
+    def close_group(path, depth):
+        return [f"{_indent(depth + 1)}}}"]
+
+    def element(index, depth):
+        return [f'{_indent(depth + 1)}n{index} [label="{b.label()}"];']
+
+    lines = ["digraph G {", "  node [shape=box];"]
+    lines.extend(b.walk(open_group, close_group, element))
+    lines.extend(f'  n{source} -> n{target} [label="{b.label()}"];' for source, target in b.edges)
+    lines.append("}")
+    return "\n".join(lines)
+
+
+def _d2(b: _Builder) -> str:
+    paths = {}
+    lines = []
+    for path, elements in sorted(b.groups.items()):
+        prefix = "".join(f"{_group_name(path[:depth + 1])}." for depth in range(len(path)))
+        for index in elements:
+            paths[index] = f"{prefix}n{index}"
+            lines.append(f'{paths[index]}: "{b.label()}"')
+    for path in sorted(b.tree):
+        if path:
+            prefix = ".".join(_group_name(path[:depth + 1]) for depth in range(len(path)))
+            lines.append(f'{prefix}.label: "{b.label()}"')
+    lines.extend(f'{paths[source]} -> {paths[target]}: "{b.label()}"' for source, target in b.edges)
+    return "\n".join(lines)
+
+
+def _erd(b: _Builder) -> str:
+    cardinalities = ("1", "?", "*", "+")
+    lines = []
+    for index in range(b.count):
+        lines.append(f'[E{index}] {{label: "{b.label()}"}}')
+        lines.append(f"*{b.identifier()}")
+        lines.extend(b.identifier() for _ in range(3))
+        lines.append("")
+    lines.extend(
+        f"E{source} {b.rng.choice(cardinalities)}--{b.rng.choice(cardinalities)} E{target} "
+        f'{{label: "{b.label()}"}}'
+        for source, target in b.edges
+    )
+    return "\n".join(lines)
+
+
+WRITERS = {
+    "plantuml-class": _plantuml_class,
+    "plantuml-sequence": _plantuml_sequence,
+    "mermaid": _mermaid,
+    "graphviz": _graphviz,
+    "d2": _d2,
+    "erd": _erd,
+}
+
+
+def generate(kind: str, spec: Optional[WorkloadSpec] = None, **knobs) -> str:
+    """
+    Generate a synthetic diagram source.
+
+    Args:
+        kind: Workload kind (see ``KINDS``)
+        spec: Size knobs (default: ``WorkloadSpec()``)
+        **knobs: Overrides for individual ``WorkloadSpec`` fields
+
+    Returns:
+        The diagram source; the same kind and knobs always give the same source
+
+    Raises:
+        ValueError: If the kind is unknown
+    """
+    if kind not in WRITERS:
+        raise ValueError(f"Unknown workload kind: {kind}. Available: {', '.join(WRITERS)}")
+    spec = replace(spec or WorkloadSpec(), **knobs)
+    return WRITERS[kind](_Builder(kind, spec))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    defaults = WorkloadSpec()
+    parser = argparse.ArgumentParser(description="Generate synthetic diagram sources")
+    parser.add_argument("--kind", default="all", help=f"Workload kind or 'all' ({', '.join(KINDS)})")
+    parser.add_argument("--elements", type=int, default=defaults.elements, help="Classes, participants, nodes or entities")
+    parser.add_argument("--edge-density", type=float, default=defaults.edge_density, help="Edges per element")
+    parser.add_argument("--label-length", type=int, default=defaults.label_length, help="Characters per label")
+    parser.add_argument("--nesting", type=int, default=defaults.nesting, help="Depth of nested groups")
+    parser.add_argument("--seed", type=int, default=defaults.seed, help="Random seed")
+    parser.add_argument("--out", help="Write one file per kind to this directory instead of stdout")
+    args = parser.parse_args(argv)
+
+    kinds = list(KINDS) if args.kind == "all" else [args.kind]
+    unknown = [kind for kind in kinds if kind not in KINDS]
+    if unknown:
+        parser.error(f"Unknown workload kind: {unknown[0]}. Available: {', '.join(KINDS)}")
+
+    spec = WorkloadSpec(args.elements, args.edge_density, args.label_length, args.nesting, args.seed)
+    for kind in kinds:
+        source = generate(kind, spec)
+        if args.out:
+            os.makedirs(args.out, exist_ok=True)
+            path = os.path.join(args.out, f"{kind}.{EXTENSIONS[kind]}")
+            with open(path, "w") as f:
+                f.write(source + "\n")
+            print(f"{path}: {len(source)} bytes")
+        else:
+            print(source)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
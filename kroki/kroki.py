@@ -7,7 +7,6 @@ Kroki is a unified API for generating diagrams from textual descriptions.
 
 import base64
 import zlib
-import httpx
 import logging
 import json
 from typing import Dict, List, Optional, Tuple, Union
@@ -95,6 +94,10 @@ class Kroki:
             base_url: The base URL of the Kroki service.
             **http_opts: Additional options to pass to the httpx client.
         """
+        # httpx is imported here so importing this module (e.g. for
+        # LANGUAGE_OUTPUT_SUPPORT) does not load the HTTP stack
+        import httpx
+        
         self.base_url = base_url.rstrip("/")
         self.client = httpx.Client(**http_opts)
     
@@ -162,7 +165,8 @@ class Kroki:
             encoded = base64.urlsafe_b64encode(diagram_text.encode('utf-8')).decode('utf-8')
             return f"{base_playground}{encoded}"
     
-    def render_diagram(self, diagram_type: str, diagram_text: str, output_format: str = "svg") -> bytes:
+    def render_diagram(self, diagram_type: str, diagram_text: str, output_format: str = "svg",
+                       headers: Optional[Dict[str, str]] = None) -> bytes:
         """
         Render a diagram and return the image data.
         
@@ -170,6 +174,7 @@ class Kroki:
             diagram_type: The type of diagram (plantuml, mermaid, etc.)
             diagram_text: The textual description of the diagram
             output_format: The desired output format (svg, png, etc.)
+            headers: Extra request headers (e.g. ``traceparent``)
             
         Returns:
             The binary content of the rendered diagram
@@ -178,10 +183,12 @@ class Kroki:
             KrokiHTTPError: If there was an HTTP error
             KrokiConnectionError: If there was a connection error
         """
+        import httpx
+        
         url = self.get_url(diagram_type, diagram_text, output_format)
         
         try:
-            response = self.client.get(url)
+            response = self.client.get(url, headers=headers)
             response.raise_for_status()
         except httpx.HTTPStatusError as e:
             raise KrokiHTTPError(e.response, e.response.content)
@@ -190,7 +197,8 @@ class Kroki:
             
         return response.content
     
-    def generate_diagram(self, diagram_type: str, diagram_text: str, output_format: str = "svg") -> Dict:
+    def generate_diagram(self, diagram_type: str, diagram_text: str, output_format: str = "svg",
+                         headers: Optional[Dict[str, str]] = None) -> Dict:
         """
         Generate a diagram and return URLs and data.
         
@@ -198,6 +206,7 @@ class Kroki:
             diagram_type: The type of diagram (plantuml, mermaid, etc.)
             diagram_text: The textual description of the diagram
             output_format: The desired output format (svg, png, etc.)
+            headers: Extra request headers (e.g. ``traceparent``)
             
         Returns:
             A dictionary containing:
@@ -209,11 +218,13 @@ class Kroki:
             KrokiHTTPError: If there was an HTTP error
             KrokiConnectionError: If there was a connection error
         """
+        import httpx
+        
         url = self.get_url(diagram_type, diagram_text, output_format)
         playground = self.get_playground_url(diagram_type, diagram_text)
         
         try:
-            response = self.client.get(url)
+            response = self.client.get(url, headers=headers)
             response.raise_for_status()
             content = response.content
         except httpx.HTTPStatusError as e:
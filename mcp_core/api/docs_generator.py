@@ -178,7 +178,7 @@ def generate_api_docs() -> Dict[str, Any]:
     }
     
     # Add resources
-    for resource_path in ["uml://types", "uml://templates", "uml://examples", "uml://formats", "uml://server-info"]:
+    for resource_path in ["uml://types", "uml://templates", "uml://examples", "uml://formats", "uml://server-info", "uml://memory"]:
         path = f"/resources/{resource_path.replace('://', '-')}"
         
         openapi_spec["paths"][path] = {
@@ -209,7 +209,8 @@ def get_resource_description(resource_path: str) -> str:
         "uml://templates": "Template code for different UML diagram types",
         "uml://examples": "Example UML diagrams for reference",
         "uml://formats": "Supported output formats for diagrams",
-        "uml://server-info": "Server configuration and capabilities information"
+        "uml://server-info": "Server configuration and capabilities information",
+        "uml://memory": "Process memory usage and top allocation sites (with MCP_TRACEMALLOC set)"
     }
     return descriptions.get(resource_path, f"Resource for {resource_path}")
 
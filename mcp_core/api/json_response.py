@@ -0,0 +1,20 @@
+"""
+JSON response class backed by the pluggable codec
+
+Used as the FastAPI application's default response class so route results
+are serialized with orjson/msgspec when installed instead of the
+standard library.
+"""
+
+from typing import Any
+
+from starlette.responses import JSONResponse
+
+from ..core import jsoncodec
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with ``mcp_core.core.jsoncodec``."""
+
+    def render(self, content: Any) -> bytes:
+        return jsoncodec.dumps_bytes(content)
@@ -0,0 +1,147 @@
+"""
+Precomputed responses for static API routes
+
+Bodies for routes whose content never changes while the process runs
+(plugin manifest, OpenAPI YAML, supported formats) are built once and kept
+in identity, gzip and (when available) brotli encodings, each with its own
+strong ETag, so serving them is a dictionary lookup.
+"""
+
+import gzip
+import hashlib
+import logging
+from typing import Dict, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+logger = logging.getLogger(__name__)
+
+# Preferred order when the client accepts several encodings equally
+_ENCODING_PREFERENCE = ("br", "gzip", "identity")
+
+
+def parse_accept_encoding(header: Optional[str]) -> Dict[str, float]:
+    """
+    Parse an Accept-Encoding header into a mapping of coding to q-value.
+
+    Args:
+        header: Raw header value (may be None)
+
+    Returns:
+        Dictionary mapping lower-cased content codings to their quality
+    """
+    accepted: Dict[str, float] = {}
+    if not header:
+        return accepted
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+def accepts_encoding(header: Optional[str], coding: str) -> bool:
+    """Check whether an Accept-Encoding header allows ``coding``."""
+    accepted = parse_accept_encoding(header)
+    if coding in accepted:
+        return accepted[coding] > 0
+    return accepted.get("*", 0) > 0
+
+
+class PrecomputedResponse:
+    """A static body pre-encoded in every supported content coding.
+
+    Attributes:
+        media_type: Content type of the body.
+        variants: Mapping of content coding to (body, etag).
+    """
+
+    def __init__(self, body: bytes, media_type: str, max_age: int = 3600):
+        """
+        Encode the body once in all supported codings.
+
+        Args:
+            body: Uncompressed response body
+            media_type: Content type of the body
+            max_age: Cache-Control max-age in seconds
+        """
+        self.media_type = media_type
+        self.cache_control = f"public, max-age={max_age}"
+        digest = hashlib.sha256(body).hexdigest()[:32]
+
+        self.variants: Dict[str, Tuple[bytes, str]] = {
+            "identity": (body, f'"{digest}"'),
+            "gzip": (gzip.compress(body, compresslevel=9, mtime=0), f'"{digest}-gz"'),
+        }
+        if brotli is not None:
+            self.variants["br"] = (brotli.compress(body, quality=11), f'"{digest}-br"')
+
+        logger.debug(
+            f"Precomputed {media_type} response: "
+            + ", ".join(f"{coding}={len(data)}B" for coding, (data, _) in self.variants.items())
+        )
+
+    def select(self, accept_encoding: Optional[str]) -> str:
+        """
+        Choose the best available coding for an Accept-Encoding header.
+
+        Args:
+            accept_encoding: Raw Accept-Encoding header value
+
+        Returns:
+            The chosen content coding
+        """
+        accepted = parse_accept_encoding(accept_encoding)
+        best, best_quality = "identity", 0.0
+        for coding in _ENCODING_PREFERENCE:
+            if coding not in self.variants:
+                continue
+            default = 1.0 if coding == "identity" else 0.0
+            quality = accepted.get(coding, accepted.get("*", default))
+            # Strictly greater keeps the earlier (more compact) coding on ties
+            if quality > best_quality:
+                best, best_quality = coding, quality
+        return best
+
+    def respond(self, request: Request) -> Response:
+        """
+        Build the response for a request, honouring Accept-Encoding and If-None-Match.
+
+        Args:
+            request: Incoming request
+
+        Returns:
+            A 200 response with the negotiated body, or 304 if the ETag matches
+        """
+        coding = self.select(request.headers.get("accept-encoding"))
+        body, etag = self.variants[coding]
+        headers = {
+            "ETag": etag,
+            "Cache-Control": self.cache_control,
+            "Vary": "Accept-Encoding",
+        }
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match:
+            tags = {tag.strip() for tag in if_none_match.split(",")}
+            if etag in tags or "*" in tags or f"W/{etag}" in tags:
+                return Response(status_code=304, headers=headers)
+
+        if coding != "identity":
+            headers["Content-Encoding"] = coding
+        return Response(content=body, media_type=self.media_type, headers=headers)
@@ -3,5 +3,20 @@ MCP Core module initialization.
 This ensures the mcp.core module is properly recognized.
 """
 from .config import MCP_SETTINGS
-from .utils import generate_diagram
-from .server import create_mcp_server, get_mcp_server, start_server
+
+# The renderer and server are loaded on first access so that importing the
+# settings alone stays cheap
+_LAZY_ATTRIBUTES = {
+    "generate_diagram": ".utils",
+    "create_mcp_server": ".server",
+    "get_mcp_server": ".server",
+    "get_request_handler": ".server",
+    "start_server": ".server",
+}
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        import importlib
+        module = importlib.import_module(_LAZY_ATTRIBUTES[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
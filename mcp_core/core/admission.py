@@ -0,0 +1,230 @@
+"""
+Admission control for the HTTP API
+
+Bounds the number of renders in flight, queues a limited number of waiters
+behind them and applies a per-client token bucket, so that load spikes are
+turned away early with a retry hint instead of piling up on Kroki.
+"""
+
+import asyncio
+import logging
+import math
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted."""
+
+    def __init__(self, reason: str, retry_after: float):
+        self.reason = reason
+        self.retry_after = retry_after
+        super().__init__(f"Request rejected ({reason}), retry after {retry_after:.1f}s")
+
+    @property
+    def retry_after_header(self) -> str:
+        """Retry-After value in whole seconds (at least 1)."""
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at ``rate`` tokens per second.
+
+    Attributes:
+        rate: Tokens added per second.
+        capacity: Maximum number of tokens (burst size).
+    """
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float, now: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic() if now is None else now
+
+    def try_acquire(self, now: Optional[float] = None) -> float:
+        """
+        Take one token if available.
+
+        Args:
+            now: Current monotonic time (defaults to ``time.monotonic()``)
+
+        Returns:
+            0.0 if a token was taken, otherwise the number of seconds until one is available
+        """
+        now = time.monotonic() if now is None else now
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return 0.0
+        if self.rate <= 0:
+            return float("inf")
+        return (1.0 - self.tokens) / self.rate
+
+
+class AdmissionController:
+    """Bounded in-flight limit with a bounded wait queue and per-client rate limits.
+
+    Requests beyond ``max_in_flight`` wait in FIFO order; once ``max_queue``
+    requests are already waiting, new arrivals are rejected immediately.
+    Waiters that cannot get a slot within ``queue_timeout`` seconds are
+    rejected as well, so admitted latency stays bounded.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = 8,
+        max_queue: int = 32,
+        queue_timeout: float = 10.0,
+        rate: float = 0.0,
+        burst: int = 10,
+        max_clients: int = 10000,
+    ):
+        """
+        Initialize the admission controller.
+
+        Args:
+            max_in_flight: Maximum number of concurrently admitted requests
+            max_queue: Maximum number of requests waiting for a slot
+            queue_timeout: Maximum seconds a request may wait for a slot
+            rate: Per-client sustained requests per second (0 disables rate limiting)
+            burst: Per-client burst size
+            max_clients: Maximum number of tracked client buckets
+        """
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+
+        self._in_flight = 0
+        self._waiters: List[asyncio.Future] = []
+        self._buckets: Dict[str, TokenBucket] = {}
+
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_queue_timeout = 0
+        self.rejected_rate_limited = 0
+        self.max_queue_depth_seen = 0
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        """Create a controller configured from ``ADMISSION_*`` environment variables."""
+        return cls(
+            max_in_flight=int(os.environ.get("ADMISSION_MAX_IN_FLIGHT", "8")),
+            max_queue=int(os.environ.get("ADMISSION_MAX_QUEUE", "32")),
+            queue_timeout=float(os.environ.get("ADMISSION_QUEUE_TIMEOUT", "10")),
+            rate=float(os.environ.get("ADMISSION_RATE_PER_CLIENT", "0")),
+            burst=int(os.environ.get("ADMISSION_BURST_PER_CLIENT", "10")),
+        )
+
+    def _check_rate(self, client_id: str):
+        if self.rate <= 0:
+            return
+        bucket = self._buckets.get(client_id)
+        if bucket is None:
+            if len(self._buckets) >= self.max_clients:
+                # Drop the stalest half; their buckets would be full again anyway
+                stale = sorted(self._buckets.items(), key=lambda item: item[1].updated)
+                for key, _ in stale[: len(stale) // 2]:
+                    del self._buckets[key]
+            bucket = self._buckets[client_id] = TokenBucket(self.rate, self.burst)
+        wait = bucket.try_acquire()
+        if wait > 0:
+            self.rejected_rate_limited += 1
+            raise AdmissionRejected("rate_limited", wait)
+
+    def _estimated_wait(self) -> float:
+        # Rough hint: about a second per "generation" of waiters ahead, capped by the queue timeout
+        generations = (len(self._waiters) // max(1, self.max_in_flight)) + 1
+        return min(self.queue_timeout, float(generations))
+
+    async def acquire(self, client_id: str = "anonymous"):
+        """
+        Admit a request or raise ``AdmissionRejected``.
+
+        Args:
+            client_id: Identifier used for per-client rate limiting
+        """
+        self._check_rate(client_id)
+
+        if self._in_flight < self.max_in_flight and not self._waiters:
+            self._in_flight += 1
+            self.admitted += 1
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            self.rejected_queue_full += 1
+            raise AdmissionRejected("queue_full", self._estimated_wait())
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.max_queue_depth_seen = max(self.max_queue_depth_seen, len(self._waiters))
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                # Slot was handed over right as we timed out; give it back
+                self.release()
+            else:
+                waiter.cancel()
+            self.rejected_queue_timeout += 1
+            raise AdmissionRejected("queue_timeout", self._estimated_wait())
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            else:
+                waiter.cancel()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+        self.admitted += 1
+
+    def release(self):
+        """Release an admitted slot, handing it to the next waiter if any."""
+        while self._waiters:
+            waiter = self._waiters.pop(0)
+            if not waiter.done():
+                # Slot ownership passes directly to the waiter
+                waiter.set_result(None)
+                return
+        self._in_flight = max(0, self._in_flight - 1)
+
+    @asynccontextmanager
+    async def slot(self, client_id: str = "anonymous"):
+        """Async context manager holding an admission slot for the block's duration."""
+        await self.acquire(client_id)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get admission metrics.
+
+        Returns:
+            Dictionary with limits, current queue depth and rejection counters
+        """
+        return {
+            "in_flight": self._in_flight,
+            "queue_depth": len(self._waiters),
+            "max_queue_depth_seen": self.max_queue_depth_seen,
+            "max_in_flight": self.max_in_flight,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "rejected": {
+                "queue_full": self.rejected_queue_full,
+                "queue_timeout": self.rejected_queue_timeout,
+                "rate_limited": self.rejected_rate_limited,
+            },
+            "tracked_clients": len(self._buckets),
+        }
@@ -0,0 +1,168 @@
+"""
+Diagram capability index
+
+Cross-references every configured diagram type with its backend, the Kroki
+language that renders it and the output formats that language actually
+supports, so requests can be validated locally in O(1) instead of failing
+at Kroki after a network round trip.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, FrozenSet, List, Mapping, Optional, Tuple
+
+from kroki.kroki import LANGUAGE_OUTPUT_SUPPORT
+from .config import MCP_SETTINGS, DiagramType, on_settings_change
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class DiagramCapability:
+    """What a single diagram type can be rendered as.
+
+    Attributes:
+        diagram_type: Diagram type name (class, sequence, mermaid, ...).
+        backend: Backend configured for the type.
+        kroki_language: Kroki language used to render it.
+        formats: Output formats valid for this type, in preference order.
+        description: Human readable description.
+    """
+    diagram_type: str
+    backend: str
+    kroki_language: str
+    formats: Tuple[str, ...]
+    description: str = ""
+
+    def supports(self, output_format: str) -> bool:
+        """Check whether the type can be rendered in ``output_format``."""
+        return output_format in self.formats
+
+
+class CapabilityIndex:
+    """Immutable lookup of diagram capabilities by type and (type, format)."""
+
+    def __init__(self, diagram_types: Mapping[str, DiagramType], language_support: Mapping[str, List[str]]):
+        """
+        Build the index.
+
+        Args:
+            diagram_types: Configured diagram types (MCP_SETTINGS.diagram_types)
+            language_support: Output formats per Kroki language (LANGUAGE_OUTPUT_SUPPORT)
+        """
+        capabilities: Dict[str, DiagramCapability] = {}
+        pairs = set()
+        for name, config in diagram_types.items():
+            language = config.backend
+            supported = language_support.get(language, [])
+            if config.formats is None:
+                formats = tuple(supported)
+            else:
+                formats = tuple(fmt for fmt in config.formats if fmt in supported)
+            if not formats:
+                logger.warning(f"Diagram type '{name}' has no output format supported by Kroki language '{language}'")
+            key = name.lower()
+            capabilities[key] = DiagramCapability(
+                diagram_type=key,
+                backend=config.backend,
+                kroki_language=language,
+                formats=formats,
+                description=config.description,
+            )
+            pairs.update((key, fmt) for fmt in formats)
+
+        self._capabilities: Mapping[str, DiagramCapability] = MappingProxyType(capabilities)
+        self._pairs: FrozenSet[Tuple[str, str]] = frozenset(pairs)
+        self._supported_list = ", ".join(capabilities)
+
+    def __contains__(self, diagram_type: str) -> bool:
+        return diagram_type.lower() in self._capabilities
+
+    def __len__(self) -> int:
+        return len(self._capabilities)
+
+    def get(self, diagram_type: str) -> Optional[DiagramCapability]:
+        """
+        Get the capability record of a diagram type.
+
+        Args:
+            diagram_type: Diagram type name (case-insensitive)
+
+        Returns:
+            The capability record, or None if the type is unknown
+        """
+        return self._capabilities.get(diagram_type.lower())
+
+    def supports(self, diagram_type: str, output_format: str) -> bool:
+        """Check whether ``diagram_type`` can be rendered as ``output_format``."""
+        return (diagram_type.lower(), output_format) in self._pairs
+
+    def validate(self, diagram_type: str, output_format: Optional[str] = None) -> Optional[str]:
+        """
+        Validate a diagram type and optional output format.
+
+        Args:
+            diagram_type: Diagram type name (case-insensitive)
+            output_format: Requested output format (skipped if None)
+
+        Returns:
+            An error message, or None if the request is valid
+        """
+        capability = self._capabilities.get(diagram_type.lower())
+        if capability is None:
+            return f"Unsupported diagram type: {diagram_type}. Supported types: {self._supported_list}"
+        if output_format is not None and (capability.diagram_type, output_format) not in self._pairs:
+            return (
+                f"Unsupported output format '{output_format}' for {capability.diagram_type}. "
+                f"Supported formats: {', '.join(capability.formats)}"
+            )
+        return None
+
+    def types(self) -> Mapping[str, DiagramCapability]:
+        """Get all capability records keyed by diagram type."""
+        return self._capabilities
+
+    def formats(self) -> Dict[str, List[str]]:
+        """Get valid output formats keyed by diagram type."""
+        return {name: list(capability.formats) for name, capability in self._capabilities.items()}
+
+
+_capability_index: Optional[CapabilityIndex] = None
+_capability_lock = threading.Lock()
+
+
+def get_capability_index() -> CapabilityIndex:
+    """
+    Get the capability index for the current settings, building it on first use.
+
+    Returns:
+        The shared CapabilityIndex
+    """
+    global _capability_index
+    if _capability_index is None:
+        with _capability_lock:
+            if _capability_index is None:
+                _capability_index = CapabilityIndex(MCP_SETTINGS.diagram_types, LANGUAGE_OUTPUT_SUPPORT)
+                logger.info(f"Built capability index for {len(_capability_index)} diagram types")
+    return _capability_index
+
+
+def rebuild_capability_index() -> CapabilityIndex:
+    """
+    Rebuild the capability index after the diagram type configuration changed.
+
+    Returns:
+        The new CapabilityIndex
+    """
+    global _capability_index
+    with _capability_lock:
+        _capability_index = CapabilityIndex(MCP_SETTINGS.diagram_types, LANGUAGE_OUTPUT_SUPPORT)
+    return _capability_index
+
+
+@on_settings_change
+def _rebuild_on_change(changed):
+    if "diagram_types" in changed:
+        rebuild_capability_index()
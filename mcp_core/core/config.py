@@ -3,14 +3,20 @@ Configuration settings for MCP server
 """
 
 import os
-from typing import Dict, List
+import json
+import logging
+import threading
+import datetime
+from typing import Any, Callable, Dict, List, Optional, Set
 from pydantic import BaseModel
 
+logger = logging.getLogger(__name__)
+
 class DiagramType(BaseModel):
     """Configuration for a diagram type"""
     backend: str
     description: str
-    formats: List[str] = ["png", "svg"]
+    formats: Optional[List[str]] = None  # None: every format the Kroki backend supports
     
 class MCPSettings(BaseModel):
     """Configuration settings for MCP server"""
@@ -24,6 +30,28 @@ class MCPSettings(BaseModel):
     diagram_types: Dict[str, DiagramType] = {}
     plantuml_server: str = os.environ.get("PLANTUML_SERVER", "http://plantuml-server:8080")
     kroki_server: str = os.environ.get("KROKI_SERVER", "https://kroki.io")
+    minify_svg: bool = os.environ.get("MCP_MINIFY_SVG", "false").lower() == "true"
+    svg_precision: int = int(os.environ.get("MCP_SVG_PRECISION", "2"))
+    store_svgz: bool = os.environ.get("MCP_STORE_SVGZ", "false").lower() == "true"
+    render_cache_path: str = os.environ.get("MCP_RENDER_CACHE_PATH", "")
+    render_cache_max_mb: int = int(os.environ.get("MCP_RENDER_CACHE_MAX_MB", "256"))
+    kroki_timeout: float = float(os.environ.get("KROKI_TIMEOUT", "5"))
+    tool_max_concurrency: int = int(os.environ.get("MCP_TOOL_MAX_CONCURRENCY", "8"))
+    tool_deadline_seconds: float = float(os.environ.get("MCP_TOOL_DEADLINE", "60"))
+    batch_max_concurrency: int = int(os.environ.get("MCP_BATCH_MAX_CONCURRENCY", "4"))
+    batch_max_items: int = int(os.environ.get("MCP_BATCH_MAX_ITEMS", "50"))
+    tool_trace_file: str = os.environ.get("MCP_TOOL_TRACE_FILE", "")
+    memory_trace_frames: int = int(os.environ.get("MCP_TRACEMALLOC", "0"))
+    profile_dir: str = os.environ.get("MCP_PROFILE_DIR", "")
+    profile_sample_rate: float = float(os.environ.get("MCP_PROFILE_SAMPLE_RATE", "0"))
+    profile_interval_ms: float = float(os.environ.get("MCP_PROFILE_INTERVAL_MS", "2"))
+    profile_max_files: int = int(os.environ.get("MCP_PROFILE_MAX_FILES", "100"))
+    tracing_file: str = os.environ.get("MCP_TRACING_FILE", "")
+    tracing_otlp_endpoint: str = os.environ.get("MCP_TRACING_OTLP_ENDPOINT", "")
+    tracing_service_name: str = os.environ.get("MCP_TRACING_SERVICE_NAME", "uml-mcp")
+    gallery_dir: str = os.environ.get("MCP_GALLERY_DIR", os.path.join(os.getcwd(), "gallery"))
+    gallery_base_url: str = os.environ.get("MCP_GALLERY_BASE_URL", "")
+    config_file: str = os.environ.get("MCP_CONFIG_FILE", "")
 
 # Define supported diagram types with their backends
 DIAGRAM_TYPES = {
@@ -104,3 +132,112 @@ if os.environ.get("USE_LOCAL_KROKI", "false").lower() == "true":
 # Configure local PlantUML server if available
 if os.environ.get("USE_LOCAL_PLANTUML", "false").lower() == "true":
     MCP_SETTINGS.plantuml_server = os.environ.get("PLANTUML_SERVER", "http://plantuml-server:8080")
+
+# Settings that describe registered components rather than configuration
+_RUNTIME_FIELDS = {"tools", "prompts", "resources"}
+
+_settings_lock = threading.RLock()
+_settings_listeners: List[Callable[[Set[str]], None]] = []
+_settings_status: Dict[str, Any] = {"version": 0, "last_reload": None, "last_error": None}
+
+def on_settings_change(callback: Callable[[Set[str]], None]) -> Callable[[Set[str]], None]:
+    """
+    Register a callback run after settings are reloaded.
+    
+    Args:
+        callback: Called with the set of changed field names
+        
+    Returns:
+        The callback (so this can be used as a decorator)
+    """
+    _settings_listeners.append(callback)
+    return callback
+
+def apply_settings(values: Dict[str, Any]) -> Set[str]:
+    """
+    Validate new setting values and apply them to MCP_SETTINGS in place.
+    
+    The MCP_SETTINGS object is never replaced, so modules holding a reference
+    keep seeing current values; listeners resize their clients and caches.
+    
+    Args:
+        values: Mapping of setting names to new values
+        
+    Returns:
+        Set of field names whose value changed
+    """
+    with _settings_lock:
+        unknown = set(values) - set(MCPSettings.model_fields)
+        if unknown:
+            logger.warning(f"Ignoring unknown settings: {', '.join(sorted(unknown))}")
+        updates = {k: v for k, v in values.items() if k in MCPSettings.model_fields and k not in _RUNTIME_FIELDS}
+        
+        # Validate the merged configuration before touching the live object
+        merged = MCP_SETTINGS.model_dump()
+        merged.update(updates)
+        validated = MCPSettings(**merged)
+        
+        changed = set()
+        for field in updates:
+            new_value = getattr(validated, field)
+            if getattr(MCP_SETTINGS, field) != new_value:
+                setattr(MCP_SETTINGS, field, new_value)
+                changed.add(field)
+        
+        _settings_status["version"] += 1
+        _settings_status["last_reload"] = datetime.datetime.now().isoformat(timespec="seconds")
+        _settings_status["last_error"] = None
+        
+        if changed:
+            logger.info(f"Settings changed: {', '.join(sorted(changed))}")
+            for listener in list(_settings_listeners):
+                try:
+                    listener(changed)
+                except Exception as e:
+                    logger.error(f"Settings listener {getattr(listener, '__name__', listener)} failed: {str(e)}")
+        return changed
+
+def load_settings_file(path: str) -> Dict[str, Any]:
+    """
+    Read setting values from a JSON config file.
+    
+    Args:
+        path: Path to the JSON file (an object of setting names to values)
+        
+    Returns:
+        Mapping of setting names to values
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        values = json.load(f)
+    if not isinstance(values, dict):
+        raise ValueError(f"Config file {path} must contain a JSON object")
+    return values
+
+def reload_settings(path: Optional[str] = None) -> Set[str]:
+    """
+    Reload settings from the config file and apply them in place.
+    
+    Args:
+        path: Config file path (defaults to MCP_SETTINGS.config_file)
+        
+    Returns:
+        Set of field names whose value changed
+    """
+    path = path or MCP_SETTINGS.config_file
+    if not path:
+        raise ValueError("No config file configured (set MCP_CONFIG_FILE)")
+    try:
+        return apply_settings(load_settings_file(path))
+    except Exception as e:
+        _settings_status["last_error"] = str(e)
+        logger.error(f"Failed to reload settings from {path}: {str(e)}")
+        raise
+
+def get_settings_status() -> Dict[str, Any]:
+    """
+    Get the reload status of the settings.
+    
+    Returns:
+        Dictionary with config version, last reload time and last error
+    """
+    return dict(_settings_status)
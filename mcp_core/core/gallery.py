@@ -0,0 +1,264 @@
+"""
+Pre-rendered example gallery
+
+Renders every DiagramExamples and DiagramTemplates entry in every
+supported image format once, at build time, into a local bundle:
+
+    <gallery_dir>/objects/<sha[:2]>/<sha256>.<format>   content-addressed renders
+    <gallery_dir>/index.json                             versioned index
+
+Rebuilding only renders sources that changed since the previous index;
+identical renders share one file. The ``uml://gallery`` resource serves
+the index, so showing an example never waits for Kroki.
+
+Usage:
+    python -m mcp_core.core.gallery --output gallery --formats svg,png
+"""
+
+import argparse
+import datetime
+import hashlib
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from kroki.kroki import LANGUAGE_OUTPUT_SUPPORT
+from .config import MCP_SETTINGS
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILENAME = "index.json"
+OBJECTS_DIRNAME = "objects"
+
+# Formats worth pre-rendering (text formats like txt/base64 are cheap to produce live)
+DEFAULT_FORMATS = ("svg", "png", "pdf", "jpeg")
+
+# Renders (language, source, format) to bytes
+Renderer = Callable[[str, str, str], bytes]
+
+
+def gallery_sources() -> Dict[str, Dict[str, str]]:
+    """
+    Collect the example and template sources that have real content.
+
+    Returns:
+        {"examples": {language: source}, "templates": {language: source}}
+    """
+    from kroki.kroki_templates import DiagramExamples, DiagramTemplates
+
+    sources: Dict[str, Dict[str, str]] = {"examples": {}, "templates": {}}
+    for language in LANGUAGE_OUTPUT_SUPPORT:
+        example = DiagramExamples.get_example(language)
+        if not example.startswith("# No specific example"):
+            sources["examples"][language] = example
+        template = DiagramTemplates.get_template(language)
+        if not template.startswith("# No specific template"):
+            sources["templates"][language] = template
+    return sources
+
+
+def _source_key(language: str, output_format: str, source: str, server: str) -> str:
+    digest = hashlib.sha256()
+    for part in (server, language, output_format, source):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _object_path(sha: str, output_format: str) -> str:
+    return f"{OBJECTS_DIRNAME}/{sha[:2]}/{sha}.{output_format}"
+
+
+def _write_atomic(path: str, content: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def load_index(gallery_dir: str) -> Optional[Dict[str, Any]]:
+    """
+    Load a gallery index.
+
+    Args:
+        gallery_dir: Gallery bundle directory
+
+    Returns:
+        The parsed index, or None if there is no (valid) index
+    """
+    try:
+        with open(os.path.join(gallery_dir, INDEX_FILENAME), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def build_gallery(
+    gallery_dir: str,
+    formats: Iterable[str] = DEFAULT_FORMATS,
+    languages: Optional[Iterable[str]] = None,
+    renderer: Optional[Renderer] = None,
+    server: Optional[str] = None,
+    max_workers: int = 4
+) -> Dict[str, Any]:
+    """
+    Render the gallery into a bundle directory and write its index.
+
+    Args:
+        gallery_dir: Bundle directory (created if needed)
+        formats: Output formats to render where the language supports them
+        languages: Restrict to these Kroki languages (default: all with content)
+        renderer: Render function (default: the shared Kroki client)
+        server: Renderer identifier recorded in the index (default: MCP_SETTINGS.kroki_server)
+        max_workers: Concurrent renders
+
+    Returns:
+        The written index
+    """
+    if renderer is None:
+        from .utils import get_kroki_client
+        renderer = get_kroki_client().render_diagram
+    server = server if server is not None else MCP_SETTINGS.kroki_server
+    formats = list(formats)
+    wanted = set(languages) if languages is not None else None
+
+    previous = load_index(gallery_dir) or {}
+    previous_renders = previous.get("renders", {})
+
+    # One job per (kind, language, format)
+    jobs: List[Tuple[str, str, str, str]] = []
+    for kind, entries in gallery_sources().items():
+        for language, source in entries.items():
+            if wanted is not None and language not in wanted:
+                continue
+            for output_format in formats:
+                if output_format in LANGUAGE_OUTPUT_SUPPORT.get(language, []):
+                    jobs.append((kind, language, output_format, source))
+
+    renders: Dict[str, Dict[str, Any]] = {}
+    entries: Dict[str, Dict[str, Dict[str, Any]]] = {"examples": {}, "templates": {}}
+    lock = threading.Lock()
+    counts = {"rendered": 0, "reused": 0, "failed": 0}
+
+    def run(job: Tuple[str, str, str, str]):
+        kind, language, output_format, source = job
+        key = _source_key(language, output_format, source, server)
+        record = previous_renders.get(key)
+        if record and os.path.exists(os.path.join(gallery_dir, record["path"])):
+            outcome = "reused"
+        else:
+            try:
+                content = renderer(language, source, output_format)
+            except Exception as e:
+                logger.warning(f"Gallery render failed for {kind}/{language}.{output_format}: {str(e)}")
+                with lock:
+                    counts["failed"] += 1
+                    entries[kind].setdefault(language, {})[output_format] = {"error": str(e)}
+                return
+            sha = hashlib.sha256(content).hexdigest()
+            record = {"path": _object_path(sha, output_format), "sha256": sha, "bytes": len(content)}
+            target = os.path.join(gallery_dir, record["path"])
+            if not os.path.exists(target):
+                _write_atomic(target, content)
+            outcome = "rendered"
+        with lock:
+            counts[outcome] += 1
+            renders[key] = record
+            entries[kind].setdefault(language, {})[output_format] = dict(record)
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="gallery") as executor:
+        list(executor.map(run, jobs))
+
+    # The version identifies the rendered content, not the build time
+    version_digest = hashlib.sha256()
+    for key in sorted(renders):
+        version_digest.update(f"{key}:{renders[key]['sha256']}\n".encode("utf-8"))
+
+    index = {
+        "version": version_digest.hexdigest()[:16],
+        "built_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "server": server,
+        "formats": formats,
+        "entries": entries,
+        "renders": renders,
+        "stats": counts,
+    }
+    _write_atomic(os.path.join(gallery_dir, INDEX_FILENAME), json.dumps(index, indent=2, sort_keys=True).encode("utf-8"))
+    logger.info(
+        f"Gallery {index['version']} written to {gallery_dir}: "
+        f"{counts['rendered']} rendered, {counts['reused']} reused, {counts['failed']} failed"
+    )
+    return index
+
+
+def gallery_view(gallery_dir: str, base_url: str = "") -> Dict[str, Any]:
+    """
+    Describe a gallery bundle for clients, with local paths or URLs.
+
+    Args:
+        gallery_dir: Gallery bundle directory
+        base_url: Public URL of the bundle directory (local paths are returned if empty)
+
+    Returns:
+        Dictionary with availability, version and {kind: {language: {format: location}}}
+    """
+    index = load_index(gallery_dir)
+    if index is None:
+        return {
+            "available": False,
+            "message": "Gallery not built. Run: python -m mcp_core.core.gallery --output " + gallery_dir,
+        }
+
+    root = os.path.abspath(gallery_dir)
+    view: Dict[str, Dict[str, Dict[str, str]]] = {}
+    for kind, languages in index.get("entries", {}).items():
+        view[kind] = {}
+        for language, formats in languages.items():
+            locations = {}
+            for output_format, record in formats.items():
+                if "path" not in record:
+                    continue
+                if base_url:
+                    locations[output_format] = base_url.rstrip("/") + "/" + record["path"]
+                else:
+                    locations[output_format] = os.path.join(root, record["path"])
+            if locations:
+                view[kind][language] = locations
+    return {
+        "available": True,
+        "version": index.get("version"),
+        "built_at": index.get("built_at"),
+        "entries": view,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Pre-render the example and template gallery")
+    parser.add_argument("--output", default=MCP_SETTINGS.gallery_dir, help="Gallery directory")
+    parser.add_argument("--formats", default=",".join(DEFAULT_FORMATS), help="Comma-separated output formats")
+    parser.add_argument("--languages", help="Comma-separated Kroki languages (default: all)")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent renders")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    index = build_gallery(
+        args.output,
+        formats=[fmt for fmt in args.formats.split(",") if fmt],
+        languages=args.languages.split(",") if args.languages else None,
+        max_workers=args.workers,
+    )
+    return 1 if index["stats"]["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+"""
+Pluggable JSON codec
+
+Uses orjson or msgspec when installed and falls back to the standard
+library otherwise. The backend can be forced with MCP_JSON_CODEC
+(``orjson``, ``msgspec`` or ``json``). All backends produce compact,
+UTF-8 JSON and accept the same inputs the server actually sends: dicts
+with string (or int) keys, lists, strings, numbers, booleans and None.
+
+Backends may format the same float differently (``1e16`` is ``1e+16`` for
+the standard library and ``1e16`` for orjson), so canonical output
+(``sort_keys=True``, used for ETags) always comes from the standard
+library encoder and does not depend on what is installed. Non-finite
+floats are not valid JSON: canonical output rejects them with ValueError,
+while orjson and msgspec write them as ``null`` in regular output.
+
+Values serialized ahead of time can be wrapped in ``RawJSON`` and are
+then copied into the output as they are. This is supported for the values
+of a top-level object, or of objects in a top-level list, which is where
+transports put results.
+"""
+
+import json
+import logging
+import os
+from typing import Any, Callable, Dict, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+
+class RawJSON:
+    """Already serialized JSON, embedded verbatim by ``dumps`` and ``dumps_bytes``.
+
+    Attributes:
+        data: Compact UTF-8 JSON bytes.
+    """
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: bytes):
+        self.data = data
+
+    def __repr__(self) -> str:
+        return f"RawJSON({self.data[:40]!r}{'...' if len(self.data) > 40 else ''})"
+
+
+def _canonical_dumps(obj: Any) -> bytes:
+    return json.dumps(obj, sort_keys=True, ensure_ascii=False, separators=(",", ":"),
+                      allow_nan=False).encode("utf-8")
+
+
+def _stdlib_codec() -> Tuple[Callable[[Any, bool], bytes], Callable[[Union[str, bytes]], Any]]:
+    def dumps(obj: Any, sort_keys: bool = False) -> bytes:
+        if sort_keys:
+            return _canonical_dumps(obj)
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return dumps, json.loads
+
+
+def _orjson_codec():
+    import orjson
+
+    def dumps(obj: Any, sort_keys: bool = False) -> bytes:
+        if sort_keys:
+            return _canonical_dumps(obj)
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return dumps, orjson.loads
+
+
+def _msgspec_codec():
+    import msgspec
+
+    encoder = msgspec.json.Encoder()
+    decoder = msgspec.json.Decoder()
+
+    def dumps(obj: Any, sort_keys: bool = False) -> bytes:
+        if sort_keys:
+            return _canonical_dumps(obj)
+        return encoder.encode(obj)
+    return dumps, decoder.decode
+
+
+_BACKENDS: Dict[str, Callable] = {
+    "orjson": _orjson_codec,
+    "msgspec": _msgspec_codec,
+    "json": _stdlib_codec,
+}
+
+
+def load_backend(name: str):
+    """
+    Load a codec backend by name.
+
+    Args:
+        name: ``orjson``, ``msgspec`` or ``json``
+
+    Returns:
+        (dumps, loads) pair; dumps returns bytes
+
+    Raises:
+        ImportError: If the backend's package is not installed
+        ValueError: If the name is unknown
+    """
+    if name not in _BACKENDS:
+        raise ValueError(f"Unknown JSON codec: {name}. Available: {', '.join(_BACKENDS)}")
+    return _BACKENDS[name]()
+
+
+def _select_backend() -> Tuple[str, Callable, Callable]:
+    requested = os.environ.get("MCP_JSON_CODEC", "").lower()
+    candidates = [requested] if requested else ["orjson", "msgspec", "json"]
+    for name in candidates:
+        try:
+            dumps_bytes, loads_fn = load_backend(name)
+            return name, dumps_bytes, loads_fn
+        except ImportError:
+            if requested:
+                logger.warning(f"JSON codec '{requested}' is not installed, using the standard library")
+        except ValueError as e:
+            logger.warning(str(e))
+    dumps_bytes, loads_fn = _stdlib_codec()
+    return "json", dumps_bytes, loads_fn
+
+
+BACKEND, _dumps_bytes, _loads = _select_backend()
+
+
+def dumps_bytes(obj: Any, sort_keys: bool = False) -> bytes:
+    """
+    Serialize to compact UTF-8 JSON bytes.
+
+    Args:
+        obj: Value to serialize
+        sort_keys: Sort object keys (for canonical output such as ETags)
+
+    Returns:
+        JSON bytes
+    """
+    if type(obj) is dict:
+        if _has_raw(obj):
+            return _dumps_with_raw(obj, sort_keys)
+    elif type(obj) is list and any(type(item) is dict and _has_raw(item) for item in obj):
+        return b"[" + b",".join(dumps_bytes(item, sort_keys) for item in obj) + b"]"
+    return _dumps_bytes(obj, sort_keys)
+
+
+def _has_raw(obj: Dict[Any, Any]) -> bool:
+    for value in obj.values():
+        if type(value) is RawJSON:
+            return True
+    return False
+
+
+def _dumps_with_raw(obj: Dict[Any, Any], sort_keys: bool) -> bytes:
+    items = sorted(obj.items()) if sort_keys else obj.items()
+    return b"{" + b",".join(
+        _dumps_bytes(str(key), False) + b":" + (value.data if type(value) is RawJSON else _dumps_bytes(value, sort_keys))
+        for key, value in items
+    ) + b"}"
+
+
+def dumps(obj: Any, sort_keys: bool = False) -> str:
+    """
+    Serialize to a compact JSON string.
+
+    Args:
+        obj: Value to serialize
+        sort_keys: Sort object keys (for canonical output such as ETags)
+
+    Returns:
+        JSON text
+    """
+    return dumps_bytes(obj, sort_keys).decode("utf-8")
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """
+    Parse JSON text or bytes.
+
+    Args:
+        data: JSON document
+
+    Returns:
+        The decoded value
+
+    Raises:
+        ValueError: If the document is not valid JSON
+    """
+    return _loads(data)
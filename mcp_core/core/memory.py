@@ -0,0 +1,188 @@
+"""
+Process memory diagnostics
+
+Reports resident memory and, when ``tracemalloc`` is tracing, the top
+allocation sites and how they changed since the previous report. Tracing
+is off by default because it slows allocation down; start it with
+``MCP_TRACEMALLOC=<frames>`` (or Python's own ``PYTHONTRACEMALLOC``).
+
+The ``uml://memory`` resource and the soak harness (``benchmarks/soak.py``)
+both build on these helpers.
+"""
+
+import gc
+import logging
+import os
+import sys
+import threading
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Allocations made by the tracing machinery itself
+_IGNORED_FILES = (
+    tracemalloc.__file__,
+    "<frozen importlib._bootstrap>",
+    "<frozen importlib._bootstrap_external>",
+    "<unknown>",
+)
+
+_last_snapshot: Optional[tracemalloc.Snapshot] = None
+_snapshot_lock = threading.Lock()
+
+
+def start_tracing(frames: int) -> bool:
+    """
+    Start tracing allocations if it is not already running.
+
+    Args:
+        frames: Frames stored per allocation (0 leaves tracing off)
+
+    Returns:
+        True if tracing is running afterwards
+    """
+    if frames > 0 and not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+        logger.info(f"Tracing memory allocations ({frames} frame(s) per allocation)")
+    return tracemalloc.is_tracing()
+
+
+def rss_bytes() -> Optional[int]:
+    """Current resident set size, or None where it cannot be read."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Peak resident set size, or None where it cannot be read."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def take_snapshot(exclude: Optional[List[str]] = None) -> tracemalloc.Snapshot:
+    """
+    Take a tracemalloc snapshot without the tracing machinery's own allocations.
+
+    Args:
+        exclude: Additional filename patterns (fnmatch) to leave out
+
+    Returns:
+        Filtered snapshot
+    """
+    filters = [tracemalloc.Filter(False, pattern) for pattern in list(_IGNORED_FILES) + list(exclude or [])]
+    return tracemalloc.take_snapshot().filter_traces(filters)
+
+
+def site_name(traceback: tracemalloc.Traceback) -> str:
+    """Readable allocation site: ``file:line`` frames, innermost last, relative to the working directory."""
+    cwd = os.getcwd() + os.sep
+    frames = [f"{frame.filename.replace(cwd, '', 1)}:{frame.lineno}" for frame in traceback]
+    return " <- ".join(reversed(frames))
+
+
+def top_sites(snapshot: tracemalloc.Snapshot, limit: int = 10, key_type: str = "lineno") -> List[Dict[str, Any]]:
+    """
+    Largest allocation sites in a snapshot.
+
+    Args:
+        snapshot: Snapshot to summarize
+        limit: Sites to return
+        key_type: ``lineno`` (allocating line) or ``traceback`` (all stored frames)
+
+    Returns:
+        ``{site, size_bytes, count}`` per site, largest first
+    """
+    return [
+        {"site": site_name(stat.traceback), "size_bytes": stat.size, "count": stat.count}
+        for stat in snapshot.statistics(key_type)[:limit]
+    ]
+
+
+def compare_snapshots(
+    old: tracemalloc.Snapshot,
+    new: tracemalloc.Snapshot,
+    limit: int = 10,
+    key_type: str = "lineno"
+) -> List[Dict[str, Any]]:
+    """
+    Allocation sites that changed most between two snapshots.
+
+    Args:
+        old: Earlier snapshot
+        new: Later snapshot
+        limit: Sites to return
+        key_type: ``lineno`` (allocating line) or ``traceback`` (all stored frames)
+
+    Returns:
+        ``{site, size_bytes, size_diff_bytes, count, count_diff}`` per site, largest change first
+    """
+    return [
+        {
+            "site": site_name(stat.traceback),
+            "size_bytes": stat.size,
+            "size_diff_bytes": stat.size_diff,
+            "count": stat.count,
+            "count_diff": stat.count_diff,
+        }
+        for stat in new.compare_to(old, key_type)[:limit]
+    ]
+
+
+def memory_report(limit: int = 10) -> Dict[str, Any]:
+    """
+    Build the ``uml://memory`` report.
+
+    Each report with tracing on also lists the sites that grew most since
+    the previous report, so reading it periodically shows where memory goes.
+
+    Args:
+        limit: Allocation sites per list
+
+    Returns:
+        Dictionary with process, garbage collector and tracemalloc sections
+    """
+    global _last_snapshot
+    report: Dict[str, Any] = {
+        "process": {
+            "pid": os.getpid(),
+            "rss_bytes": rss_bytes(),
+            "peak_rss_bytes": peak_rss_bytes(),
+            "threads": threading.active_count(),
+        },
+        "gc": {
+            "counts": list(gc.get_count()),
+            "collections": [generation["collections"] for generation in gc.get_stats()],
+            "uncollectable": len(gc.garbage),
+        },
+    }
+
+    if not tracemalloc.is_tracing():
+        report["tracemalloc"] = {
+            "tracing": False,
+            "hint": "Set MCP_TRACEMALLOC=<frames> (or PYTHONTRACEMALLOC) to list top allocation sites",
+        }
+        return report
+
+    traced, peak = tracemalloc.get_traced_memory()
+    snapshot = take_snapshot()
+    with _snapshot_lock:
+        previous, _last_snapshot = _last_snapshot, snapshot
+    report["tracemalloc"] = {
+        "tracing": True,
+        "frames": tracemalloc.get_traceback_limit(),
+        "traced_bytes": traced,
+        "peak_traced_bytes": peak,
+        "overhead_bytes": tracemalloc.get_tracemalloc_memory(),
+        "top": top_sites(snapshot, limit),
+        "growth_since_last_report": compare_snapshots(previous, snapshot, limit) if previous is not None else None,
+    }
+    return report
@@ -0,0 +1,336 @@
+"""
+On-demand request profiling
+
+Profiles single tool calls or HTTP requests with a sampling profiler and
+writes the stacks in collapsed format (``frame;frame;frame count`` per
+line), which flamegraph.pl, speedscope and inferno read directly.
+
+Profiling is off unless ``MCP_PROFILE_DIR`` is set. A request is then
+profiled when the caller asks for it (the ``X-Profile`` header, a
+``profile`` flag on MCP requests) or when it is picked at random with
+probability ``MCP_PROFILE_SAMPLE_RATE``. Requests that are not profiled
+pay one context variable lookup.
+
+One sampler thread runs while any profile is active. Every
+``MCP_PROFILE_INTERVAL_MS`` it reads the stacks of the threads registered
+with each active profile; threads join the profile of their context with
+``thread_scope()``, so work handed to a worker thread is sampled too as
+long as the context travels with it.
+"""
+
+import contextvars
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional
+
+from .config import MCP_SETTINGS
+
+logger = logging.getLogger(__name__)
+
+PROFILE_SUFFIX = ".collapsed"
+
+_current_session: "contextvars.ContextVar[Optional[ProfileSession]]" = contextvars.ContextVar(
+    "mcp_profile_session", default=None
+)
+# Set while the caller explicitly asked for a profile; collects the written paths
+_requested: "contextvars.ContextVar[Optional[List[str]]]" = contextvars.ContextVar(
+    "mcp_profile_requested", default=None
+)
+
+_file_counter = 0
+_file_lock = threading.Lock()
+
+
+def enabled() -> bool:
+    """Whether profiling is configured (``MCP_PROFILE_DIR`` is set)."""
+    return bool(MCP_SETTINGS.profile_dir)
+
+
+def is_truthy(value: Any) -> bool:
+    """Interpret a header or query flag such as ``1``, ``true`` or ``yes``."""
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    return bool(value)
+
+
+def should_profile(requested: Any = False) -> bool:
+    """
+    Decide whether to profile a request.
+
+    Args:
+        requested: Flag sent by the caller (header value, query value or bool)
+
+    Returns:
+        True if profiling is enabled and the request asked for it or was sampled
+    """
+    if not MCP_SETTINGS.profile_dir:
+        return False
+    if is_truthy(requested) or _requested.get() is not None:
+        return True
+    rate = MCP_SETTINGS.profile_sample_rate
+    return rate > 0 and random.random() < rate
+
+
+@contextmanager
+def requested() -> Iterator[List[str]]:
+    """
+    Ask for profiles of everything run in this context.
+
+    Yields:
+        List that receives the path of each profile written meanwhile
+    """
+    paths: List[str] = []
+    token = _requested.set(paths)
+    try:
+        yield paths
+    finally:
+        _requested.reset(token)
+
+
+@lru_cache(maxsize=1024)
+def _short_path(filename: str) -> str:
+    cwd = os.getcwd() + os.sep
+    if filename.startswith(cwd):
+        return filename[len(cwd):]
+    # Library code: keep the path from the package directory on
+    for marker in ("site-packages" + os.sep, "dist-packages" + os.sep):
+        index = filename.rfind(marker)
+        if index >= 0:
+            return filename[index + len(marker):]
+    return filename
+
+
+def collapse_stack(frame, root: str) -> str:
+    """
+    Format a stack as one collapsed-stack key, outermost frame first.
+
+    Frames are named ``function (file:first line)`` so samples from any line
+    of a function merge into one flamegraph box.
+
+    Args:
+        frame: Innermost frame
+        root: Name of the bottom frame (the thread name)
+
+    Returns:
+        Semicolon-separated frames
+    """
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    names.append(root)
+    return ";".join(reversed(names)).replace("\n", " ")
+
+
+class ProfileSession:
+    """Stacks sampled from the threads working on one request.
+
+    Attributes:
+        name: What is being profiled (tool name or route path).
+        threads: Thread ids being sampled, mapped to their names.
+        stacks: Sample counts per collapsed stack.
+        samples: Sampling ticks taken while the profile was active.
+        path: File the profile was written to, once written.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started = time.time()
+        self.threads: Dict[int, str] = {}
+        self.stacks: "Counter[str]" = Counter()
+        self.samples = 0
+        self.path: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def add_thread(self, thread: Optional[threading.Thread] = None):
+        thread = thread or threading.current_thread()
+        with self._lock:
+            self.threads[thread.ident] = thread.name
+
+    def remove_thread(self, thread: Optional[threading.Thread] = None):
+        thread = thread or threading.current_thread()
+        with self._lock:
+            self.threads.pop(thread.ident, None)
+
+    def sample(self, frames: Dict[int, Any]):
+        """Record the current stack of each registered thread."""
+        with self._lock:
+            threads = list(self.threads.items())
+            self.samples += 1
+            for ident, thread_name in threads:
+                frame = frames.get(ident)
+                if frame is not None:
+                    self.stacks[collapse_stack(frame, thread_name)] += 1
+
+    def collapsed(self) -> str:
+        """Profile in collapsed-stack format, heaviest stacks first."""
+        with self._lock:
+            return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def write(self, directory: str) -> str:
+        """
+        Write the profile to a new file in ``directory``.
+
+        Args:
+            directory: Output directory (created if missing)
+
+        Returns:
+            Path of the written file
+        """
+        global _file_counter
+        os.makedirs(directory, exist_ok=True)
+        with _file_lock:
+            _file_counter += 1
+            counter = _file_counter
+        stamp = time.strftime("%Y%m%dT%H%M%S", time.localtime(self.started))
+        label = re.sub(r"[^A-Za-z0-9_.-]+", "_", self.name).strip("_") or "request"
+        path = os.path.join(directory, f"{stamp}-{os.getpid()}-{counter:06d}-{label}{PROFILE_SUFFIX}")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.collapsed())
+        self.path = path
+        return path
+
+
+class _Sampler:
+    """Shared sampling thread, running only while profiles are active."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions: List[ProfileSession] = []
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, session: ProfileSession):
+        with self._lock:
+            self._sessions.append(session)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="mcp-profiler", daemon=True)
+                self._thread.start()
+
+    def remove(self, session: ProfileSession):
+        with self._lock:
+            self._sessions.remove(session)
+
+    def _run(self):
+        interval = max(0.0005, MCP_SETTINGS.profile_interval_ms / 1000)
+        while True:
+            with self._lock:
+                sessions = list(self._sessions)
+                if not sessions:
+                    self._thread = None
+                    return
+            frames = sys._current_frames()
+            for session in sessions:
+                session.sample(frames)
+            del frames
+            time.sleep(interval)
+
+
+_sampler = _Sampler()
+
+
+def prune(directory: str, keep: int):
+    """
+    Delete the oldest profiles so at most ``keep`` remain.
+
+    Args:
+        directory: Profile directory
+        keep: Profiles to keep (0 keeps all)
+    """
+    if keep <= 0:
+        return
+    try:
+        names = sorted(name for name in os.listdir(directory) if name.endswith(PROFILE_SUFFIX))
+    except OSError:
+        return
+    for name in names[:-keep]:
+        try:
+            os.remove(os.path.join(directory, name))
+        except OSError:
+            pass
+
+
+@contextmanager
+def profile(name: str, sample_current: bool = True) -> Iterator[ProfileSession]:
+    """
+    Profile the current thread (and threads that join with ``thread_scope``).
+
+    Inside an active profile the current thread joins it instead, and the
+    outer profile writes the file.
+
+    Args:
+        name: What is being profiled, used in the file name
+        sample_current: Sample the current thread too; pass False on an event
+            loop thread, whose stacks would mix in other requests
+
+    Yields:
+        The active session; ``path`` is set after the block once written
+    """
+    session = _current_session.get()
+    if session is not None:
+        if not sample_current:
+            yield session
+            return
+        with thread_scope():
+            yield session
+        return
+
+    session = ProfileSession(name)
+    if sample_current:
+        session.add_thread()
+    token = _current_session.set(session)
+    _sampler.add(session)
+    try:
+        yield session
+    finally:
+        _sampler.remove(session)
+        _current_session.reset(token)
+        directory = MCP_SETTINGS.profile_dir
+        if session.stacks and directory:
+            try:
+                path = session.write(directory)
+                prune(directory, MCP_SETTINGS.profile_max_files)
+                logger.info(f"Wrote profile of {name} ({session.samples} samples) to {path}")
+            except OSError as e:
+                logger.warning(f"Could not write profile of {name}: {e}")
+            else:
+                paths = _requested.get()
+                if paths is not None:
+                    paths.append(path)
+        else:
+            logger.debug(f"Profile of {name} took no samples")
+
+
+@contextmanager
+def thread_scope() -> Iterator[Optional[ProfileSession]]:
+    """
+    Sample the current thread as part of the profile active in this context.
+
+    Use in worker threads that received the context of a profiled request
+    (``run_in_threadpool``, ``contextvars.copy_context().run``). Without an
+    active profile this does nothing.
+
+    Yields:
+        The active session, or None
+    """
+    session = _current_session.get()
+    if session is None:
+        yield None
+        return
+    current = threading.current_thread()
+    already = current.ident in session.threads
+    if not already:
+        session.add_thread(current)
+    try:
+        yield session
+    finally:
+        if not already:
+            session.remove_thread(current)
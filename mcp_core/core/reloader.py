@@ -0,0 +1,117 @@
+"""
+Hot reload of runtime configuration
+
+Re-reads the JSON config file on SIGHUP or when its modification time
+changes and applies it to MCP_SETTINGS in place, so a running server
+keeps its sessions, HTTP clients and warm caches across config changes.
+"""
+
+import logging
+import os
+import signal
+import threading
+from typing import Optional
+
+from .config import MCP_SETTINGS, reload_settings
+
+logger = logging.getLogger(__name__)
+
+
+class ConfigReloader:
+    """Watches a config file and reloads settings on change or SIGHUP.
+
+    Attributes:
+        path: Path of the JSON config file.
+        poll_interval: Seconds between modification checks (0 disables polling).
+    """
+
+    def __init__(self, path: str, poll_interval: float = 2.0):
+        """
+        Initialize the reloader.
+
+        Args:
+            path: Path of the JSON config file
+            poll_interval: Seconds between modification checks (0 disables polling)
+        """
+        self.path = path
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._mtime = self._current_mtime()
+
+    def _current_mtime(self) -> Optional[float]:
+        try:
+            return os.stat(self.path).st_mtime
+        except OSError:
+            return None
+
+    def reload(self) -> bool:
+        """
+        Reload settings from the config file now.
+
+        Returns:
+            True if the file was applied, False if it could not be loaded
+        """
+        self._mtime = self._current_mtime()
+        try:
+            changed = reload_settings(self.path)
+        except Exception:
+            # Keep running on the previous settings; the error is logged and reported in server-info
+            return False
+        logger.info(f"Reloaded settings from {self.path} ({len(changed)} changed)")
+        return True
+
+    def install_signal_handler(self) -> bool:
+        """
+        Reload on SIGHUP (POSIX only, must be called from the main thread).
+
+        Returns:
+            True if the handler was installed
+        """
+        if not hasattr(signal, "SIGHUP") or threading.current_thread() is not threading.main_thread():
+            return False
+
+        def _handle_sighup(signum, frame):
+            # Do the work off the signal handler
+            threading.Thread(target=self.reload, name="config-reload", daemon=True).start()
+
+        signal.signal(signal.SIGHUP, _handle_sighup)
+        logger.info("Settings reload on SIGHUP enabled")
+        return True
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            mtime = self._current_mtime()
+            if mtime is not None and mtime != self._mtime:
+                self.reload()
+
+    def start(self):
+        """Install the SIGHUP handler and start polling the file for changes."""
+        self.install_signal_handler()
+        if self.poll_interval > 0 and self._thread is None:
+            self._thread = threading.Thread(target=self._watch, name="config-watch", daemon=True)
+            self._thread.start()
+            logger.info(f"Watching {self.path} for settings changes every {self.poll_interval}s")
+
+    def stop(self):
+        """Stop polling the file."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_interval + 1)
+            self._thread = None
+
+
+def start_config_reloader() -> Optional[ConfigReloader]:
+    """
+    Load the configured config file and keep watching it.
+
+    Returns:
+        The running ConfigReloader, or None if no config file is configured
+    """
+    path = MCP_SETTINGS.config_file
+    if not path:
+        return None
+    reloader = ConfigReloader(path, float(os.environ.get("MCP_CONFIG_WATCH_INTERVAL", "2")))
+    reloader.reload()
+    reloader.start()
+    return reloader
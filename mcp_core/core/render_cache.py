@@ -0,0 +1,265 @@
+"""
+Shared render cache for multi-worker deployments
+
+Rendered diagrams are stored in a single SQLite database in WAL mode, so
+every worker process on a host (uvicorn/gunicorn workers, several stdio
+servers) reads and fills the same cache. Writers serialize through
+``BEGIN IMMEDIATE`` transactions; readers never block. When the stored
+bytes exceed the configured limit, least recently used entries are evicted.
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Optional
+
+from .config import MCP_SETTINGS
+
+logger = logging.getLogger(__name__)
+
+# Access times are refreshed at most this often to keep hits read-mostly
+_ACCESS_RESOLUTION_SECONDS = 60.0
+
+# Evict down to this fraction of the limit so eviction does not run on every put
+_EVICTION_LOW_WATER = 0.9
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    url TEXT,
+    playground TEXT,
+    content BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (name, value) VALUES ('total_bytes', 0);
+"""
+
+
+class RenderCache:
+    """LRU cache of rendered diagrams shared between processes through SQLite.
+
+    Attributes:
+        path: Path of the SQLite database file.
+        max_bytes: Maximum total size of stored diagram bodies.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024):
+        """
+        Open (and create if needed) the cache database.
+
+        Args:
+            path: Path of the SQLite database file
+            max_bytes: Maximum total size of stored diagram bodies
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._connection().executescript(_SCHEMA)
+
+    @staticmethod
+    def make_key(backend: str, output_format: str, code: str, server: str = "") -> str:
+        """
+        Build the cache key for a render request.
+
+        Args:
+            backend: Kroki diagram language
+            output_format: Output format
+            code: Diagram source as sent to the renderer
+            server: Renderer base URL (different servers may render differently)
+
+        Returns:
+            Hex digest identifying the render
+        """
+        digest = hashlib.sha256()
+        for part in (server, backend, output_format, code):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread and per process (connections must not cross a fork)
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached render.
+
+        Args:
+            key: Cache key from ``make_key``
+
+        Returns:
+            Dictionary with url, playground and content, or None on a miss
+        """
+        try:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT url, playground, content FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                now = time.time()
+                conn.execute(
+                    "UPDATE entries SET accessed = ? WHERE key = ? AND accessed < ?",
+                    (now, key, now - _ACCESS_RESOLUTION_SECONDS),
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Render cache lookup failed: {str(e)}")
+            row = None
+
+        with self._stats_lock:
+            if row is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if row is None:
+            return None
+        return {"url": row[0], "playground": row[1], "content": bytes(row[2])}
+
+    def put(self, key: str, url: Optional[str], playground: Optional[str], content: bytes):
+        """
+        Store a render and evict least recently used entries if over the limit.
+
+        Args:
+            key: Cache key from ``make_key``
+            url: Renderer URL of the diagram
+            playground: Playground URL of the diagram
+            content: Rendered diagram bytes
+        """
+        size = len(content)
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        try:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                old = conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries (key, url, playground, content, size, created, accessed) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, url, playground, sqlite3.Binary(content), size, now, now),
+                )
+                delta = size - (old[0] if old else 0)
+                conn.execute("UPDATE meta SET value = value + ? WHERE name = 'total_bytes'", (delta,))
+                self._evict(conn, self.max_bytes)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as e:
+            logger.warning(f"Render cache store failed: {str(e)}")
+
+    def _evict(self, conn: sqlite3.Connection, limit: int):
+        # Must run inside a write transaction
+        total = conn.execute("SELECT value FROM meta WHERE name = 'total_bytes'").fetchone()[0]
+        if total <= limit:
+            return
+        target = int(limit * _EVICTION_LOW_WATER)
+        freed = 0
+        evicted = 0
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY accessed ASC").fetchall():
+            if total - freed <= target:
+                break
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            freed += size
+            evicted += 1
+        conn.execute("UPDATE meta SET value = value - ? WHERE name = 'total_bytes'", (freed,))
+        with self._stats_lock:
+            self.evictions += evicted
+        logger.debug(f"Render cache evicted {evicted} entries ({freed} bytes)")
+
+    def resize(self, max_bytes: int):
+        """
+        Change the size limit in place, evicting immediately if it shrank.
+
+        Args:
+            max_bytes: New maximum total size of stored diagram bodies
+        """
+        self.max_bytes = max_bytes
+        try:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._evict(conn, max_bytes)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as e:
+            logger.warning(f"Render cache resize failed: {str(e)}")
+
+    def clear(self):
+        """Remove all entries."""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DELETE FROM entries")
+        conn.execute("UPDATE meta SET value = 0 WHERE name = 'total_bytes'")
+        conn.execute("COMMIT")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with shared entry/byte counts and this process's hit ratio
+        """
+        conn = self._connection()
+        entries = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        total = conn.execute("SELECT value FROM meta WHERE name = 'total_bytes'").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "path": self.path,
+            "entries": entries,
+            "total_bytes": total,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+_render_cache: Optional[RenderCache] = None
+_render_cache_lock = threading.Lock()
+
+
+def get_render_cache() -> Optional[RenderCache]:
+    """
+    Get the process-wide render cache configured by MCP_SETTINGS.
+
+    Returns:
+        The shared RenderCache, or None if caching is disabled
+    """
+    global _render_cache
+    path = MCP_SETTINGS.render_cache_path
+    if not path:
+        return None
+    if _render_cache is None or _render_cache.path != path:
+        with _render_cache_lock:
+            if _render_cache is None or _render_cache.path != path:
+                _render_cache = RenderCache(path, MCP_SETTINGS.render_cache_max_mb * 1024 * 1024)
+                logger.info(f"Using shared render cache at {path}")
+    return _render_cache
@@ -23,6 +23,8 @@ def create_mcp_server():
     # Lazy import to avoid circular dependencies
     from ..server.fastmcp_wrapper import FastMCP
     from .config import MCP_SETTINGS
+    from .capabilities import get_capability_index
+    from .memory import start_tracing
     from ..tools.diagram_tools import register_diagram_tools
     from ..resources.diagram_resources import register_diagram_resources
     from ..prompts.diagram_prompts import register_diagram_prompts
@@ -31,6 +33,12 @@ def create_mcp_server():
     logger.info(f"Creating MCP server: {MCP_SETTINGS.server_name}")
     server = FastMCP(MCP_SETTINGS.server_name)
     
+    # Build the capability index up front so requests validate without delay
+    get_capability_index()
+    
+    # Trace allocations for the uml://memory resource when asked to
+    start_tracing(MCP_SETTINGS.memory_trace_frames)
+    
     # Register all tools, resources, and prompts
     tool_names = register_diagram_tools(server)
     resource_names = register_diagram_resources(server)
@@ -55,6 +63,36 @@ def get_mcp_server():
         _mcp_server = create_mcp_server()
     return _mcp_server
 
+def get_request_handler(server=None):
+    """Get the JSON request handler used by the HTTP transport.
+    
+    The mock FastMCP has one built in. With the fastmcp package, the handler
+    is assembled from the registered tools (with their middleware), prompts
+    and resources, so HTTP requests get the same profiling, tracing and ETag
+    handling either way.
+    
+    Args:
+        server: FastMCP server instance (default: the singleton)
+        
+    Returns:
+        Callable taking a decoded request and returning its response
+    """
+    server = server or get_mcp_server()
+    handle_request = getattr(server, "_handle_request", None)
+    if handle_request is not None:
+        return handle_request
+    
+    from ..server.fastmcp_wrapper import RequestHandler
+    from ..tools.tool_decorator import get_tool_registry
+    from ..resources.diagram_resources import get_resource_registry
+    from ..prompts.diagram_prompts import get_prompt_registry
+    
+    return RequestHandler(
+        {name: info["wrapped"] for name, info in get_tool_registry().items() if "wrapped" in info},
+        {name: info["function"] for name, info in get_prompt_registry().items()},
+        {uri: info["function"] for uri, info in get_resource_registry().items()},
+    )
+
 def start_server(transport='stdio', host=None, port=None):
     """Start the MCP server with the specified transport.
     
@@ -65,11 +103,18 @@ def start_server(transport='stdio', host=None, port=None):
     """
     server = get_mcp_server()
     
+    # Apply the config file (if any) and keep it hot-reloadable
+    from .reloader import start_config_reloader
+    start_config_reloader()
+    
     if transport == 'stdio':
         server.run()
     elif transport == 'http':
         if not host or not port:
             raise ValueError("Host and port must be specified for HTTP transport")
-        server.run_http(host=host, port=port)
+        # Serve our own HTTP transport rather than the installed FastMCP's
+        from ..server.http_transport import run_http
+        logger.info(f"Starting {server.name} HTTP server on {host}:{port}")
+        run_http(get_request_handler(server), host, port)
     else:
         raise ValueError(f"Unsupported transport: {transport}")
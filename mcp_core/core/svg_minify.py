@@ -0,0 +1,205 @@
+"""
+SVG minification for rendered diagrams
+
+A conservative single-pass minifier: it drops comments, <metadata> elements
+and non-XML processing instructions, collapses insignificant whitespace
+and rounds decimal numbers in geometry attributes. Text content inside
+text elements, xml:space="preserve" subtrees, <style>, <script> and
+<foreignObject> is left intact.
+"""
+
+import logging
+import re
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# One token per match: markup constructs first, then character data
+_TOKEN_RE = re.compile(
+    r"""
+      (?P<comment><!--.*?-->)
+    | (?P<cdata><!\[CDATA\[.*?\]\]>)
+    | (?P<pi><\?.*?\?>)
+    | (?P<doctype><!DOCTYPE(?:[^>\[]|\[[^\]]*\])*>)
+    | (?P<tag></?[A-Za-z_][^\s/>]*(?:\s+[^\s=/>]+(?:\s*=\s*(?:"[^"]*"|'[^']*'))?)*\s*/?>)
+    | (?P<text>[^<]+)
+    | (?P<other><)
+    """,
+    re.S | re.X,
+)
+
+_ATTR_RE = re.compile(r"""([^\s=/>]+)(?:\s*=\s*("[^"]*"|'[^']*'))?""")
+_NUMBER_RE = re.compile(r"-?(?:\d+\.\d*|\.\d+|\d+)(?:[eE][-+]?\d+)?")
+_WS_RE = re.compile(r"\s+")
+
+# Attributes whose values are numbers or number lists
+_NUMERIC_ATTRS = frozenset({
+    "x", "y", "x1", "y1", "x2", "y2", "cx", "cy", "r", "rx", "ry", "fx", "fy",
+    "dx", "dy", "width", "height", "d", "points", "transform", "viewBox",
+    "textLength", "stroke-width", "stroke-dasharray", "stroke-dashoffset",
+    "font-size", "offset", "gradientTransform", "patternTransform",
+})
+
+# Elements whose character data is rendered and therefore kept (collapsed)
+_TEXT_ELEMENTS = frozenset({"text", "tspan", "textPath", "title", "desc", "a"})
+
+# Elements whose content must not be touched at all
+_VERBATIM_ELEMENTS = frozenset({"style", "script", "foreignObject"})
+
+
+def _format_number(match: "re.Match", precision: int) -> str:
+    token = match.group(0)
+    if "." not in token and "e" not in token and "E" not in token:
+        return token
+    value = round(float(token), precision)
+    text = f"{value:.{precision}f}".rstrip("0").rstrip(".") if precision > 0 else f"{value:.0f}"
+    if text in ("-0", ""):
+        text = "0"
+    if text.startswith("0."):
+        text = text[1:]
+    elif text.startswith("-0."):
+        text = "-" + text[2:]
+    # "1.0.5" means 1.0 and .5; once the first loses its dot they must be separated
+    following = match.string[match.end():match.end() + 1]
+    if following == "." and "." not in text:
+        text += " "
+    return text
+
+
+def _minify_tag(tag: str, precision: Optional[int]) -> str:
+    closing = tag.startswith("</")
+    self_closing = tag.endswith("/>")
+    body = tag[2:-1] if closing else tag[1:-2 if self_closing else -1]
+    body = body.strip()
+
+    name_end = len(body)
+    for index, char in enumerate(body):
+        if char.isspace():
+            name_end = index
+            break
+    name, rest = body[:name_end], body[name_end:]
+
+    parts = [name]
+    for attr in _ATTR_RE.finditer(rest):
+        attr_name, quoted = attr.group(1), attr.group(2)
+        if quoted is None:
+            parts.append(attr_name)
+            continue
+        quote, value = quoted[0], quoted[1:-1]
+        if attr_name in _NUMERIC_ATTRS:
+            value = _WS_RE.sub(" ", value).strip()
+            if precision is not None:
+                value = _NUMBER_RE.sub(lambda m: _format_number(m, precision), value)
+        parts.append(f"{attr_name}={quote}{value}{quote}")
+
+    if closing:
+        return f"</{name}>"
+    return "<" + " ".join(parts) + ("/>" if self_closing else ">")
+
+
+def _tag_name(tag: str) -> str:
+    start = 2 if tag.startswith("</") else 1
+    end = start
+    while end < len(tag) and not tag[end].isspace() and tag[end] not in "/>":
+        end += 1
+    return tag[start:end]
+
+
+def minify_svg(content: bytes, precision: Optional[int] = 2) -> bytes:
+    """
+    Minify an SVG document in a single pass.
+
+    Args:
+        content: SVG document bytes (UTF-8)
+        precision: Decimal places kept in geometry attributes (None disables rounding)
+
+    Returns:
+        The minified SVG bytes, or the original bytes if the input is not UTF-8 text
+    """
+    try:
+        text = content.decode("utf-8")
+    except UnicodeDecodeError:
+        logger.warning("SVG content is not valid UTF-8, skipping minification")
+        return content
+
+    out: List[str] = []
+    # Each open element: (name, keep_text, verbatim)
+    stack: List[tuple] = []
+    skip_depth = 0  # > 0 while inside <metadata>
+
+    for match in _TOKEN_RE.finditer(text):
+        kind = match.lastgroup
+        token = match.group(0)
+
+        if skip_depth:
+            if kind == "tag":
+                name = _tag_name(token)
+                if name == "metadata" and not token.endswith("/>"):
+                    skip_depth += -1 if token.startswith("</") else 1
+            continue
+
+        verbatim = bool(stack) and stack[-1][2]
+        if verbatim and not (kind == "tag" and token.startswith("</") and _tag_name(token) == stack[-1][0]):
+            out.append(token)
+            if kind == "tag" and not token.startswith("</") and not token.endswith("/>"):
+                stack.append((_tag_name(token), True, True))
+            elif kind == "tag" and token.startswith("</"):
+                stack.pop()
+            continue
+
+        if kind == "comment":
+            continue
+        if kind == "pi":
+            if token.startswith("<?xml"):
+                out.append(token)
+            continue
+        if kind == "text":
+            keep_text = bool(stack) and stack[-1][1]
+            if keep_text:
+                out.append(_WS_RE.sub(" ", token))
+            elif not token.isspace():
+                out.append(_WS_RE.sub(" ", token).strip())
+            continue
+        if kind != "tag":
+            out.append(token)
+            continue
+
+        name = _tag_name(token)
+        if token.startswith("</"):
+            if stack:
+                stack.pop()
+            out.append(f"</{name}>")
+            continue
+        if name == "metadata":
+            if not token.endswith("/>"):
+                skip_depth = 1
+            continue
+
+        out.append(_minify_tag(token, precision))
+        if not token.endswith("/>"):
+            preserve = 'xml:space="preserve"' in token or "xml:space='preserve'" in token
+            parent_keep = bool(stack) and stack[-1][1]
+            keep_text = preserve or parent_keep or name in _TEXT_ELEMENTS
+            stack.append((name, keep_text, preserve or name in _VERBATIM_ELEMENTS))
+
+    return "".join(out).encode("utf-8")
+
+
+def minification_stats(original: bytes, minified: bytes) -> Dict[str, Any]:
+    """
+    Summarize the size reduction achieved by minification.
+
+    Args:
+        original: Input SVG bytes
+        minified: Output SVG bytes
+
+    Returns:
+        Dictionary with original/minified sizes and savings
+    """
+    saved = len(original) - len(minified)
+    return {
+        "original_bytes": len(original),
+        "minified_bytes": len(minified),
+        "saved_bytes": saved,
+        "saved_percent": round(100.0 * saved / len(original), 1) if original else 0.0,
+    }
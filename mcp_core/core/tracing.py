@@ -0,0 +1,460 @@
+"""
+Request tracing
+
+Records spans around the render pipeline so the latency of one request
+can be broken down across services instead of read from averaged metrics:
+
+    mcp tool generate_uml            (MCP request, stdio or HTTP transport)
+      tool generate_uml              (tool middleware)
+        generate_diagram             (mcp_core.core.utils)
+          kroki.render               (HTTP request to Kroki)
+          svg.minify
+          file.write
+
+Spans follow the W3C trace context model: 128-bit trace ids, 64-bit span
+ids, and a ``traceparent`` header that is sent to Kroki and accepted from
+callers (HTTP API, MCP HTTP transport, ``traceparent`` on MCP requests),
+so a trace continues across process boundaries. The current span lives in
+a context variable; work handed to other threads joins the trace when it
+runs in a copy of the caller's context.
+
+Tracing is off unless an exporter is configured:
+
+* ``MCP_TRACING_FILE``: append one JSON line per finished span
+* ``MCP_TRACING_OTLP_ENDPOINT``: batch spans to an OTLP/HTTP collector
+  (JSON encoding, ``POST <endpoint>/v1/traces``)
+
+With tracing off, ``span()`` costs one settings check and yields a
+span that records nothing.
+"""
+
+import atexit
+import contextvars
+import functools
+import json
+import logging
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .config import MCP_SETTINGS
+
+logger = logging.getLogger(__name__)
+
+TRACEPARENT_HEADER = "traceparent"
+
+_TRACEPARENT = re.compile(r"^([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+# OTLP span kinds
+SPAN_KINDS = {"internal": 1, "server": 2, "client": 3, "producer": 4, "consumer": 5}
+
+_current_span: "contextvars.ContextVar[Optional[Span]]" = contextvars.ContextVar("mcp_current_span", default=None)
+
+
+def enabled() -> bool:
+    """Whether an exporter is configured."""
+    return bool(MCP_SETTINGS.tracing_file or MCP_SETTINGS.tracing_otlp_endpoint)
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[Tuple[str, str]]:
+    """
+    Parse a W3C ``traceparent`` header.
+
+    Args:
+        value: Header value
+
+    Returns:
+        (trace id, parent span id), or None if the value is missing or invalid
+    """
+    if not value:
+        return None
+    match = _TRACEPARENT.match(value.strip().lower())
+    if match is None or match.group(1) == "ff":
+        return None
+    trace_id, span_id = match.group(2), match.group(3)
+    if trace_id == "0" * 32 or span_id == "0" * 16:
+        return None
+    return trace_id, span_id
+
+
+class Span:
+    """One timed operation within a trace.
+
+    Attributes:
+        name: Operation name.
+        trace_id: 32 hex digits shared by every span of the trace.
+        span_id: 16 hex digits identifying this span.
+        parent_id: Span id of the parent, or None for a root span.
+        kind: ``internal``, ``server`` (handling a request) or ``client`` (calling out).
+        attributes: Key/value details (strings, numbers or booleans).
+        error: Error message if the operation failed.
+    """
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "kind", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str] = None, kind: str = "internal",
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.error: Optional[str] = None
+
+    @property
+    def recording(self) -> bool:
+        return True
+
+    def set_attribute(self, key: str, value: Any):
+        if value is not None:
+            self.attributes[key] = value
+
+    def record_error(self, message: str):
+        self.error = message
+
+    def traceparent(self) -> str:
+        """``traceparent`` header value naming this span as the parent."""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def finish(self):
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Span as one JSON-serializable record (the JSONL export format)."""
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start": self.start_ns / 1e9,
+            "duration_ms": round(self.duration_ms, 3),
+            "status": "error" if self.error is not None else "ok",
+            "error": self.error,
+            "attributes": self.attributes,
+            "service": MCP_SETTINGS.tracing_service_name,
+        }
+
+
+class _NonRecordingSpan:
+    """Stand-in yielded while tracing is off; every method does nothing."""
+
+    recording = False
+    trace_id = None
+    span_id = None
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def record_error(self, message: str):
+        pass
+
+    def traceparent(self) -> None:
+        return None
+
+
+NON_RECORDING_SPAN = _NonRecordingSpan()
+
+
+def current_span():
+    """The active span, or a non-recording span outside any trace."""
+    return _current_span.get() or NON_RECORDING_SPAN
+
+
+def inject(headers: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """
+    Add the ``traceparent`` header for the active span.
+
+    Args:
+        headers: Headers to extend (a new dict if omitted)
+
+    Returns:
+        The headers, unchanged outside a trace
+    """
+    headers = {} if headers is None else headers
+    active = _current_span.get()
+    if active is not None:
+        headers[TRACEPARENT_HEADER] = active.traceparent()
+    return headers
+
+
+@contextmanager
+def span(name: str, kind: str = "internal", parent: Optional[str] = None, **attributes) -> Iterator[Any]:
+    """
+    Time a block as a span, child of the active span.
+
+    Exceptions leaving the block mark the span as failed and propagate.
+
+    Args:
+        name: Operation name
+        kind: ``internal``, ``server`` or ``client``
+        parent: Incoming ``traceparent`` to continue (used if valid)
+        **attributes: Initial attributes
+
+    Yields:
+        The span (a non-recording span while tracing is off)
+    """
+    if not enabled():
+        yield NON_RECORDING_SPAN
+        return
+
+    remote = parse_traceparent(parent)
+    active = _current_span.get()
+    if remote is not None:
+        trace_id, parent_id = remote
+    elif active is not None:
+        trace_id, parent_id = active.trace_id, active.span_id
+    else:
+        trace_id, parent_id = os.urandom(16).hex(), None
+
+    new_span = Span(name, trace_id, parent_id, kind, attributes)
+    token = _current_span.set(new_span)
+    try:
+        yield new_span
+    except BaseException as e:
+        new_span.record_error(str(e) or e.__class__.__name__)
+        new_span.set_attribute("error.type", e.__class__.__name__)
+        raise
+    finally:
+        _current_span.reset(token)
+        new_span.finish()
+        export(new_span)
+
+
+def traced(name: Optional[str] = None, kind: str = "internal") -> Callable:
+    """
+    Decorator running a function inside a span (named after the function by default).
+
+    Inside the function, ``current_span()`` returns that span.
+    """
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled():
+                return func(*args, **kwargs)
+            with span(span_name, kind):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# Exporters
+
+class JsonlExporter:
+    """Append one JSON line per span to a file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def export(self, spans: List[Span]):
+        lines = "".join(json.dumps(s.to_dict(), default=repr) + "\n" for s in spans)
+        with self._lock:
+            self._file.write(lines)
+            self._file.flush()
+
+    def flush(self):
+        pass
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()]
+
+
+def otlp_payload(spans: List[Span], service_name: str) -> Dict[str, Any]:
+    """
+    Encode spans as an OTLP/HTTP JSON ``ExportTraceServiceRequest``.
+
+    Args:
+        spans: Finished spans
+        service_name: ``service.name`` resource attribute
+
+    Returns:
+        Request body
+    """
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": _otlp_attributes({"service.name": service_name})},
+            "scopeSpans": [{
+                "scope": {"name": __name__},
+                "spans": [
+                    {
+                        "traceId": s.trace_id,
+                        "spanId": s.span_id,
+                        "parentSpanId": s.parent_id or "",
+                        "name": s.name,
+                        "kind": SPAN_KINDS.get(s.kind, 1),
+                        "startTimeUnixNano": str(s.start_ns),
+                        "endTimeUnixNano": str(s.end_ns or s.start_ns),
+                        "attributes": _otlp_attributes(s.attributes),
+                        "status": {"code": 2, "message": s.error} if s.error is not None else {"code": 1},
+                    }
+                    for s in spans
+                ],
+            }],
+        }]
+    }
+
+
+class OtlpExporter:
+    """Send spans to an OTLP/HTTP collector in batches from a background thread.
+
+    Spans are dropped (with a warning) when the collector cannot be reached
+    or the queue is full, so tracing never blocks requests.
+    """
+
+    def __init__(self, endpoint: str, service_name: str, batch_size: int = 256,
+                 interval: float = 1.0, max_queue: int = 10000, timeout: float = 5.0):
+        endpoint = endpoint.rstrip("/")
+        self.url = endpoint if endpoint.endswith("/v1/traces") else endpoint + "/v1/traces"
+        self.service_name = service_name
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.dropped = 0
+        self._queue: List[Span] = []
+        self._lock = threading.Lock()
+        # Notified when a batch has been sent; flush() waits on it
+        self._sent = threading.Condition(self._lock)
+        self._in_flight = 0
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="otlp-exporter", daemon=True)
+        self._thread.start()
+
+    def export(self, spans: List[Span]):
+        with self._lock:
+            room = self.max_queue - len(self._queue)
+            if room < len(spans):
+                self.dropped += len(spans) - max(0, room)
+                spans = spans[:max(0, room)]
+            self._queue.extend(spans)
+            full = len(self._queue) >= self.batch_size
+        if full:
+            self._wake.set()
+
+    def _send(self, client, batch: List[Span]):
+        try:
+            response = client.post(self.url, content=json.dumps(otlp_payload(batch, self.service_name)),
+                                   headers={"Content-Type": "application/json"})
+            response.raise_for_status()
+        except Exception as e:
+            self.dropped += len(batch)
+            logger.warning(f"Could not export {len(batch)} span(s) to {self.url}: {e}")
+
+    def _drain(self, client):
+        while True:
+            with self._lock:
+                batch, self._queue = self._queue[:self.batch_size], self._queue[self.batch_size:]
+                if not batch:
+                    return
+                self._in_flight += 1
+            try:
+                self._send(client, batch)
+            finally:
+                with self._lock:
+                    self._in_flight -= 1
+                    self._sent.notify_all()
+
+    def _run(self):
+        import httpx
+        with httpx.Client(timeout=self.timeout) as client:
+            while not self._closed:
+                self._wake.wait(self.interval)
+                self._wake.clear()
+                self._drain(client)
+            self._drain(client)
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """
+        Send queued spans now and wait until they have been delivered.
+
+        Args:
+            timeout: Seconds to wait at most
+
+        Returns:
+            True if nothing is left queued or being sent
+        """
+        self._wake.set()
+        with self._sent:
+            return self._sent.wait_for(lambda: not self._queue and not self._in_flight, timeout)
+
+    def close(self):
+        self._closed = True
+        self._wake.set()
+        self._thread.join(self.timeout)
+
+
+_exporters: List[Any] = []
+_exporters_key: Optional[Tuple[str, str, str]] = None
+_exporters_lock = threading.Lock()
+
+
+def get_exporters() -> List[Any]:
+    """Exporters for the current settings, recreated when the settings change."""
+    global _exporters, _exporters_key
+    key = (MCP_SETTINGS.tracing_file, MCP_SETTINGS.tracing_otlp_endpoint, MCP_SETTINGS.tracing_service_name)
+    if key == _exporters_key:
+        return _exporters
+    with _exporters_lock:
+        if key != _exporters_key:
+            for exporter in _exporters:
+                exporter.close()
+            exporters = []
+            path, endpoint, service_name = key
+            if path:
+                try:
+                    exporters.append(JsonlExporter(path))
+                except OSError as e:
+                    logger.error(f"Cannot write spans to {path}: {e}")
+            if endpoint:
+                exporters.append(OtlpExporter(endpoint, service_name))
+            _exporters, _exporters_key = exporters, key
+        return _exporters
+
+
+def export(finished: Span):
+    """Hand a finished span to the configured exporters."""
+    for exporter in get_exporters():
+        try:
+            exporter.export([finished])
+        except Exception as e:
+            logger.warning(f"Span export failed: {e}")
+
+
+def flush():
+    """Send spans still queued by the exporters."""
+    for exporter in list(_exporters):
+        exporter.flush()
+
+
+atexit.register(flush)
@@ -8,14 +8,25 @@ import datetime
 import json
 from typing import Dict, Any, Optional
 import base64
+import gzip
 import zlib
 
-from kroki.kroki import Kroki
-from .config import MCP_SETTINGS
+from .config import MCP_SETTINGS, on_settings_change
+from .svg_minify import minify_svg as minify_svg_content, minification_stats
+from .render_cache import get_render_cache, RenderCache
+from .capabilities import get_capability_index
+from . import tracing
+
+_logging_configured = False
 
 # Configure logging
 def setup_logging():
-    """Configure and setup logging"""
+    """Configure and setup logging (only the first call installs handlers)"""
+    global _logging_configured
+    if _logging_configured:
+        return logging.getLogger()
+    _logging_configured = True
+    
     # Create logs directory
     log_dir = "logs"
     os.makedirs(log_dir, exist_ok=True)
@@ -48,24 +59,67 @@ def setup_logging():
     logging.info("Logging system initialized")
     return logger
 
-# Initialize Kroki client with server from configuration
-kroki_client = Kroki(base_url=MCP_SETTINGS.kroki_server)
+def get_kroki_client():
+    """
+    Get the shared Kroki client, creating it on first use
+    
+    The client (and the HTTP stack behind it) is created lazily so that
+    starting the server or listing its tools does not pay for it.
+    
+    Returns:
+        The shared Kroki client
+    """
+    client = globals().get("kroki_client")
+    if client is None:
+        from kroki.kroki import Kroki
+        client = Kroki(base_url=MCP_SETTINGS.kroki_server, timeout=MCP_SETTINGS.kroki_timeout)
+        globals()["kroki_client"] = client
+    return client
+
+def __getattr__(name: str):
+    # Keep ``utils.kroki_client`` working while creating the client on first access
+    if name == "kroki_client":
+        return get_kroki_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+@on_settings_change
+def _apply_runtime_settings(changed):
+    """Retarget the live Kroki client and resize the render cache without recreating them"""
+    kroki_client = globals().get("kroki_client")
+    if kroki_client is not None and "kroki_server" in changed:
+        kroki_client.base_url = MCP_SETTINGS.kroki_server.rstrip("/")
+    if kroki_client is not None and "kroki_timeout" in changed:
+        kroki_client.client.timeout = MCP_SETTINGS.kroki_timeout
+    if "render_cache_max_mb" in changed:
+        render_cache = get_render_cache()
+        if render_cache is not None:
+            render_cache.resize(MCP_SETTINGS.render_cache_max_mb * 1024 * 1024)
 
-def generate_diagram(diagram_type: str, code: str, output_format: str = "png", output_dir: Optional[str] = None) -> Dict[str, Any]:
+@tracing.traced("generate_diagram")
+def generate_diagram(diagram_type: str, code: str, output_format: str = "png", output_dir: Optional[str] = None,
+                     minify_svg: Optional[bool] = None) -> Dict[str, Any]:
     """
     Generate a diagram using the appropriate service (Kroki, PlantUML, etc.)
     
+    Runs in a ``generate_diagram`` tracing span with ``kroki.render``,
+    ``svg.minify`` and ``file.write`` child spans.
+    
     Args:
         diagram_type: Type of diagram (class, sequence, mermaid, d2, etc.)
         code: The diagram code/description
         output_format: Output format (png, svg, etc.)
         output_dir: Directory to save the generated image
+        minify_svg: Minify SVG output (defaults to MCP_SETTINGS.minify_svg)
         
     Returns:
         Dict containing code, URL, and local file path
     """
     logger = logging.getLogger(__name__)
     logger.info(f"Generating {diagram_type} diagram")
+    span = tracing.current_span()
+    span.set_attribute("diagram.type", diagram_type)
+    span.set_attribute("diagram.format", output_format)
+    span.set_attribute("diagram.code_length", len(code))
     
     # Get the output directory (use default if not provided)
     if output_dir is None:
@@ -76,18 +130,20 @@ def generate_diagram(diagram_type: str, code: str, output_format: str = "png", o
         os.makedirs(output_dir, exist_ok=True)
         logger.debug(f"Using output directory: {output_dir}")
     
-    # Get diagram configuration
-    diagram_config = MCP_SETTINGS.diagram_types.get(diagram_type.lower())
-    if not diagram_config:
-        error_msg = f"Unsupported diagram type: {diagram_type}"
+    # Validate type and format against the capability index (no network round trip)
+    capability_index = get_capability_index()
+    error_msg = capability_index.validate(diagram_type, output_format)
+    if error_msg:
         logger.error(error_msg)
+        span.record_error(error_msg)
         return {
             "code": code,
             "error": error_msg
         }
     
     # Determine which backend service to use
-    backend_type = diagram_config.backend
+    capability = capability_index.get(diagram_type)
+    backend_type = capability.kroki_language
     
     # Handle different diagram types
     try:
@@ -102,26 +158,70 @@ def generate_diagram(diagram_type: str, code: str, output_format: str = "png", o
             if "@enduml" not in code:
                 code = f"{code}\n@enduml"
 
-        # Generate diagram using Kroki service
-        result = kroki_client.generate_diagram(backend_type, code, output_format)
+        # Serve from the shared render cache when possible, otherwise render with Kroki
+        kroki_client = get_kroki_client()
+        render_cache = get_render_cache()
+        cache_key = None
+        result = None
+        if render_cache is not None:
+            cache_key = RenderCache.make_key(backend_type, output_format, code, kroki_client.base_url)
+            result = render_cache.get(cache_key)
+        cached = result is not None
+        span.set_attribute("cache.hit", cached)
+        if result is None:
+            with tracing.span("kroki.render", kind="client", **{
+                "kroki.server": kroki_client.base_url,
+                "kroki.language": backend_type,
+                "kroki.format": output_format,
+            }) as render_span:
+                # The traceparent header names this span, so Kroki-side spans join the trace
+                result = kroki_client.generate_diagram(backend_type, code, output_format, headers=tracing.inject())
+                render_span.set_attribute("kroki.response_bytes", len(result["content"]))
+            if render_cache is not None:
+                render_cache.put(cache_key, result["url"], result.get("playground"), result["content"])
+        content = result["content"]
+        
+        # Optionally minify SVG output before storing it
+        minify_stats = None
+        if minify_svg is None:
+            minify_svg = MCP_SETTINGS.minify_svg
+        if minify_svg and output_format == "svg":
+            with tracing.span("svg.minify"):
+                minified = minify_svg_content(content, MCP_SETTINGS.svg_precision)
+            minify_stats = minification_stats(content, minified)
+            logger.info(f"Minified SVG: saved {minify_stats['saved_bytes']} bytes ({minify_stats['saved_percent']}%)")
+            content = minified
         
         # If output directory is provided, save the image locally
         local_path = None
         if output_dir:
-            local_path = os.path.join(output_dir, f"{filename_prefix}.{output_format}")
-            with open(local_path, 'wb') as f:
-                f.write(result["content"])
+            if output_format == "svg" and MCP_SETTINGS.store_svgz:
+                # Store SVG gzip-compressed; it can be served as-is with Content-Encoding: gzip
+                local_path = os.path.join(output_dir, f"{filename_prefix}.svgz")
+                stored = gzip.compress(content, compresslevel=9, mtime=0)
+            else:
+                local_path = os.path.join(output_dir, f"{filename_prefix}.{output_format}")
+                stored = content
+            with tracing.span("file.write", **{"file.path": local_path, "file.bytes": len(stored)}):
+                with open(local_path, 'wb') as f:
+                    f.write(stored)
             logger.info(f"Diagram saved to {local_path}")
         
-        return {
+        response = {
             "code": code,
             "url": result["url"],
             "playground": result.get("playground"),
             "local_path": local_path
         }
+        if render_cache is not None:
+            response["cached"] = cached
+        if minify_stats:
+            response["svg_minify"] = minify_stats
+        return response
     
     except Exception as e:
         logger.error(f"Error generating diagram: {str(e)}")
+        span.record_error(str(e))
         # Return partial result if possible
         return {
             "code": code,
@@ -131,5 +231,4 @@ def generate_diagram(diagram_type: str, code: str, output_format: str = "png", o
             "error": str(e)
         }
 
-# Initialize logger
-logger = setup_logging()
+logger = logging.getLogger(__name__)
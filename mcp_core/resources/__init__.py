@@ -6,7 +6,9 @@ from .diagram_resources import (
     get_diagram_templates,
     get_diagram_examples,
     get_output_formats,
+    get_diagram_gallery,
     get_server_info,
+    get_memory_usage,
     mcp_resource,
     get_resource_registry
 )
@@ -16,7 +18,9 @@ __all__ = [
     'get_diagram_templates',
     'get_diagram_examples',
     'get_output_formats',
+    'get_diagram_gallery',
     'get_server_info',
+    'get_memory_usage',
     'mcp_resource',
     'get_resource_registry'
 ]
\ No newline at end of file
@@ -1,12 +1,18 @@
 """
 MCP resources for diagram information
 """
+import functools
 import logging
-from typing import Dict, List, Any, Optional, Callable, TypeVar, cast
+import os
+from typing import Dict, List, Any, Optional, Callable, Tuple, TypeVar, cast
 
 from mcp_core.server.fastmcp_wrapper import FastMCP
-from ..core.config import MCP_SETTINGS
-from kroki.kroki_templates import DiagramTemplates, DiagramExamples
+from ..core.config import MCP_SETTINGS, get_settings_status
+from ..core.capabilities import get_capability_index
+from ..core.gallery import INDEX_FILENAME, gallery_view
+from ..core.memory import memory_report
+from .memo import MemoizedResource, ModuleWatcher
+import kroki.kroki_templates as kroki_templates
 
 logger = logging.getLogger(__name__)
 
@@ -18,7 +24,8 @@ F = TypeVar('F', bound=Callable[..., Any])
 def mcp_resource(
     uri: str,
     description: Optional[str] = None,
-    category: str = "default"
+    category: str = "default",
+    memoize: Optional[Callable[[], Tuple]] = None
 ) -> Callable[[F], F]:
     """
     Decorator for registering a function as an MCP resource.
@@ -27,9 +34,11 @@ def mcp_resource(
         uri: Resource URI
         description: Resource description (defaults to function docstring if not provided)
         category: Resource category for organization
+        memoize: Returns the resource's dependencies; when given, the result is
+            built and serialized once and rebuilt only when they change
         
     Returns:
-        Decorated function
+        Decorated function (returning the cached data when memoized)
     
     Example:
         @mcp_resource("uml://types", description="Get available diagram types")
@@ -41,55 +50,90 @@ def mcp_resource(
         func_doc = func.__doc__ or ""
         func_description = description or func_doc.split('\n')[0] if func_doc else ""
         
+        memo = None
+        if memoize is not None:
+            memo = MemoizedResource(uri, func, memoize)
+            
+            @functools.wraps(func)
+            def cached():
+                return memo.get().data
+            
+            # Transports that understand ETags read the payload directly
+            cached.__mcp_payload__ = memo.get
+            func = cached
+        
         # Store resource metadata
         _registered_resources[uri] = {
             "function": func,
             "uri": uri,
             "description": func_description,
-            "category": category
+            "category": category,
+            "memo": memo
         }
         
-        # Return function unchanged
         return cast(F, func)
     
     return decorator
 
+# In development (MCP_RESOURCE_RELOAD), templates and examples are reloaded
+# when kroki_templates changes on disk
+_templates_watcher = ModuleWatcher(kroki_templates)
+
+def _capability_dependencies() -> Tuple:
+    return (get_capability_index(),)
+
+def _template_dependencies() -> Tuple:
+    return (MCP_SETTINGS.diagram_types, _templates_watcher.state())
+
+def _gallery_dependencies() -> Tuple:
+    try:
+        mtime = os.stat(os.path.join(MCP_SETTINGS.gallery_dir, INDEX_FILENAME)).st_mtime
+    except OSError:
+        mtime = None
+    return (MCP_SETTINGS.gallery_dir, MCP_SETTINGS.gallery_base_url, mtime)
+
 # Define resources using decorators
-@mcp_resource("uml://types", description="Get available diagram types")
+@mcp_resource("uml://types", description="Get available diagram types", memoize=_capability_dependencies)
 def get_diagram_types():
     """Get available diagram types"""
     types = {}
-    for name, config in MCP_SETTINGS.diagram_types.items():
+    for name, capability in get_capability_index().types().items():
         types[name] = {
-            "backend": config.backend,
-            "description": config.description,
-            "formats": config.formats
+            "backend": capability.backend,
+            "description": capability.description,
+            "formats": list(capability.formats)
         }
     return types
 
-@mcp_resource("uml://templates", description="Get diagram templates for different diagram types")
+@mcp_resource("uml://templates", description="Get diagram templates for different diagram types",
+              memoize=_template_dependencies)
 def get_diagram_templates():
     """Get diagram templates for different diagram types"""
     templates = {}
     for name in MCP_SETTINGS.diagram_types:
-        templates[name] = DiagramTemplates.get_template(name)
+        templates[name] = kroki_templates.DiagramTemplates.get_template(name)
     return templates
 
-@mcp_resource("uml://examples", description="Get diagram examples for different diagram types")
+@mcp_resource("uml://examples", description="Get diagram examples for different diagram types",
+              memoize=_template_dependencies)
 def get_diagram_examples():
     """Get diagram examples for different diagram types"""
     examples = {}
     for name in MCP_SETTINGS.diagram_types:
-        examples[name] = DiagramExamples.get_example(name)
+        examples[name] = kroki_templates.DiagramExamples.get_example(name)
     return examples
 
-@mcp_resource("uml://formats", description="Get supported output formats for each diagram type")
+@mcp_resource("uml://formats", description="Get supported output formats for each diagram type",
+              memoize=_capability_dependencies)
 def get_output_formats():
     """Get supported output formats for each diagram type"""
-    formats = {}
-    for name, config in MCP_SETTINGS.diagram_types.items():
-        formats[name] = config.formats
-    return formats
+    return get_capability_index().formats()
+
+@mcp_resource("uml://gallery", description="Get pre-rendered examples and templates (local paths or URLs)",
+              memoize=_gallery_dependencies)
+def get_diagram_gallery():
+    """Get pre-rendered examples and templates (local paths or URLs)"""
+    return gallery_view(MCP_SETTINGS.gallery_dir, MCP_SETTINGS.gallery_base_url)
 
 @mcp_resource("uml://server-info", description="Get MCP server information")
 def get_server_info():
@@ -101,9 +145,19 @@ def get_server_info():
         "tools": MCP_SETTINGS.tools,
         "prompts": MCP_SETTINGS.prompts,
         "kroki_server": MCP_SETTINGS.kroki_server,
-        "plantuml_server": MCP_SETTINGS.plantuml_server
+        "plantuml_server": MCP_SETTINGS.plantuml_server,
+        "kroki_timeout": MCP_SETTINGS.kroki_timeout,
+        "render_cache_path": MCP_SETTINGS.render_cache_path,
+        "render_cache_max_mb": MCP_SETTINGS.render_cache_max_mb,
+        "config_file": MCP_SETTINGS.config_file,
+        "config": get_settings_status()
     }
 
+@mcp_resource("uml://memory", description="Get process memory usage and the top allocation sites")
+def get_memory_usage():
+    """Get process memory usage and the top allocation sites"""
+    return memory_report()
+
 def register_resources_with_server(server: FastMCP) -> List[str]:
     """
     Register all decorated resources with the MCP server
@@ -0,0 +1,198 @@
+"""
+Memoized resource payloads
+
+Resources whose content only depends on configuration (templates,
+examples, diagram types) are built once, serialized once and tagged with
+a content version and ETag. They are rebuilt only when one of their
+dependencies changes, so agents that read them at the start of every
+session get the cached payload, or a "not modified" answer when they
+send back the ETag they already have.
+"""
+
+import hashlib
+import importlib
+import logging
+import os
+import threading
+import time
+from types import ModuleType
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from pydantic import BaseModel
+
+from ..core import jsoncodec
+
+logger = logging.getLogger(__name__)
+
+# Development only: reload watched modules when their source changes (off by default)
+_MODULE_RELOAD = os.environ.get("MCP_RESOURCE_RELOAD", "false").lower() in ("true", "1", "yes")
+# Seconds between modification checks of watched modules
+_MODULE_CHECK_INTERVAL = float(os.environ.get("MCP_RESOURCE_CHECK_INTERVAL", "2"))
+
+
+class ResourcePayload:
+    """A built resource: its data, JSON serialization, ETag and version.
+
+    Attributes:
+        data: The resource content (shared; treat as read-only).
+        json: ``data`` serialized once as JSON bytes; transports send these.
+        etag: Quoted strong ETag derived from ``json``.
+        version: Counter incremented whenever the content changes.
+    """
+
+    __slots__ = ("data", "json", "etag", "version")
+
+    def __init__(self, data: Any, json_bytes: bytes, etag: str, version: int):
+        self.data = data
+        self.json = json_bytes
+        self.etag = etag
+        self.version = version
+
+
+def _snapshot(value: Any) -> Any:
+    """Copy dicts, lists and settings models into tuples, so in-place changes show up as a new key"""
+    if isinstance(value, dict):
+        return tuple((key, _snapshot(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(_snapshot(item) for item in value)
+    if isinstance(value, BaseModel):
+        return (type(value), _snapshot(value.__dict__))
+    return value
+
+
+class MemoizedResource:
+    """Caches a resource builder's result until its dependencies change.
+
+    Attributes:
+        name: Resource name used in log messages.
+    """
+
+    def __init__(self, name: str, builder: Callable[[], Any], dependencies: Callable[[], Tuple]):
+        """
+        Initialize the memo.
+
+        Args:
+            name: Resource name used in log messages
+            builder: Builds the resource data
+            dependencies: Returns a tuple that changes whenever the data would change.
+                Dicts, lists and settings models in it are compared by value, so
+                they may be changed in place; other objects by equality.
+        """
+        self.name = name
+        self._builder = builder
+        self._dependencies = dependencies
+        self._lock = threading.Lock()
+        self._payload: Optional[ResourcePayload] = None
+        self._key: Optional[Tuple] = None
+        self.builds = 0
+
+    def get(self) -> ResourcePayload:
+        """
+        Get the payload, rebuilding it if a dependency changed.
+
+        Returns:
+            The current ResourcePayload
+        """
+        key = _snapshot(self._dependencies())
+        payload = self._payload
+        if payload is not None and self._key == key:
+            return payload
+
+        with self._lock:
+            if self._payload is not None and self._key == key:
+                return self._payload
+            data = self._builder()
+            json_bytes = jsoncodec.dumps_bytes(data, sort_keys=True)
+            etag = '"' + hashlib.sha256(json_bytes).hexdigest()[:32] + '"'
+            previous = self._payload
+            if previous is not None and previous.etag == etag:
+                version = previous.version
+            else:
+                version = previous.version + 1 if previous is not None else 1
+            self._payload = ResourcePayload(data, json_bytes, etag, version)
+            self._key = key
+            self.builds += 1
+            logger.debug(f"Built resource {self.name} (version {version}, {len(json_bytes)} bytes)")
+            return self._payload
+
+    def invalidate(self):
+        """Force a rebuild on the next read."""
+        with self._lock:
+            self._key = None
+
+
+class ModuleWatcher:
+    """Reloads a module when its source file changes on disk.
+
+    A development tool: ``importlib.reload`` replaces the module's contents
+    in place, while other modules keep references to the old classes and
+    functions and decorators in it run again. It is disabled unless
+    ``MCP_RESOURCE_RELOAD`` is set; disabled watchers never check the file.
+
+    The file is checked at most every ``interval`` seconds, so calling
+    ``state()`` on every resource read stays cheap.
+    """
+
+    def __init__(self, module: ModuleType, interval: float = _MODULE_CHECK_INTERVAL,
+                 enabled: Optional[bool] = None):
+        """
+        Initialize the watcher.
+
+        Args:
+            module: Module to watch
+            interval: Minimum seconds between modification checks
+            enabled: Reload on changes (default: MCP_RESOURCE_RELOAD)
+        """
+        self.module = module
+        self.interval = interval
+        self.enabled = _MODULE_RELOAD if enabled is None else enabled
+        self._lock = threading.Lock()
+        self._mtime = self._current_mtime()
+        self._checked = time.monotonic()
+
+    def _current_mtime(self) -> Optional[float]:
+        try:
+            return os.stat(self.module.__file__).st_mtime
+        except (OSError, TypeError):
+            return None
+
+    def state(self) -> Optional[float]:
+        """
+        Get the module's modification time, reloading it first if it changed.
+
+        Returns:
+            Modification time of the loaded source
+        """
+        if not self.enabled:
+            return self._mtime
+        now = time.monotonic()
+        if now - self._checked < self.interval:
+            return self._mtime
+        with self._lock:
+            self._checked = now
+            mtime = self._current_mtime()
+            if mtime != self._mtime:
+                try:
+                    importlib.reload(self.module)
+                    logger.info(f"Reloaded {self.module.__name__} after it changed on disk")
+                except Exception as e:
+                    logger.error(f"Could not reload {self.module.__name__}: {str(e)}")
+                self._mtime = mtime
+        return self._mtime
+
+
+def payload_response(payload: ResourcePayload, if_none_match: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Build a transport response for a memoized resource.
+
+    Args:
+        payload: The resource payload
+        if_none_match: ETag the client already has
+
+    Returns:
+        Dictionary with the result (or ``not_modified``), etag and version; the
+        result is the precomputed JSON, which ``jsoncodec`` writes as it is
+    """
+    if if_none_match is not None and if_none_match == payload.etag:
+        return {"not_modified": True, "etag": payload.etag, "version": payload.version}
+    return {"result": jsoncodec.RawJSON(payload.json), "etag": payload.etag, "version": payload.version}
@@ -4,7 +4,6 @@ Wrapper for FastMCP server to ensure compatibility
 
 import logging
 import sys
-import json
 import os
 from typing import Any, Callable, Dict, List, Optional, Union
 
@@ -35,6 +34,100 @@ else:
         logger.error(f"FastMCP package error: {str(e)}")
         raise ImportError("FastMCP package is required but not installed. Set MOCK_FASTMCP=true to use mock implementation.")
 
+class RequestHandler:
+    """Answers the line-delimited JSON requests of the stdio and HTTP transports.
+
+    Requests name a ``tool``, ``prompt`` or ``resource`` (``type``) and may
+    carry ``traceparent`` (continue the caller's trace), ``profile``
+    (profile a tool call) and ``if_none_match`` (ETag of a cached
+    resource). Used by the mock FastMCP, and by ``start_server`` to serve
+    the HTTP transport whichever FastMCP is installed.
+    """
+
+    def __init__(self, tools: Dict[str, Callable], prompts: Dict[str, Callable], resources: Dict[str, Callable]):
+        """
+        Initialize the handler.
+
+        Args:
+            tools: Tool functions by name
+            prompts: Prompt functions by name
+            resources: Resource functions by URI
+        """
+        self.tools = tools
+        self.prompts = prompts
+        self.resources = resources
+
+    def __call__(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        from mcp_core.core import tracing
+        if not tracing.enabled():
+            return self.dispatch(request)
+        # Continue the caller's trace when the request carries a traceparent
+        target = request.get('tool') or request.get('prompt') or request.get('path')
+        with tracing.span(f"mcp {request.get('type')} {target}", kind="server",
+                          parent=request.get('traceparent')) as span:
+            response = self.dispatch(request)
+            if response.get("error"):
+                span.record_error(str(response["error"]))
+        return {**response, "trace_id": span.trace_id}
+
+    def dispatch(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Run the requested tool, prompt or resource.
+
+        Args:
+            request: Decoded request
+
+        Returns:
+            ``{"result": ...}`` (plus ``profiles``, ``etag`` or ``version`` where
+            they apply), or ``{"error": ...}``
+        """
+        try:
+            if 'type' not in request:
+                raise ValueError("Missing request type")
+
+            if request['type'] == 'tool':
+                tool_name = request.get('tool')
+                if tool_name not in self.tools:
+                    raise ValueError(f"Unknown tool: {tool_name}")
+                tool = self.tools[tool_name]
+                args = request.get('args', {})
+                if request.get('profile'):
+                    # Profile this call; the response names the written profile files
+                    from mcp_core.core import profiling
+                    with profiling.requested() as profiles:
+                        result = tool(**args)
+                    return {"result": result, "profiles": profiles}
+                result = tool(**args)
+                return {"result": result}
+
+            elif request['type'] == 'prompt':
+                prompt_name = request.get('prompt')
+                if prompt_name not in self.prompts:
+                    raise ValueError(f"Unknown prompt: {prompt_name}")
+                prompt = self.prompts[prompt_name]
+                args = request.get('args', {})
+                result = prompt(**args)
+                return {"result": result}
+
+            elif request['type'] == 'resource':
+                path = request.get('path')
+                if path not in self.resources:
+                    raise ValueError(f"Unknown resource: {path}")
+                resource = self.resources[path]
+                # Memoized resources carry an ETag; answer "not modified" when the client has it
+                payload_getter = getattr(resource, "__mcp_payload__", None)
+                if payload_getter is not None:
+                    from mcp_core.resources.memo import payload_response
+                    return payload_response(payload_getter(), request.get('if_none_match'))
+                result = resource()
+                return {"result": result}
+
+            else:
+                raise ValueError(f"Unknown request type: {request['type']}")
+
+        except Exception as e:
+            return {"error": str(e)}
+
 # Define mock classes if needed
 if use_mock:
     class Context:
@@ -53,6 +146,7 @@ if use_mock:
             self._tools = {}
             self._prompts = {}
             self._resources = {}
+            self._handler = RequestHandler(self._tools, self._prompts, self._resources)
             self.logger = logging.getLogger(__name__)
 
         def tool(self, *args, **kwargs):
@@ -84,65 +178,20 @@ if use_mock:
                 raise ValueError(f"Unsupported transport: {transport}")
 
         def _run_stdio(self):
-            """Run the server in stdio mode"""
+            """Run the server in stdio mode, handling requests concurrently"""
+            from .stdio_transport import run_stdio
             self.logger.info(f"Starting {self.name} in stdio mode")
-            while True:
-                try:
-                    line = input()
-                    if not line:
-                        continue
-                    request = json.loads(line)
-                    response = self._handle_request(request)
-                    print(json.dumps(response))
-                except EOFError:
-                    break
-                except Exception as e:
-                    self.logger.error(f"Error handling request: {e}")
-                    response = {"error": str(e)}
-                    print(json.dumps(response))
+            run_stdio(self._handle_request)
 
         def _run_http(self, host: str, port: int):
+            """Run the server as a streamable HTTP endpoint serving many sessions"""
+            from .http_transport import run_http
             self.logger.info(f"Starting {self.name} HTTP server on {host}:{port}")
-            # Mock HTTP server implementation
-            pass
+            run_http(self._handle_request, host, port)
 
         def _handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
             """Handle an MCP request and return the response."""
-            try:
-                if 'type' not in request:
-                    raise ValueError("Missing request type")
-
-                if request['type'] == 'tool':
-                    tool_name = request.get('tool')
-                    if tool_name not in self._tools:
-                        raise ValueError(f"Unknown tool: {tool_name}")
-                    tool = self._tools[tool_name]
-                    args = request.get('args', {})
-                    result = tool(**args)
-                    return {"result": result}
-                    
-                elif request['type'] == 'prompt':
-                    prompt_name = request.get('prompt')
-                    if prompt_name not in self._prompts:
-                        raise ValueError(f"Unknown prompt: {prompt_name}")
-                    prompt = self._prompts[prompt_name]
-                    args = request.get('args', {})
-                    result = prompt(**args)
-                    return {"result": result}
-                    
-                elif request['type'] == 'resource':
-                    path = request.get('path')
-                    if path not in self._resources:
-                        raise ValueError(f"Unknown resource: {path}")
-                    resource = self._resources[path]
-                    result = resource()
-                    return {"result": result}
-                    
-                else:
-                    raise ValueError(f"Unknown request type: {request['type']}")
-                    
-            except Exception as e:
-                return {"error": str(e)}
+            return self._handler(request)
 
 # Export the required classes
-__all__ = ["FastMCP", "Context"]
\ No newline at end of file
+__all__ = ["FastMCP", "Context", "RequestHandler"]
\ No newline at end of file
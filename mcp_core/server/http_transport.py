@@ -0,0 +1,439 @@
+"""
+Streamable HTTP transport
+
+Serves many concurrent MCP sessions from one process, so agents can share
+a server behind a load balancer instead of each spawning a stdio process.
+
+    POST   /mcp      one request (or a JSON array of requests); answered as
+                     JSON, or as a Server-Sent Events stream when the client
+                     accepts ``text/event-stream``
+    GET    /mcp      SSE stream of server notifications for the session,
+                     with periodic keep-alive comments
+    DELETE /mcp      end the session
+    GET    /healthz  liveness, session and in-flight counts
+
+Sessions are identified by the ``Mcp-Session-Id`` header: an
+``initialize`` request (``{"type": "initialize"}``, or a JSON-RPC
+``"method": "initialize"``) sent without one opens a session, and the id
+is returned in the response header. Other requests without a session id
+are rejected with 400, so clients that never send the header cannot pile
+up sessions.
+All sessions share one bounded worker pool, and each session is limited to
+a few concurrent requests so a single busy client cannot starve the rest.
+Idle sessions are expired. On SIGTERM/SIGINT the server stops accepting
+requests (503), closes notification streams, and waits for in-flight
+requests to finish before exiting.
+
+Requests sent with ``X-Profile: 1`` are profiled when ``MCP_PROFILE_DIR``
+is set; each response lists the written profile files under ``profiles``.
+A ``traceparent`` header is passed on to the requests, so their tracing
+spans continue the caller's trace.
+"""
+
+import asyncio
+import contextlib
+import inspect
+import logging
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Route
+
+from ..core import jsoncodec, profiling, tracing
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[Dict[str, Any]], Dict[str, Any]]
+
+SESSION_HEADER = "Mcp-Session-Id"
+PROFILE_HEADER = "X-Profile"
+MCP_PATH = "/mcp"
+INITIALIZE = "initialize"
+
+
+def _env_number(name: str, default: str) -> float:
+    return float(os.environ.get(name, default))
+
+
+def is_initialize(message: Any) -> bool:
+    """Whether a message asks to open a session."""
+    return isinstance(message, dict) and INITIALIZE in (message.get("type"), message.get("method"))
+
+
+class Session:
+    """State of one client session.
+
+    Attributes:
+        id: Session id sent in the ``Mcp-Session-Id`` header.
+        last_seen: Monotonic time of the last request or keep-alive.
+        in_flight: Requests currently being handled.
+        streams: Open notification streams.
+    """
+
+    def __init__(self, session_id: str, concurrency: int):
+        self.id = session_id
+        self.created = time.monotonic()
+        self.last_seen = self.created
+        self.in_flight = 0
+        self.streams = 0
+        self.events: "asyncio.Queue[Optional[Dict[str, Any]]]" = asyncio.Queue()
+        self.slots = asyncio.Semaphore(concurrency)
+
+    def touch(self):
+        self.last_seen = time.monotonic()
+
+
+class HTTPTransport:
+    """Streamable HTTP transport around a request handler.
+
+    Attributes:
+        app: The ASGI application.
+        sessions: Open sessions by id.
+        draining: True once shutdown has begun.
+    """
+
+    def __init__(
+        self,
+        handler: Handler,
+        max_workers: Optional[int] = None,
+        session_concurrency: Optional[int] = None,
+        max_sessions: Optional[int] = None,
+        session_idle_timeout: Optional[float] = None,
+        keepalive_interval: Optional[float] = None,
+        shutdown_timeout: Optional[float] = None
+    ):
+        """
+        Initialize the transport.
+
+        Args:
+            handler: Handles one decoded request and returns its response
+            max_workers: Concurrent requests across all sessions (default: MCP_HTTP_WORKERS)
+            session_concurrency: Concurrent requests per session (default: MCP_HTTP_SESSION_CONCURRENCY)
+            max_sessions: Maximum open sessions (default: MCP_HTTP_MAX_SESSIONS)
+            session_idle_timeout: Seconds before an idle session expires (default: MCP_HTTP_SESSION_TIMEOUT)
+            keepalive_interval: Seconds between SSE keep-alive comments (default: MCP_HTTP_KEEPALIVE)
+            shutdown_timeout: Seconds to wait for in-flight requests on shutdown (default: MCP_HTTP_SHUTDOWN_TIMEOUT)
+        """
+        self.handler = handler
+        self.max_workers = max(1, int(max_workers or _env_number("MCP_HTTP_WORKERS", "32")))
+        self.session_concurrency = max(1, int(session_concurrency or _env_number("MCP_HTTP_SESSION_CONCURRENCY", "4")))
+        self.max_sessions = max(1, int(max_sessions or _env_number("MCP_HTTP_MAX_SESSIONS", "1000")))
+        self.session_idle_timeout = session_idle_timeout or _env_number("MCP_HTTP_SESSION_TIMEOUT", "600")
+        self.keepalive_interval = keepalive_interval or _env_number("MCP_HTTP_KEEPALIVE", "15")
+        self.shutdown_timeout = shutdown_timeout if shutdown_timeout is not None else _env_number("MCP_HTTP_SHUTDOWN_TIMEOUT", "30")
+
+        self.sessions: Dict[str, Session] = {}
+        self.draining = False
+        self._in_flight = 0
+        self._idle: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        self.app = Starlette(
+            routes=[
+                Route(MCP_PATH, self._handle_mcp, methods=["GET", "POST", "DELETE"]),
+                Route("/healthz", self._handle_health, methods=["GET"]),
+            ],
+            lifespan=self._lifespan,
+        )
+
+    # Lifecycle
+
+    @contextlib.asynccontextmanager
+    async def _lifespan(self, app) -> AsyncIterator[None]:
+        self._loop = asyncio.get_running_loop()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="http-worker")
+        reaper = asyncio.create_task(self._expire_sessions())
+        try:
+            yield
+        finally:
+            reaper.cancel()
+            self._drain()
+            await self.wait_idle(self.shutdown_timeout)
+            self._executor.shutdown(wait=False)
+            logger.info("HTTP transport stopped")
+
+    def begin_shutdown(self):
+        """
+        Stop accepting requests and close notification streams.
+
+        Safe to call from a signal handler or another thread; in-flight
+        requests keep running and are awaited by the application shutdown.
+        """
+        if self._loop is not None and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._drain)
+        else:
+            self._drain()
+
+    def _drain(self):
+        if self.draining:
+            return
+        self.draining = True
+        logger.info(f"Draining HTTP transport: {self._in_flight} requests in flight, {len(self.sessions)} sessions")
+        for session in self.sessions.values():
+            session.events.put_nowait({"type": "notification", "event": "shutdown"})
+            session.events.put_nowait(None)
+
+    async def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until no request is in flight.
+
+        Args:
+            timeout: Maximum seconds to wait (None waits indefinitely)
+
+        Returns:
+            True if idle, False if the timeout expired first
+        """
+        if self._idle is None:
+            return True
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            logger.warning(f"Shutdown timeout: {self._in_flight} requests still in flight")
+            return False
+
+    async def _expire_sessions(self):
+        interval = max(1.0, min(self.session_idle_timeout / 2, 30.0))
+        while True:
+            await asyncio.sleep(interval)
+            self.expire_idle_sessions()
+
+    def expire_idle_sessions(self) -> int:
+        """
+        Close sessions idle longer than the timeout.
+
+        Sessions with requests in flight or an open notification stream are kept.
+
+        Returns:
+            Number of sessions closed
+        """
+        cutoff = time.monotonic() - self.session_idle_timeout
+        expired = [
+            session for session in self.sessions.values()
+            if session.last_seen < cutoff and not session.in_flight and not session.streams
+        ]
+        for session in expired:
+            self.close_session(session.id)
+        if expired:
+            logger.info(f"Expired {len(expired)} idle sessions")
+        return len(expired)
+
+    # Sessions
+
+    def open_session(self) -> Optional[Session]:
+        """
+        Open a new session.
+
+        Returns:
+            The session, or None if the session limit is reached
+        """
+        if len(self.sessions) >= self.max_sessions and not self.expire_idle_sessions():
+            return None
+        session = Session(uuid.uuid4().hex, self.session_concurrency)
+        self.sessions[session.id] = session
+        logger.debug(f"Opened session {session.id} ({len(self.sessions)} open)")
+        return session
+
+    def close_session(self, session_id: str) -> bool:
+        """
+        Close a session and end its notification streams.
+
+        Args:
+            session_id: Session id
+
+        Returns:
+            True if the session existed
+        """
+        session = self.sessions.pop(session_id, None)
+        if session is None:
+            return False
+        session.events.put_nowait(None)
+        logger.debug(f"Closed session {session_id} ({len(self.sessions)} open)")
+        return True
+
+    def notify(self, message: Dict[str, Any], session_id: Optional[str] = None):
+        """
+        Send a notification to one session's streams, or to all sessions.
+
+        Args:
+            message: Notification payload
+            session_id: Target session (default: broadcast)
+        """
+        targets = [self.sessions[session_id]] if session_id in self.sessions else (
+            list(self.sessions.values()) if session_id is None else []
+        )
+        for session in targets:
+            session.events.put_nowait(message)
+
+    # Request handling
+
+    async def _dispatch(self, session: Session, request: Any) -> Dict[str, Any]:
+        if not isinstance(request, dict):
+            return {"error": "Invalid request: Request must be a JSON object"}
+        if is_initialize(request):
+            # Answered here: the session was opened when the request arrived
+            response = {"result": {"session_id": session.id}}
+            return {"id": request["id"], **response} if "id" in request else response
+        async with session.slots:
+            session.in_flight += 1
+            self._in_flight += 1
+            self._idle.clear()
+            try:
+                response = await self._loop.run_in_executor(self._executor, self.handler, request)
+            except Exception as e:
+                logger.error(f"Error handling request: {e}")
+                response = {"error": str(e)}
+            finally:
+                session.in_flight -= 1
+                self._in_flight -= 1
+                if not self._in_flight:
+                    self._idle.set()
+                session.touch()
+        if "id" in request:
+            response = {"id": request["id"], **response}
+        return response
+
+    def _json(self, content: Any, status_code: int = 200, session: Optional[Session] = None, **headers) -> Response:
+        if session is not None:
+            headers[SESSION_HEADER] = session.id
+        return Response(jsoncodec.dumps_bytes(content), status_code=status_code,
+                        media_type="application/json", headers=headers)
+
+    def _session_for(self, request: Request) -> Optional[Session]:
+        session = self.sessions.get(request.headers.get(SESSION_HEADER, ""))
+        if session is not None:
+            session.touch()
+        return session
+
+    async def _handle_mcp(self, request: Request) -> Response:
+        if request.method == "POST":
+            return await self._handle_post(request)
+        if request.method == "GET":
+            return self._handle_stream(request)
+        if self.close_session(request.headers.get(SESSION_HEADER, "")):
+            return Response(status_code=204)
+        return self._json({"error": "Unknown session"}, 404)
+
+    async def _handle_post(self, request: Request) -> Response:
+        if self.draining:
+            return self._json({"error": "Server is shutting down"}, 503, **{"Retry-After": "1", "Connection": "close"})
+
+        try:
+            body = jsoncodec.loads(await request.body())
+        except ValueError as e:
+            return self._json({"error": f"Invalid request: {e}"}, 400)
+
+        messages: List[Any] = body if isinstance(body, list) else [body]
+        if SESSION_HEADER in request.headers:
+            session = self._session_for(request)
+            if session is None:
+                return self._json({"error": "Unknown session"}, 404)
+        elif not any(is_initialize(message) for message in messages):
+            return self._json({"error": f"Missing {SESSION_HEADER} header; send an initialize request first"}, 400)
+        else:
+            session = self.open_session()
+            if session is None:
+                return self._json({"error": "Too many sessions"}, 503, **{"Retry-After": "5"})
+
+        if profiling.is_truthy(request.headers.get(PROFILE_HEADER, "")):
+            messages = [{**message, "profile": True} if isinstance(message, dict) else message for message in messages]
+        traceparent = request.headers.get(tracing.TRACEPARENT_HEADER)
+        if traceparent:
+            messages = [
+                {"traceparent": traceparent, **message} if isinstance(message, dict) else message
+                for message in messages
+            ]
+        tasks = [asyncio.ensure_future(self._dispatch(session, message)) for message in messages]
+
+        if "text/event-stream" in request.headers.get("accept", ""):
+            async def stream():
+                # Each response is sent as soon as it is ready
+                for future in asyncio.as_completed(tasks):
+                    yield b"event: message\ndata: " + jsoncodec.dumps_bytes(await future) + b"\n\n"
+            return StreamingResponse(stream(), media_type="text/event-stream",
+                                     headers={SESSION_HEADER: session.id, "Cache-Control": "no-cache"})
+
+        responses = await asyncio.gather(*tasks)
+        return self._json(responses if isinstance(body, list) else responses[0], session=session)
+
+    def _handle_stream(self, request: Request) -> Response:
+        session = self._session_for(request)
+        if session is None:
+            return self._json({"error": "Unknown session"}, 404)
+        if self.draining:
+            return self._json({"error": "Server is shutting down"}, 503, **{"Retry-After": "1"})
+
+        async def stream():
+            session.streams += 1
+            try:
+                yield b": connected\n\n"
+                while True:
+                    try:
+                        event = await asyncio.wait_for(session.events.get(), self.keepalive_interval)
+                    except asyncio.TimeoutError:
+                        session.touch()
+                        yield b": keep-alive\n\n"
+                        continue
+                    if event is None:
+                        return
+                    yield b"event: message\ndata: " + jsoncodec.dumps_bytes(event) + b"\n\n"
+            finally:
+                session.streams -= 1
+                session.touch()
+
+        return StreamingResponse(stream(), media_type="text/event-stream",
+                                 headers={SESSION_HEADER: session.id, "Cache-Control": "no-cache"})
+
+    async def _handle_health(self, request: Request) -> Response:
+        return self._json({
+            "status": "draining" if self.draining else "ok",
+            "sessions": len(self.sessions),
+            "in_flight": self._in_flight,
+            "workers": self.max_workers,
+        }, 503 if self.draining else 200)
+
+
+def run_http(handler: Handler, host: str, port: int, **options):
+    """
+    Run the streamable HTTP transport until SIGINT/SIGTERM.
+
+    Args:
+        handler: Handles one decoded request and returns its response
+        host: Interface to bind
+        port: Port to bind
+        **options: Passed to HTTPTransport
+    """
+    import uvicorn
+
+    transport = HTTPTransport(handler, **options)
+
+    class DrainingServer(uvicorn.Server):
+        # Close notification streams first so uvicorn's graceful shutdown only waits for requests
+        def handle_exit(self, sig, frame):
+            transport.begin_shutdown()
+            super().handle_exit(sig, frame)
+
+    options = {}
+    if "timeout_graceful_shutdown" in inspect.signature(uvicorn.Config).parameters:
+        options["timeout_graceful_shutdown"] = int(transport.shutdown_timeout)
+    else:
+        # Older uvicorn releases wait for in-flight requests without a limit
+        logger.warning("This uvicorn version has no graceful shutdown timeout; MCP_HTTP_SHUTDOWN_TIMEOUT is ignored")
+    config = uvicorn.Config(
+        transport.app,
+        host=host,
+        port=port,
+        timeout_keep_alive=int(_env_number("MCP_HTTP_KEEPALIVE_TIMEOUT", "75")),
+        log_level="info",
+        **options,
+    )
+    DrainingServer(config).run()
@@ -0,0 +1,145 @@
+"""
+Concurrent stdio transport
+
+Reads line-delimited JSON requests on an asyncio loop and dispatches them
+to a bounded worker pool, so one slow render no longer blocks the requests
+queued behind it. Responses are written as soon as they are ready, in
+completion order, by a single writer task; each carries the ``id`` of its
+request so clients can correlate them.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, IO, Optional
+
+from ..core import jsoncodec
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[Dict[str, Any]], Dict[str, Any]]
+
+
+def default_worker_count() -> int:
+    """Get the configured number of stdio worker threads (MCP_STDIO_WORKERS)."""
+    return max(1, int(os.environ.get("MCP_STDIO_WORKERS", "8")))
+
+
+async def serve_stdio(
+    handler: Handler,
+    stdin: Optional[IO[str]] = None,
+    stdout: Optional[IO[str]] = None,
+    max_workers: Optional[int] = None
+):
+    """
+    Serve requests from ``stdin`` until end of input.
+
+    At most ``max_workers`` requests run at a time; reading pauses while
+    the pool is saturated. On end of input, in-flight requests are allowed
+    to finish and their responses are flushed before returning.
+
+    Args:
+        handler: Handles one decoded request and returns its response
+        stdin: Input stream (default: sys.stdin)
+        stdout: Output stream (default: sys.stdout)
+        max_workers: Concurrent requests (default: MCP_STDIO_WORKERS)
+    """
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    max_workers = max_workers or default_worker_count()
+
+    loop = asyncio.get_running_loop()
+    lines: "asyncio.Queue[Optional[str]]" = asyncio.Queue(maxsize=max_workers)
+    worker_pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="stdio-worker")
+    slots = asyncio.Semaphore(max_workers)
+    responses: "asyncio.Queue[Optional[Dict[str, Any]]]" = asyncio.Queue()
+    in_flight = set()
+
+    async def write_responses():
+        # The only place that touches stdout, so responses never interleave
+        while True:
+            response = await responses.get()
+            if response is None:
+                return
+            try:
+                line = jsoncodec.dumps(response)
+            except Exception as e:
+                # Still answer the request, so the client is not left waiting for it
+                logger.error(f"Error encoding response: {e}")
+                error = {"error": f"Could not encode response: {e}"}
+                line = jsoncodec.dumps({"id": response["id"], **error} if "id" in response else error)
+            try:
+                stdout.write(line + "\n")
+                stdout.flush()
+            except Exception as e:
+                logger.error(f"Error writing response: {e}")
+
+    async def dispatch(request: Dict[str, Any]):
+        try:
+            response = await loop.run_in_executor(worker_pool, handler, request)
+            if not isinstance(response, dict):
+                raise TypeError(f"Handler returned {type(response).__name__}, expected a response object")
+        except Exception as e:
+            logger.error(f"Error handling request: {e}")
+            response = {"error": str(e)}
+        finally:
+            slots.release()
+        if "id" in request:
+            response = {"id": request["id"], **response}
+        await responses.put(response)
+
+    def read_lines():
+        # Blocking reads run on a daemon thread so they never wait behind a
+        # render and never keep the process alive on shutdown
+        try:
+            for line in iter(stdin.readline, ""):
+                asyncio.run_coroutine_threadsafe(lines.put(line), loop).result()
+            asyncio.run_coroutine_threadsafe(lines.put(None), loop).result()
+        except RuntimeError:
+            # The loop is gone (server shutting down)
+            pass
+
+    writer = asyncio.create_task(write_responses())
+    threading.Thread(target=read_lines, name="stdio-reader", daemon=True).start()
+    try:
+        while True:
+            line = await lines.get()
+            if line is None:
+                break
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                request = jsoncodec.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("Request must be a JSON object")
+            except ValueError as e:
+                logger.error(f"Error handling request: {e}")
+                await responses.put({"error": f"Invalid request: {e}"})
+                continue
+
+            await slots.acquire()
+            task = asyncio.create_task(dispatch(request))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+
+        if in_flight:
+            await asyncio.gather(*in_flight, return_exceptions=True)
+    finally:
+        await responses.put(None)
+        await writer
+        worker_pool.shutdown(wait=True)
+
+
+def run_stdio(handler: Handler, max_workers: Optional[int] = None):
+    """
+    Run the stdio transport on stdin/stdout until end of input.
+
+    Args:
+        handler: Handles one decoded request and returns its response
+        max_workers: Concurrent requests (default: MCP_STDIO_WORKERS)
+    """
+    asyncio.run(serve_stdio(handler, max_workers=max_workers))
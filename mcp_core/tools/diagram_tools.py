@@ -2,27 +2,66 @@
 MCP tools for diagram generation using the decorator pattern
 """
 
+import contextvars
 import logging
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List, Optional
 
 from mcp_core.server.fastmcp_wrapper import FastMCP
 
 # Import the tool decorator system
 from .tool_decorator import mcp_tool, register_tools_with_server, get_tool_registry
+from .validation import DiagramTypeName
+from .middleware import (
+    ToolCall,
+    configure_middleware,
+    ErrorNormalizationMiddleware,
+    TimingMiddleware,
+    BulkheadMiddleware,
+    DeadlineMiddleware,
+    ProfilingMiddleware,
+    TraceRecordingMiddleware,
+    TracingMiddleware
+)
 
 # Import core utilities
 from ..core.utils import generate_diagram
-from ..core.config import MCP_SETTINGS
+from ..core.config import MCP_SETTINGS, on_settings_change
+from ..core.capabilities import get_capability_index
 
 logger = logging.getLogger(__name__)
 
+# Default middleware: every tool gets normalized errors, tracing spans, timing
+# and on-demand profiling (tracing and profiling stay idle until configured);
+# rendering tools share one bulkhead (they all hit the same Kroki server) and
+# a deadline
+tool_timing = TimingMiddleware()
+render_bulkhead = BulkheadMiddleware(MCP_SETTINGS.tool_max_concurrency)
+render_deadline = DeadlineMiddleware(MCP_SETTINGS.tool_deadline_seconds)
+configure_middleware([ErrorNormalizationMiddleware(), TracingMiddleware(), tool_timing, ProfilingMiddleware()])
+for _category in ("uml", "other", "database"):
+    configure_middleware([render_bulkhead, render_deadline], category=_category)
+
+@on_settings_change
+def _apply_tool_limits(changed):
+    """Resize the rendering bulkhead and deadline of the registered tools in place"""
+    if "tool_max_concurrency" in changed:
+        render_bulkhead.resize(MCP_SETTINGS.tool_max_concurrency)
+    if "tool_deadline_seconds" in changed:
+        render_deadline.seconds = MCP_SETTINGS.tool_deadline_seconds
+
+# Record tool-call traces for load-test replay (benchmarks/loadtest.py)
+if MCP_SETTINGS.tool_trace_file:
+    configure_middleware([TraceRecordingMiddleware(MCP_SETTINGS.tool_trace_file)])
+
 # Main UML generation tool
 @mcp_tool(
     description="Generate any UML diagram based on diagram type",
     category="uml"
 )
-def generate_uml(diagram_type: str, code: str, output_dir: Optional[str] = None) -> Dict[str, Any]:
+def generate_uml(diagram_type: DiagramTypeName, code: str, output_dir: Optional[str] = None) -> Dict[str, Any]:
     """Generate a UML diagram using the specified diagram type.
     
     Args:
@@ -35,15 +74,7 @@ def generate_uml(diagram_type: str, code: str, output_dir: Optional[str] = None)
     """
     logger.info(f"Called generate_uml tool: type={diagram_type}, code length={len(code)}")
     
-    # Validate diagram type
-    valid_types = getattr(MCP_SETTINGS, 'diagram_types', {})
-    if not valid_types:
-        valid_types = {"class": "Class diagram", "sequence": "Sequence diagram"}
-        
-    if diagram_type.lower() not in valid_types:
-        error_msg = f"Unsupported diagram type: {diagram_type}. Supported types: {', '.join(valid_types.keys())}"
-        logger.error(error_msg)
-        return {"error": error_msg}
+    # diagram_type was validated before dispatch (see DiagramTypeName)
     
     # Generate diagram - use default format "svg" to match tests
     return generate_diagram(diagram_type, code, "svg", output_dir)
@@ -265,6 +296,88 @@ def generate_erd_diagram(code: str, output_dir: Optional[str] = None) -> Dict[st
     logger.info(f"Called generate_erd_diagram tool: code length={len(code)}")
     return generate_uml("erd", code, output_dir)
 
+def _render_batch_item(index: int, item: Any, output_dir: Optional[str]) -> Dict[str, Any]:
+    """Validate and render a single batch entry, recording how long it took"""
+    start = time.perf_counter()
+    if not isinstance(item, dict):
+        result = {"error": "Batch entries must be objects with diagram_type, code and format"}
+        diagram_type, output_format = None, None
+    else:
+        diagram_type = item.get("diagram_type")
+        output_format = item.get("format") or "svg"
+        code = item.get("code")
+        if not diagram_type or not code:
+            result = {"error": "Batch entries require diagram_type and code"}
+        else:
+            error_msg = get_capability_index().validate(diagram_type, output_format)
+            if error_msg:
+                result = {"error": error_msg}
+            else:
+                # Share the rendering tools' bulkhead and deadline so batches cannot
+                # flood Kroki and each entry is bounded like a single render
+                call = ToolCall("generate_diagrams_batch", "batch", {"index": index})
+                result = render_bulkhead(call, lambda c: render_deadline(
+                    c, lambda _: generate_diagram(diagram_type, code, output_format, output_dir)
+                ))
+    
+    return {
+        "index": index,
+        "diagram_type": diagram_type,
+        "format": output_format,
+        **result,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 1)
+    }
+
+# Batch generation tool
+@mcp_tool(
+    description="Generate several diagrams in one call, rendered concurrently",
+    category="batch",
+    example="generate_diagrams_batch([{'diagram_type': 'class', 'code': '...', 'format': 'svg'}])"
+)
+def generate_diagrams_batch(diagrams: List[Dict[str, Any]], output_dir: Optional[str] = None) -> Dict[str, Any]:
+    """Generate several diagrams concurrently.
+    
+    Entries are rendered by up to MCP_SETTINGS.batch_max_concurrency workers,
+    so a batch of n entries takes about ceil(n / workers) rounds of renders.
+    Each entry is bounded by the rendering tools' deadline.
+    
+    Args:
+        diagrams: Entries of the form {"diagram_type": ..., "code": ..., "format": ...} (format defaults to svg)
+        output_dir: Directory where to save the generated images (optional)
+    
+    Returns:
+        Dictionary with per-entry results (in input order) and timing
+    """
+    logger.info(f"Called generate_diagrams_batch tool: {len(diagrams)} diagrams")
+    
+    if len(diagrams) > MCP_SETTINGS.batch_max_items:
+        return {"error": f"Batch too large: {len(diagrams)} diagrams (maximum {MCP_SETTINGS.batch_max_items})"}
+    
+    start = time.perf_counter()
+    workers = max(1, min(MCP_SETTINGS.batch_max_concurrency, len(diagrams)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="diagram-batch") as executor:
+        # Each entry runs in its own copy of the caller's context, so its spans join the trace
+        futures = [
+            executor.submit(contextvars.copy_context().run, _render_batch_item, index, item, output_dir)
+            for index, item in enumerate(diagrams)
+        ]
+        results = []
+        for index, future in enumerate(futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                logger.exception(f"Batch entry {index} failed: {str(e)}")
+                results.append({"index": index, "error": str(e)})
+    
+    failed = sum(1 for result in results if result.get("error"))
+    return {
+        "results": results,
+        "succeeded": len(results) - failed,
+        "failed": failed,
+        "concurrency": workers,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 1)
+    }
+
 def register_diagram_tools(server: FastMCP) -> List[str]:
     """
     Register all diagram generation tools with the MCP server
@@ -288,6 +401,15 @@ def register_diagram_tools(server: FastMCP) -> List[str]:
     
     return registered_tools
 
+def get_tool_metrics() -> Dict[str, Dict[str, float]]:
+    """
+    Get per-tool call counts and latencies recorded by the timing middleware
+    
+    Returns:
+        Dictionary mapping tool names to timing statistics
+    """
+    return tool_timing.stats()
+
 def get_tool_info() -> Dict[str, Dict[str, Any]]:
     """
     Get information about all registered tools
@@ -0,0 +1,453 @@
+"""
+Middleware pipeline for MCP tools
+
+Every tool registered through ``register_tools_with_server`` is wrapped in
+a chain of middleware assembled from three layers of configuration:
+global, per category and per tool. Middleware run outermost-first by their
+``order`` (error normalization, tracing, timing, caching, bulkheads,
+deadlines, profiling), whatever layer they were configured in.
+"""
+
+import contextvars
+import copy
+import functools
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, List, Optional
+
+from ..core import profiling, tracing
+from .validation import ValidationError, validate_arguments, validation_error_result
+
+logger = logging.getLogger(__name__)
+
+
+class ToolCall:
+    """A single invocation flowing through the middleware chain.
+
+    Attributes:
+        name: Tool name.
+        category: Tool category.
+        arguments: Bound arguments by parameter name.
+        context: Scratch space shared by middleware for this call.
+    """
+
+    __slots__ = ("name", "category", "arguments", "context")
+
+    def __init__(self, name: str, category: str, arguments: Dict[str, Any]):
+        self.name = name
+        self.category = category
+        self.arguments = arguments
+        self.context: Dict[str, Any] = {}
+
+
+Handler = Callable[[ToolCall], Any]
+
+# ToolCall.context key for a tool still running after its deadline passed
+ABANDONED_FUTURE = "abandoned_future"
+
+
+class ToolMiddleware:
+    """Base class for tool middleware.
+
+    Subclasses implement ``__call__(call, call_next)`` and return the tool
+    result (or a replacement). ``order`` decides the position in the chain;
+    lower values wrap higher ones.
+    """
+
+    order = 50
+
+    def __call__(self, call: ToolCall, call_next: Handler) -> Any:
+        return call_next(call)
+
+
+class ErrorNormalizationMiddleware(ToolMiddleware):
+    """Turn exceptions raised by tools into ``{"error": ..., "error_type": ...}`` results."""
+
+    order = 0
+
+    def __call__(self, call: ToolCall, call_next: Handler) -> Any:
+        try:
+            return call_next(call)
+        except Exception as e:
+            logger.exception(f"Tool {call.name} failed: {str(e)}")
+            return {"error": str(e) or e.__class__.__name__, "error_type": e.__class__.__name__}
+
+
+class TracingMiddleware(ToolMiddleware):
+    """Run each call in a ``tool <name>`` tracing span (see ``mcp_core.core.tracing``).
+
+    Error results count as failed spans. Does nothing unless a span
+    exporter is configured.
+    """
+
+    order = 1
+
+    def __call__(self, call: ToolCall, call_next: Handler) -> Any:
+        if not tracing.enabled():
+            return call_next(call)
+        with tracing.span(f"tool {call.name}", **{"mcp.tool": call.name, "mcp.category": call.category}) as span:
+            result = call_next(call)
+            if isinstance(result, dict) and result.get("error"):
+                span.record_error(str(result["error"]))
+                span.set_attribute("error.type", result.get("error_type"))
+            return result
+
+
+class TimingMiddleware(ToolMiddleware):
+    """Record per-tool call counts and latencies."""
+
+    order = 10
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def __call__(self, call: ToolCall, call_next: Handler) -> Any:
+        start = time.perf_counter()
+        try:
+            return call_next(call)
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            with self._lock:
+                stats = self._stats.setdefault(call.name, {"calls": 0, "total_ms": 0.0, "max_ms": 0.0, "last_ms": 0.0})
+                stats["calls"] += 1
+                stats["total_ms"] += elapsed_ms
+                stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+                stats["last_ms"] = elapsed_ms
+            logger.debug(f"Tool {call.name} took {elapsed_ms:.1f}ms")
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get timing statistics.
+
+        Returns:
+            Dictionary mapping tool names to calls, total/avg/max/last milliseconds
+        """
+        with self._lock:
+            return {
+                name: {**stats, "avg_ms": stats["total_ms"] / stats["calls"] if stats["calls"] else 0.0}
+                for name, stats in self._stats.items()
+            }
+
+
+class TraceRecordingMiddleware(ToolMiddleware):
+    """Append one JSON line per call (time, tool, arguments, latency, outcome) to a trace file.
+
+    Traces can be replayed with ``python -m benchmarks.loadtest``.
+    """
+
+    order = 5
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def __call__(self, call: ToolCall, call_next: Handler) -> Any:
+        started = time.time()
+        start = time.perf_counter()
+        ok = False
+        try:
+            result = call_next(call)
+            ok = not (isinstance(result, dict) and result.get("error"))
+            return result
+        finally:
+            record = {
+                "ts": started,
+                "tool": call.name,
+                "args": call.arguments,
+                "elapsed_ms": round((time.perf_counter() - start) * 1000, 3),
+                "ok": ok,
+            }
+            line = json.dumps(record, default=repr) + "\n"
+            with self._lock:
+                self._file.write(line)
+                self._file.flush()
+
+    def close(self):
+        """Close the trace file."""
+        with self._lock:
+            self._file.close()
+
+
+class CacheMiddleware(ToolMiddleware):
+    """Cache successful tool results by arguments for ``ttl`` seconds (LRU bounded).
+
+    Entries are stored and handed out as deep copies, so callers and outer
+    middleware may modify results freely. A result naming a ``local_path``
+    counts as a miss once that file no longer exists.
+    """
+
+    order = 20
+
+    def __init__(self, ttl: float = 300.0, max_entries: int = 256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, call: ToolCall) -> str:
+        return call.name + "\0" + json.dumps(call.arguments, sort_keys=True, default=repr)
+
+    @staticmethod
+    def _is_stale(result: Any) -> bool:
+        local_path = result.get("local_path") if isinstance(result, dict) else None
+        return bool(local_path) and not os.path.exists(local_path)
+
+    def __call__(self, call: ToolCall, call_next: Handler) -> Any:
+        key = self._key(call)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now and not self._is_stale(entry[1]):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(entry[1])
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+
+        result = call_next(call)
+        if not (isinstance(result, dict) and result.get("error")):
+            stored = copy.deepcopy(result)
+            with self._lock:
+                self._entries[key] = (now + self.ttl, stored)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return result
+
+
+class BulkheadMiddleware(ToolMiddleware):
+    """Limit concurrent executions; callers wait up to ``acquire_timeout`` for a slot.
+
+    A call abandoned by an inner ``DeadlineMiddleware`` keeps its slot until
+    the tool actually finishes, so timed-out calls still count against the
+    limit. ``resize()`` changes the limit while calls are running.
+    """
+
+    order = 30
+
+    def __init__(self, max_concurrent: int = 8, acquire_timeout: float = 30.0):
+        self.max_concurrent = max_concurrent
+        self.acquire_timeout = acquire_timeout
+        self.active = 0
+        self.rejected = 0
+        self._condition = threading.Condition()
+
+    def resize(self, max_concurrent: int):
+        """
+        Change the number of concurrent calls allowed.
+
+        Calls already running keep their slots; when shrinking, new calls
+        wait until enough of them finish.
+
+        Args:
+            max_concurrent: New limit
+        """
+        with self._condition:
+            self.max_concurrent = max_concurrent
+            self._condition.notify_all()
+
+    def _release(self, *_):
+        with self._condition:
+            self.active -= 1
+            self._condition.notify()
+
+    def __call__(self, call: ToolCall, call_next: Handler) -> Any:
+        with self._condition:
+            acquired = self._condition.wait_for(lambda: self.active < self.max_concurrent, self.acquire_timeout)
+            if acquired:
+                self.active += 1
+            else:
+                self.rejected += 1
+        if not acquired:
+            return {
+                "error": f"Tool {call.name} is busy ({self.max_concurrent} calls in progress), try again later",
+                "error_type": "BulkheadFull",
+            }
+        try:
+            return call_next(call)
+        finally:
+            abandoned = call.context.pop(ABANDONED_FUTURE, None)
+            if abandoned is not None:
+                # Runs at once if the tool has finished in the meantime
+                abandoned.add_done_callback(self._release)
+            else:
+                self._release()
+
+
+class DeadlineMiddleware(ToolMiddleware):
+    """Return a timeout error if the tool does not finish within ``seconds``.
+
+    The tool keeps running on a worker thread after the deadline passes;
+    its result is discarded. The still-running future is left in
+    ``call.context`` so outer middleware holding resources for the call
+    (``BulkheadMiddleware``) can release them when it really ends.
+    """
+
+    order = 40
+    _executor: Optional[ThreadPoolExecutor] = None
+    _executor_lock = threading.Lock()
+
+    def __init__(self, seconds: float = 60.0):
+        self.seconds = seconds
+
+    @classmethod
+    def _get_executor(cls) -> ThreadPoolExecutor:
+        if cls._executor is None:
+            with cls._executor_lock:
+                if cls._executor is None:
+                    cls._executor = ThreadPoolExecutor(
+                        max_workers=int(os.environ.get("MCP_TOOL_DEADLINE_WORKERS", "32")),
+                        thread_name_prefix="tool-deadline",
+                    )
+        return cls._executor
+
+    def __call__(self, call: ToolCall, call_next: Handler) -> Any:
+        # Run in the caller's context so context variables (profiling, tracing) carry over
+        context = contextvars.copy_context()
+        future = self._get_executor().submit(context.run, call_next, call)
+        seconds = self.seconds
+        try:
+            return future.result(timeout=seconds)
+        except FutureTimeoutError:
+            logger.warning(f"Tool {call.name} exceeded its {seconds}s deadline")
+            call.context[ABANDONED_FUTURE] = future
+            return {
+                "error": f"Tool {call.name} did not finish within {seconds} seconds",
+                "error_type": "DeadlineExceeded",
+            }
+
+
+class ProfilingMiddleware(ToolMiddleware):
+    """Profile calls that ask for it, or a sampled share of them (see ``mcp_core.core.profiling``).
+
+    Runs innermost, in the thread that executes the tool. Does nothing
+    unless ``MCP_PROFILE_DIR`` is set.
+    """
+
+    order = 45
+
+    def __call__(self, call: ToolCall, call_next: Handler) -> Any:
+        if not profiling.should_profile():
+            return call_next(call)
+        with profiling.profile(call.name):
+            return call_next(call)
+
+
+# Middleware configuration layers
+_global_middleware: List[ToolMiddleware] = []
+_category_middleware: Dict[str, List[ToolMiddleware]] = {}
+_tool_middleware: Dict[str, List[ToolMiddleware]] = {}
+
+
+def configure_middleware(
+    middleware: List[ToolMiddleware],
+    tool: Optional[str] = None,
+    category: Optional[str] = None,
+    replace: bool = False
+):
+    """
+    Add middleware globally, for a category or for a single tool.
+
+    Takes effect for tools registered afterwards.
+
+    Args:
+        middleware: Middleware instances to add
+        tool: Apply only to this tool name
+        category: Apply only to tools in this category
+        replace: Replace the existing middleware of that layer instead of extending it
+    """
+    if tool is not None:
+        layer = _tool_middleware.setdefault(tool, [])
+    elif category is not None:
+        layer = _category_middleware.setdefault(category, [])
+    else:
+        layer = _global_middleware
+    if replace:
+        layer.clear()
+    layer.extend(middleware)
+
+
+def clear_middleware():
+    """Remove all configured middleware (mainly for testing)."""
+    _global_middleware.clear()
+    _category_middleware.clear()
+    _tool_middleware.clear()
+
+
+def get_middleware_chain(tool_name: str, category: str) -> List[ToolMiddleware]:
+    """
+    Resolve the middleware chain for a tool, outermost first.
+
+    Args:
+        tool_name: Tool name
+        category: Tool category
+
+    Returns:
+        Ordered list of middleware
+    """
+    chain = _global_middleware + _category_middleware.get(category, []) + _tool_middleware.get(tool_name, [])
+    return sorted(chain, key=lambda m: m.order)
+
+
+def wrap_tool(func: Callable, tool_name: str, category: str, argument_model: Optional[type] = None) -> Callable:
+    """
+    Wrap a tool function in its argument validation and middleware chain.
+
+    The wrapper keeps the original signature (via functools.wraps) so MCP
+    servers can still introspect parameters.
+
+    Args:
+        func: The tool function
+        tool_name: Tool name
+        category: Tool category
+        argument_model: Compiled argument model (see ``validation.build_argument_model``)
+
+    Returns:
+        The wrapped function (or ``func`` itself if nothing applies)
+    """
+    chain = get_middleware_chain(tool_name, category)
+    if not chain and argument_model is None:
+        return func
+
+    signature = inspect.signature(func)
+    parameter_names = list(signature.parameters)
+
+    def invoke(call: ToolCall) -> Any:
+        return func(**call.arguments)
+
+    handler: Handler = invoke
+    for middleware in reversed(chain):
+        handler = functools.partial(middleware, call_next=handler)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if argument_model is None:
+            bound = signature.bind(*args, **kwargs)
+            return handler(ToolCall(tool_name, category, dict(bound.arguments)))
+        
+        # Validate everything in one pass before any middleware runs
+        if len(args) > len(parameter_names):
+            return validation_error_result(tool_name, [{
+                "loc": (), "msg": f"takes {len(parameter_names)} arguments but {len(args)} were given", "type": "too_many_arguments"
+            }])
+        arguments = dict(zip(parameter_names, args))
+        arguments.update(kwargs)
+        try:
+            arguments = validate_arguments(argument_model, arguments)
+        except ValidationError as e:
+            return validation_error_result(tool_name, e.errors())
+        return handler(ToolCall(tool_name, category, arguments))
+
+    wrapper.__mcp_middleware__ = [type(m).__name__ for m in chain]
+    return wrapper
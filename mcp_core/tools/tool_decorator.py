@@ -3,9 +3,11 @@ Decorator system for MCP tools
 """
 import logging
 import inspect
-from typing import Dict, List, Any, Optional, Callable, TypeVar, cast
+from typing import Annotated, Dict, List, Any, Optional, Callable, TypeVar, cast, get_origin
 
 from mcp_core.server.fastmcp_wrapper import FastMCP
+from .middleware import wrap_tool
+from .validation import build_argument_model
 
 logger = logging.getLogger(__name__)
 
@@ -51,6 +53,9 @@ def mcp_tool(
         
         for param_name, param in sig.parameters.items():
             param_type = param.annotation if param.annotation is not inspect.Parameter.empty else None
+            if get_origin(param_type) is Annotated:
+                # Report the underlying type of constrained parameters
+                param_type = param_type.__origin__
             param_default = None if param.default is inspect.Parameter.empty else param.default
             
             param_info[param_name] = {
@@ -91,7 +96,11 @@ def register_tools_with_server(server: FastMCP) -> List[str]:
     registered_tools = []
     
     for tool_name, tool_info in _registered_tools.items():
-        func = tool_info["function"]
+        # Compile the argument model once, then wrap the tool in validation and its middleware chain
+        if "argument_model" not in tool_info:
+            tool_info["argument_model"] = build_argument_model(tool_info["function"], tool_name)
+        func = wrap_tool(tool_info["function"], tool_name, tool_info["category"], tool_info["argument_model"])
+        tool_info["wrapped"] = func
         
         # Register with server (handle different server APIs)
         try:
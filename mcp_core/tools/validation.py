@@ -0,0 +1,116 @@
+"""
+Argument validation for MCP tools
+
+Each tool gets one pydantic model compiled from its signature when it is
+registered. Calls are validated against that model in a single pass before
+they reach the middleware chain, and failures are returned as structured
+errors instead of exceptions.
+"""
+
+import inspect
+import logging
+from typing import Annotated, Any, Callable, Dict, List, Type
+
+from pydantic import AfterValidator, BaseModel, ConfigDict, ValidationError, create_model
+
+from ..core.capabilities import get_capability_index
+
+logger = logging.getLogger(__name__)
+
+
+def _check_diagram_type(value: str) -> str:
+    error_msg = get_capability_index().validate(value)
+    if error_msg:
+        raise ValueError(error_msg)
+    return value
+
+
+# A diagram type name known to the capability index
+DiagramTypeName = Annotated[str, AfterValidator(_check_diagram_type)]
+
+
+def build_argument_model(func: Callable, tool_name: str) -> Type[BaseModel]:
+    """
+    Compile a pydantic model for a tool's arguments.
+
+    Parameters without annotations accept any value; parameters without
+    defaults are required. Unknown arguments are rejected.
+
+    Args:
+        func: The tool function
+        tool_name: Tool name (used for the model name)
+
+    Returns:
+        The argument model class
+    """
+    fields: Dict[str, Any] = {}
+    for name, param in inspect.signature(func).parameters.items():
+        if param.kind in (inspect.Parameter.VAR_POSITIONAL, inspect.Parameter.VAR_KEYWORD):
+            continue
+        annotation = Any if param.annotation is inspect.Parameter.empty else param.annotation
+        default = ... if param.default is inspect.Parameter.empty else param.default
+        fields[name] = (annotation, default)
+
+    model_name = "".join(part.capitalize() for part in tool_name.split("_")) + "Arguments"
+    return create_model(
+        model_name,
+        __config__=ConfigDict(extra="forbid", arbitrary_types_allowed=True),
+        **fields
+    )
+
+
+def validation_error_result(tool_name: str, errors: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Build the structured error returned for invalid arguments.
+
+    Args:
+        tool_name: Tool name
+        errors: Errors as produced by ``ValidationError.errors()``
+
+    Returns:
+        Dictionary with error, error_type and per-field details
+    """
+    details = [
+        {
+            "field": ".".join(str(part) for part in error["loc"]) or "arguments",
+            "message": error["msg"],
+            "type": error["type"],
+        }
+        for error in errors
+    ]
+    summary = "; ".join(f"{detail['field']}: {detail['message']}" for detail in details)
+    return {
+        "error": f"Invalid arguments for {tool_name}: {summary}",
+        "error_type": "ValidationError",
+        "details": details,
+    }
+
+
+def validate_arguments(model: Type[BaseModel], arguments: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Validate arguments against a compiled model.
+
+    Only the arguments that were passed are returned, so the tool's own
+    defaults still apply to omitted parameters.
+
+    Args:
+        model: Argument model from ``build_argument_model``
+        arguments: Arguments by parameter name
+
+    Returns:
+        The validated (and coerced) arguments
+
+    Raises:
+        ValidationError: If the arguments do not match the model
+    """
+    instance = model.model_validate(arguments)
+    return {name: getattr(instance, name) for name in arguments}
+
+
+__all__ = [
+    "DiagramTypeName",
+    "ValidationError",
+    "build_argument_model",
+    "validate_arguments",
+    "validation_error_result",
+]
@@ -1,89 +1,236 @@
 #!/usr/bin/env python3
 """
-UML Diagram Generator - Simplified MCP Server
+UML-MCP-Server: UML diagram generation server with MCP interface
 
-A minimal MCP server for generating UML diagrams using FastMCP, Typer, and Rich.
+This module provides the main entry point for the MCP server that generates UML
+diagrams through the Model Context Protocol (MCP).
+
+MCP clients spawn this process on demand, so everything that is not needed
+to answer the first request is imported lazily: Rich is only loaded for
+interactive output, renderer packages are checked with ``find_spec``
+instead of being imported, and the Kroki HTTP client is created on the
+first render.
 """
 
 import os
-import zlib
-import base64
-from typing import Dict, Any
-
-import typer
-from rich import print
-from rich.console import Console
-from rich.table import Table
-
-from mcp.server.fastmcp import FastMCP
-from mcp.types import TextContent, PromptMessage, GetPromptResult
-
-# Configuration: Use PlantUML server (can be overridden with env var)
-PLANTUML_SERVER = os.environ.get("PLANTUML_SERVER", "http://www.plantuml.com/plantuml")
-
-
-def encode_plantuml(text: str) -> str:
-    """Encode PlantUML text using zlib and base64."""
-    compressed = zlib.compress(text.encode("utf-8"))
-    # Strip the first two and last four bytes per PlantUML spec
-    return base64.urlsafe_b64encode(compressed[2:-4]).decode("utf-8")
-
-
-def generate_diagram(code: str, fmt: str = "svg") -> Dict[str, Any]:
-    """Generate a diagram URL using the PlantUML server."""
-    encoded = encode_plantuml(code)
-    url = f"{PLANTUML_SERVER}/{fmt}/{encoded}"
-    return {"url": url, "code": code}
-
-
-# Create a FastMCP server instance
-server = FastMCP("UML Diagram Generator")
-
-
-# Register an MCP tool to generate a UML diagram
-@server.tool(name="generate_uml", description="Generate a UML diagram using PlantUML")
-def generate_uml(diagram_type: str, code: str) -> Dict[str, Any]:
-    # For simplicity, the diagram_type parameter is not used.
-    return generate_diagram(code)
-
-
-# Register an MCP resource to expose server info
-@server.resource("uml://info")
-def get_info() -> Dict[str, Any]:
-    return {"server": "UML Diagram Generator", "version": "1.0"}
-
-
-# Register an MCP prompt with a simple template
-@server.prompt(name="simple_prompt", description="Simple prompt for diagram generation")
-def simple_prompt(context: Dict[str, Any]) -> GetPromptResult:
-    code = context.get("code", "@startuml\nAlice -> Bob: Hello\n@enduml")
-    return GetPromptResult(
-        description="Simple prompt for UML diagram",
-        messages=[PromptMessage(role="user", content=TextContent(text=code))]
-    )
-
-
-# Set up the CLI using Typer and Rich
-cli = typer.Typer()
-
-
-@cli.command()
-def run():
-    """Run the MCP server using stdio transport."""
+import sys
+import logging
+
+# Rich console, created on first use
+_console = None
+
+def get_console():
+    """Get the Rich console used for interactive output.
+
+    The console writes to stderr so it never corrupts the stdio transport.
+    """
+    global _console
+    if _console is None:
+        from rich.console import Console
+        _console = Console(stderr=True)
+    return _console
+
+# Parse command line arguments
+def parse_args(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="UML-MCP Diagram Generation Server")
+    parser.add_argument("--debug", action="store_true", help="Enable debug logging")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Server host (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8000, help="Server port (default: 8000)")
+    parser.add_argument("--transport", type=str, choices=["stdio", "http"], default="stdio",
+                        help="Transport protocol (default: stdio)")
+    parser.add_argument("--list-tools", action="store_true", help="List available tools and exit")
+    return parser.parse_args(argv)
+
+# Configure logging based on arguments
+def setup_logging(debug=False, interactive=False):
+    import datetime
+
+    level = logging.DEBUG if debug else logging.INFO
+
+    # Create logs directory if it doesn't exist
+    log_dir = "logs"
+    os.makedirs(log_dir, exist_ok=True)
+
+    # Generate log filename with today's date
+    date_str = datetime.datetime.now().strftime("%Y-%m-%d")
+    log_file = os.path.join(log_dir, f"uml_mcp_server_{date_str}.log")
+
+    # Configure file handler
+    file_handler = logging.FileHandler(log_file)
+    file_handler.setLevel(level)
+    file_handler.setFormatter(logging.Formatter(
+        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    ))
+
+    # Configure console handler (Rich only when a person is watching)
+    if interactive:
+        from rich.logging import RichHandler
+        console_handler = RichHandler(console=get_console(), rich_tracebacks=True)
+        console_handler.setFormatter(logging.Formatter("%(message)s", datefmt="[%X]"))
+    else:
+        console_handler = logging.StreamHandler(sys.stderr)
+        console_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    console_handler.setLevel(level)
+
+    # Configure root logger
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(console_handler)
+    root.addHandler(file_handler)
+
+    return logging.getLogger(__name__)
+
+def find_missing_modules(required_modules):
+    """
+    Check that required modules are installed without importing them.
+
+    Args:
+        required_modules: Mapping of module names to display names
+
+    Returns:
+        Display names of modules that cannot be found
+    """
+    from importlib.util import find_spec
+
+    missing = []
+    for module_name, display_name in required_modules.items():
+        try:
+            found = find_spec(module_name) is not None
+        except (ImportError, ValueError):
+            found = False
+        if not found:
+            missing.append(display_name)
+    return missing
+
+# Function to display the tools, prompts, and resources
+def display_tools_and_resources(mcp_settings):
+    """Display information about all available tools, prompts, and resources in the MCP server"""
+    from rich.console import Console
+
+    # The listing is the command's output, so it goes to stdout
     console = Console()
-    console.print("[bold green]Starting UML Diagram Generator MCP Server...[/bold green]")
-    server.run()
+    console.print(_build_table("Available UML-MCP Tools", ["Tool Name", "Description", "Parameters"], _tool_rows(mcp_settings)))
+    console.print(_build_table("Available Prompts", ["Prompt Name", "Description"], _prompt_rows(mcp_settings)))
+    console.print(_build_table("Available Resources", ["Resource URI", "Description"], _resource_rows(mcp_settings)))
+
+def _build_table(title, columns, rows):
+    from rich.table import Table
+
+    table = Table(title=f"[bold blue]{title}[/bold blue]")
+    for column, style in zip(columns, ["cyan", "green", "yellow"]):
+        table.add_column(column, style=style)
+    for row in rows:
+        table.add_row(*row)
+    return table
+
+def _tool_rows(mcp_settings):
+    """Rows describing the registered tools"""
+    from mcp_core.tools.tool_decorator import get_tool_registry
+    tool_registry = get_tool_registry()
+
+    rows = []
+    for tool_name, tool_info in tool_registry.items():
+        # Skip internal tools
+        if tool_name == 'tool_function':
+            continue
+        description = tool_info.get("description", "No description available")
+        params = tool_info.get("parameters", {})
+        param_str = ", ".join([f"{name}: {info['type']}" for name, info in params.items()])
+        rows.append((tool_name, description, param_str))
+    return rows or [("No tools found", "Check server configuration", "")]
+
+def _prompt_rows(mcp_settings):
+    """Rows describing the registered prompts"""
+    from mcp_core.prompts.diagram_prompts import get_prompt_registry
+    prompt_registry = get_prompt_registry()
+
+    rows = [(name, info.get("description", "No description available")) for name, info in prompt_registry.items()]
+    return rows or [("No prompts found", "Check server configuration")]
+
+def _resource_rows(mcp_settings):
+    """Rows describing the registered resources"""
+    from mcp_core.resources.diagram_resources import get_resource_registry
+    resource_registry = get_resource_registry()
+
+    rows = [(uri, info.get("description", "No description available")) for uri, info in resource_registry.items()]
+    return rows or [("No resources found", "Check server configuration")]
+
+def display_server_info(mcp_settings, args):
+    """Display the server banner and configuration on stderr"""
+    from rich.panel import Panel
+    from rich.table import Table
+
+    console = get_console()
+    console.print(Panel(f"[bold green]UML-MCP Server v{mcp_settings.version}[/bold green]"))
+
+    table = Table(title="Server Configuration")
+    table.add_column("Setting", style="cyan")
+    table.add_column("Value", style="green")
+
+    table.add_row("Server Name", mcp_settings.server_name)
+    table.add_row("Transport", args.transport)
+    table.add_row("Available Tools", str(len(mcp_settings.tools)))
+    table.add_row("Available Prompts", str(len(mcp_settings.prompts)))
+    table.add_row("Available Resources", str(len(mcp_settings.resources)))
+    if args.transport == "http":
+        table.add_row("Host", args.host)
+        table.add_row("Port", str(args.port))
 
-
-@cli.command()
-def info():
-    """Display server information."""
-    console = Console()
-    table = Table("Property", "Value")
-    table.add_row("Server", "UML Diagram Generator")
-    table.add_row("Version", "1.0")
     console.print(table)
 
+def main(argv=None):
+    # Parse arguments and set up logging
+    args = parse_args(argv)
+    list_tools = args.list_tools or os.environ.get("LIST_TOOLS", "").lower() == "true"
+    interactive = list_tools or sys.stderr.isatty()
+    logger = setup_logging(args.debug, interactive)
+
+    logger.info(f"Starting UML-MCP Server with transport: {args.transport}")
+
+    # Check required modules
+    required_modules = {
+        "kroki.kroki": "Kroki",
+        "plantuml": "PlantUML",
+        "mermaid.mermaid": "Mermaid",
+        "D2.run_d2": "D2"
+    }
+    missing_modules = find_missing_modules(required_modules)
+    if missing_modules:
+        logger.critical(f"Missing required modules: {', '.join(missing_modules)}. "
+                        "Please ensure all project components are correctly installed.")
+        sys.exit(1)
+
+    # Import core server
+    try:
+        from mcp_core.core.server import get_mcp_server, start_server
+        from mcp_core.core.config import MCP_SETTINGS
+
+        # Update settings from command line args if applicable
+        if hasattr(MCP_SETTINGS, 'update_from_args'):
+            MCP_SETTINGS.update_from_args(args)
+
+        # Note: get_mcp_server() already registers components when first called
+        get_mcp_server()
+
+        # Display server info (after tools and prompts are registered)
+        if interactive:
+            display_server_info(MCP_SETTINGS, args)
+
+        # Display tools list if requested
+        if list_tools:
+            display_tools_and_resources(MCP_SETTINGS)
+            return
+
+        # Start MCP server
+        start_server(transport=args.transport, host=args.host, port=args.port)
+    except KeyboardInterrupt:
+        logger.info("Server stopped by user")
+    except Exception as e:
+        logger.critical(f"Server error: {str(e)}", exc_info=True)
+    finally:
+        logger.info("Server shut down")
 
 if __name__ == "__main__":
-    cli()
+    main()
@@ -0,0 +1,71 @@
+"""
+Tests for the admission controller.
+"""
+import asyncio
+import pytest
+
+from mcp_core.core.admission import AdmissionController, AdmissionRejected, TokenBucket
+
+def test_token_bucket_refill():
+    """Test that the token bucket allows a burst and then refills over time."""
+    bucket = TokenBucket(rate=2.0, capacity=2, now=0.0)
+    assert bucket.try_acquire(now=0.0) == 0.0
+    assert bucket.try_acquire(now=0.0) == 0.0
+    
+    # Bucket is empty, next token arrives after half a second
+    assert bucket.try_acquire(now=0.0) == pytest.approx(0.5)
+    assert bucket.try_acquire(now=0.5) == 0.0
+
+def test_queue_full_rejects_immediately():
+    """Test that arrivals beyond the queue bound are rejected with a retry hint."""
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, max_queue=1, queue_timeout=5)
+        await controller.acquire("a")
+        waiter = asyncio.ensure_future(controller.acquire("b"))
+        await asyncio.sleep(0)
+        
+        with pytest.raises(AdmissionRejected) as excinfo:
+            await controller.acquire("c")
+        assert excinfo.value.reason == "queue_full"
+        assert int(excinfo.value.retry_after_header) >= 1
+        
+        # Releasing the first slot hands it to the queued waiter
+        controller.release()
+        await waiter
+        stats = controller.stats()
+        assert stats["in_flight"] == 1
+        assert stats["queue_depth"] == 0
+        assert stats["rejected"]["queue_full"] == 1
+        controller.release()
+        assert controller.stats()["in_flight"] == 0
+    
+    asyncio.run(scenario())
+
+def test_queue_timeout_rejects():
+    """Test that waiters give up after the queue timeout."""
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, max_queue=4, queue_timeout=0.01)
+        await controller.acquire()
+        with pytest.raises(AdmissionRejected) as excinfo:
+            await controller.acquire()
+        assert excinfo.value.reason == "queue_timeout"
+        assert controller.stats()["queue_depth"] == 0
+    
+    asyncio.run(scenario())
+
+def test_per_client_rate_limit():
+    """Test that each client has its own token bucket."""
+    async def scenario():
+        controller = AdmissionController(max_in_flight=10, rate=1.0, burst=1)
+        async with controller.slot("a"):
+            pass
+        with pytest.raises(AdmissionRejected) as excinfo:
+            await controller.acquire("a")
+        assert excinfo.value.reason == "rate_limited"
+        
+        # Another client is unaffected
+        async with controller.slot("b"):
+            pass
+        assert controller.stats()["rejected"]["rate_limited"] == 1
+    
+    asyncio.run(scenario())
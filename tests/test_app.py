@@ -124,4 +124,199 @@ def test_openapi_spec():
     # OpenAPI spec should contain standard fields
     assert "openapi" in response.json()
     assert "info" in response.json()
-    assert "paths" in response.json()
\ No newline at end of file
+    assert "paths" in response.json()
+
+def test_generate_diagram_rejected_when_queue_full(mock_generate_diagram):
+    """Test that a saturated admission queue answers 429 with Retry-After."""
+    import app as app_module
+    from mcp_core.core.admission import AdmissionController
+    
+    saturated = AdmissionController(max_in_flight=0, max_queue=0)
+    with patch.object(app_module, "admission", saturated):
+        response = client.post("/generate_diagram", json={
+            "lang": "plantuml",
+            "type": "class",
+            "code": "@startuml\nclass Test\n@enduml"
+        })
+    
+    assert response.status_code == 429
+    assert "Retry-After" in response.headers
+    assert saturated.stats()["rejected"]["queue_full"] == 1
+    mock_generate_diagram.assert_not_called()
+
+def test_admission_rejections_carry_cors_headers(mock_generate_diagram):
+    """Test that 429s are readable by browsers and preflights skip admission."""
+    import app as app_module
+    from mcp_core.core.admission import AdmissionController
+    
+    saturated = AdmissionController(max_in_flight=0, max_queue=0)
+    origin = {"Origin": "https://editor.example.com"}
+    with patch.object(app_module, "admission", saturated):
+        preflight = client.options("/generate_diagram", headers={
+            **origin, "Access-Control-Request-Method": "POST"
+        })
+        response = client.post("/generate_diagram", headers=origin, json={
+            "lang": "plantuml",
+            "type": "class",
+            "code": "@startuml\nclass Test\n@enduml"
+        })
+    
+    assert preflight.status_code == 200
+    assert response.status_code == 429
+    assert response.headers["access-control-allow-origin"] in ("*", origin["Origin"])
+    assert "Retry-After" in response.headers
+    assert "retry-after" in response.headers["access-control-expose-headers"].lower()
+    # Only the POST went through admission
+    assert saturated.stats()["rejected"]["queue_full"] == 1
+
+def test_client_id_ignores_untrusted_forwarded_for():
+    """Test that X-Forwarded-For only picks the rate-limit key behind a trusted proxy."""
+    import app as app_module
+    from starlette.requests import Request as StarletteRequest
+    
+    def make_request(peer, forwarded):
+        return StarletteRequest({
+            "type": "http",
+            "headers": [(b"x-forwarded-for", forwarded.encode())],
+            "client": (peer, 1234),
+        })
+    
+    with patch.object(app_module, "TRUSTED_PROXIES", set()):
+        assert app_module._client_id(make_request("203.0.113.7", "198.51.100.1")) == "203.0.113.7"
+    with patch.object(app_module, "TRUSTED_PROXIES", {"10.0.0.1", "10.0.0.2"}):
+        assert app_module._client_id(make_request("203.0.113.7", "198.51.100.1")) == "203.0.113.7"
+        # Entries added by the client before the proxies are not believed
+        request = make_request("10.0.0.1", "1.2.3.4, 198.51.100.1, 10.0.0.2")
+        assert app_module._client_id(request) == "198.51.100.1"
+
+def test_metrics_endpoint():
+    """Test that admission metrics are exposed."""
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert "queue_depth" in response.json()["admission"]
+
+def test_supported_formats_precomputed_encodings():
+    """Test that static routes negotiate gzip and honour ETags."""
+    plain = client.get("/supported_formats", headers={"Accept-Encoding": "identity"})
+    assert plain.status_code == 200
+    assert "Content-Encoding" not in plain.headers
+    assert "plantuml" in plain.json()["formats"]
+    
+    compressed = client.get("/supported_formats", headers={"Accept-Encoding": "gzip"})
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert compressed.json() == plain.json()
+    assert compressed.headers["ETag"] != plain.headers["ETag"]
+    
+    cached = client.get(
+        "/supported_formats",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": compressed.headers["ETag"]}
+    )
+    assert cached.status_code == 304
+
+def test_serve_svgz_without_recompression(tmp_path):
+    """Test that stored .svgz files are sent gzip-encoded or decompressed on demand."""
+    import gzip
+    svg = b"<svg xmlns='http://www.w3.org/2000/svg'></svg>"
+    (tmp_path / "diagram.svgz").write_bytes(gzip.compress(svg))
+    
+    with patch.dict(os.environ, {"VERCEL_OUTPUT_DIR": str(tmp_path)}):
+        encoded = client.get("/diagrams/diagram.svgz", headers={"Accept-Encoding": "gzip"})
+        plain = client.get("/diagrams/diagram.svgz", headers={"Accept-Encoding": "identity"})
+        missing = client.get("/diagrams/missing.svg")
+    
+    assert encoded.status_code == 200
+    assert encoded.headers["Content-Encoding"] == "gzip"
+    assert encoded.headers["Content-Type"] == "image/svg+xml"
+    assert encoded.content == svg
+    assert "Content-Encoding" not in plain.headers
+    assert plain.content == svg
+    assert missing.status_code == 404
+
+def test_preview_websocket_debounces_edits(mock_generate_diagram):
+    """Test that rapid edits over the preview socket produce a single render of the latest code."""
+    import app as app_module
+    
+    edits = ["@startuml\nclass A\n@enduml", "@startuml\nclass AB\n@enduml", "@startuml\nclass ABC\n@enduml"]
+    with patch.object(app_module, "PREVIEW_DEBOUNCE_SECONDS", 0.2):
+        with client.websocket_connect("/ws/preview") as websocket:
+            for revision, code in enumerate(edits, start=1):
+                websocket.send_json({"lang": "plantuml", "type": "class", "code": code, "revision": revision})
+            message = websocket.receive_json()
+    
+    assert message["type"] == "result"
+    assert message["revision"] == 3
+    assert message["url"] == "https://kroki.io/plantuml/svg/test_url"
+    mock_generate_diagram.assert_called_once()
+    assert mock_generate_diagram.call_args[1]["code"] == edits[-1]
+
+def test_preview_websocket_reports_errors(mock_generate_diagram):
+    """Test that render errors are pushed back over the preview socket."""
+    import app as app_module
+    
+    mock_generate_diagram.return_value = {"code": "bad", "error": "Syntax error"}
+    with patch.object(app_module, "PREVIEW_DEBOUNCE_SECONDS", 0):
+        with client.websocket_connect("/ws/preview") as websocket:
+            websocket.send_json({"lang": "plantuml", "type": "class", "code": "bad"})
+            message = websocket.receive_json()
+    
+    assert message == {"type": "error", "revision": 1, "error": "Syntax error"}
+
+def test_preview_websocket_rejects_invalid_json(mock_generate_diagram):
+    """Test that malformed messages are answered with an error and keep the socket open."""
+    import app as app_module
+    
+    with patch.object(app_module, "PREVIEW_DEBOUNCE_SECONDS", 0):
+        with client.websocket_connect("/ws/preview") as websocket:
+            websocket.send_text("{not json")
+            error = websocket.receive_json()
+            websocket.send_json({"lang": "plantuml", "type": "class", "code": "@startuml\nclass A\n@enduml"})
+            result = websocket.receive_json()
+    
+    assert error["type"] == "error" and error["error"].startswith("Invalid JSON")
+    assert result["type"] == "result" and result["revision"] == 1
+
+def test_preview_superseded_render_keeps_its_slot(mock_generate_diagram):
+    """Test that a render overtaken by a newer edit holds its admission slot until it finishes."""
+    import threading
+    import time
+    import app as app_module
+    from mcp_core.core.admission import AdmissionController
+    
+    started, release = threading.Event(), threading.Event()
+    result = dict(mock_generate_diagram.return_value)
+    def slow_render(**kwargs):
+        started.set()
+        release.wait(5)
+        return result
+    mock_generate_diagram.side_effect = slow_render
+    
+    controller = AdmissionController(max_in_flight=1, max_queue=4)
+    with patch.object(app_module, "PREVIEW_DEBOUNCE_SECONDS", 0), patch.object(app_module, "admission", controller):
+        with client.websocket_connect("/ws/preview") as websocket:
+            websocket.send_json({"lang": "plantuml", "type": "class", "code": "class A", "revision": 1})
+            assert started.wait(5)
+            started.clear()
+            websocket.send_json({"lang": "plantuml", "type": "class", "code": "class AB", "revision": 2})
+            time.sleep(0.2)
+            # The first render is still running: it keeps the only slot and the second waits
+            assert controller.stats()["in_flight"] == 1
+            assert mock_generate_diagram.call_count == 1
+            release.set()
+            message = websocket.receive_json()
+    
+    assert message["type"] == "result" and message["revision"] == 2
+    assert mock_generate_diagram.call_count == 2
+    assert controller.stats()["in_flight"] == 0
+
+def test_generate_diagram_rejects_unsupported_format(mock_generate_diagram):
+    """Test that unsupported type/format pairs fail fast without rendering."""
+    response = client.post("/generate_diagram", json={
+        "lang": "bpmn",
+        "type": "bpmn",
+        "code": "<definitions/>",
+        "output_format": "png"
+    })
+    
+    assert response.status_code == 400
+    assert "Unsupported output format" in response.json()["detail"]
+    mock_generate_diagram.assert_not_called()
@@ -0,0 +1,109 @@
+"""
+Tests for the benchmark baseline store and regression comparator
+"""
+
+import json
+import random
+
+from benchmarks import compare
+
+
+def _stats(median_us, spread=0.02, rounds=7, seed=0):
+    rng = random.Random(seed)
+    samples = [median_us * (1 + rng.uniform(-spread, spread)) for _ in range(rounds)]
+    samples.sort()
+    return {"median_us": samples[rounds // 2], "stdev_us": 0.0, "samples_us": samples, "input_bytes": 100}
+
+
+def _run(commit, scale=None, seed=0):
+    scale = scale or {}
+    cases = {
+        "kroki.deflate_and_encode": ("encoding", 20.0),
+        "svg.validate_svg": ("validation", 300.0),
+        "ai_uml.render_blocks": ("rendering", 5000.0),
+        "generate_diagram": ("request-path", 900.0),
+    }
+    results = {}
+    for i, (name, (group, median)) in enumerate(cases.items()):
+        results[name] = {"group": group, "sizes": {
+            "small": _stats(median * scale.get(name, 1.0), seed=seed * 100 + i),
+        }}
+    return {"meta": {"commit": commit, "created": f"2026-01-01T00:00:{seed:02d}",
+                     "python": "3.12.0", "platform": "linux"},
+            "results": results}
+
+
+def test_generate_diagram_slowdown_fails_verdict():
+    """Test that a 20% slower generate_diagram is flagged as a regression."""
+    result = compare.compare_runs([_run("a" * 40)], [_run("b" * 40, {"generate_diagram": 1.2}, seed=1)])
+    assert result["verdict"] == "fail"
+    assert result["regressions"] == ["generate_diagram[small]"]
+    row = next(row for row in result["comparisons"] if row["case"] == "generate_diagram")
+    assert 0.15 < row["change"] < 0.25 and row["status"] == "regression"
+    assert "FAIL" in compare.format_comparison(result)
+
+
+def test_noise_and_groups():
+    """Test that run-to-run noise passes and non-gating groups only report."""
+    assert compare.compare_runs([_run("a")], [_run("b", seed=2)])["verdict"] == "pass"
+
+    result = compare.compare_runs([_run("a")], [_run("b", {"ai_uml.render_blocks": 1.5, "svg.validate_svg": 0.5})])
+    assert result["verdict"] == "pass"
+    statuses = {row["case"]: row["status"] for row in result["comparisons"]}
+    assert statuses["ai_uml.render_blocks"] == "regression"
+    assert statuses["svg.validate_svg"] == "improvement"
+
+    # A 20% change inside very noisy measurements is not called a regression
+    noisy_base, noisy = _run("a"), _run("b", {"generate_diagram": 1.2})
+    for run, seed in ((noisy_base, 3), (noisy, 4)):
+        run["results"]["generate_diagram"]["sizes"]["small"] = _stats(
+            run["results"]["generate_diagram"]["sizes"]["small"]["median_us"], spread=0.8, rounds=3, seed=seed)
+    row = next(row for row in compare.compare_runs([noisy_base], [noisy])["comparisons"] if row["case"] == "generate_diagram")
+    assert row["status"] != "regression" and row["noise"] > 0.2
+
+
+def test_run_to_run_spread():
+    """Test that several runs per side measure noise between runs, not just between rounds."""
+    drifting = [_run("a", {"generate_diagram": level}, seed=seed) for seed, level in enumerate((1.0, 1.4, 0.8))]
+    result = compare.compare_runs(drifting, [_run("b", {"generate_diagram": 1.2}, seed=9)])
+    row = next(row for row in result["comparisons"] if row["case"] == "generate_diagram")
+    assert row["runs"] == [3, 1]
+    assert row["status"] == "noisy" and result["verdict"] == "pass"
+
+    steady = [_run("a", seed=seed) for seed in range(3)]
+    slower = [_run("b", {"generate_diagram": 1.2}, seed=seed + 10) for seed in range(3)]
+    assert compare.compare_runs(steady, slower)["regressions"] == ["generate_diagram[small]"]
+
+
+def test_new_errors_fail_verdict():
+    candidate = _run("b")
+    candidate["results"]["generate_diagram"]["sizes"]["small"] = {"input_bytes": 100, "error": "URL too long"}
+    result = compare.compare_runs([_run("a")], [candidate])
+    assert result["verdict"] == "fail"
+    assert result["regressions"] == ["generate_diagram[small]"]
+
+
+def test_store_and_compare_cli(tmp_path):
+    """Test saving a baseline per commit and comparing a run through the CLI."""
+    results_dir = str(tmp_path / "results")
+    base_path, run_path, verdict_path = tmp_path / "base.json", tmp_path / "run.json", tmp_path / "verdict.json"
+    base_path.write_text(json.dumps(_run("1234567890abcdef")))
+    run_path.write_text(json.dumps(_run("fedcba0987654321", {"kroki.deflate_and_encode": 1.3}, seed=5)))
+
+    assert compare.main(["--results-dir", results_dir, "compare", str(run_path)]) == 2
+    assert compare.main(["--results-dir", results_dir, "save", str(base_path), "--baseline"]) == 0
+    assert compare.main(["--results-dir", results_dir, "save", str(base_path)]) == 0
+    assert len(compare.load_baseline(results_dir)) == 2
+
+    assert compare.main(["--results-dir", results_dir, "compare", str(run_path), "--save",
+                         "--verdict", str(verdict_path)]) == 1
+    verdict = json.loads(verdict_path.read_text())
+    assert verdict["verdict"] == "fail"
+    assert verdict["baseline"] == "1234567890abcdef"
+    assert verdict["regressions"] == ["kroki.deflate_and_encode[small]"]
+
+    runs = compare.list_runs(results_dir)
+    assert [run["name"] for run in runs if run["baseline"]] == ["1234567890ab"]
+    assert [run["runs"] for run in runs] == [2, 1]
+    assert compare.load_baseline(results_dir, "fedcba")[0]["meta"]["commit"] == "fedcba0987654321"
+    assert compare.main(["--results-dir", results_dir, "compare", str(run_path), "--groups", "validation"]) == 0
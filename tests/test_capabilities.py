@@ -0,0 +1,31 @@
+"""
+Tests for the diagram capability index.
+"""
+from kroki.kroki import LANGUAGE_OUTPUT_SUPPORT
+from mcp_core.core.config import DiagramType
+from mcp_core.core.capabilities import CapabilityIndex, get_capability_index
+
+def test_formats_follow_kroki_support():
+    """Test that valid formats come from the Kroki language, not a blanket default."""
+    index = get_capability_index()
+    
+    assert index.get("bpmn").formats == ("svg",)
+    assert index.supports("class", "pdf")
+    assert index.get("class").kroki_language == "plantuml"
+    assert not index.supports("bpmn", "png")
+
+def test_validate_messages():
+    """Test validation errors for unknown types and unsupported formats."""
+    index = get_capability_index()
+    
+    assert index.validate("CLASS", "svg") is None
+    assert "Unsupported diagram type" in index.validate("nonexistent", "svg")
+    assert "Unsupported output format 'png' for bpmn" in index.validate("bpmn", "png")
+
+def test_configured_formats_are_intersected():
+    """Test that explicitly configured formats are restricted to what Kroki renders."""
+    index = CapabilityIndex(
+        {"flow": DiagramType(backend="bpmn", description="Flow", formats=["png", "svg"])},
+        LANGUAGE_OUTPUT_SUPPORT
+    )
+    assert index.formats() == {"flow": ["svg"]}
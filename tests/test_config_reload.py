@@ -0,0 +1,72 @@
+"""
+Tests for hot-reloading runtime configuration.
+"""
+import json
+import pytest
+
+from mcp_core.core.config import MCP_SETTINGS, apply_settings, reload_settings, get_settings_status
+from mcp_core.core.reloader import ConfigReloader
+from mcp_core.core import utils
+
+@pytest.fixture
+def restore_settings():
+    """Restore the reloadable settings after a test."""
+    saved = {
+        "kroki_server": MCP_SETTINGS.kroki_server,
+        "kroki_timeout": MCP_SETTINGS.kroki_timeout,
+        "svg_precision": MCP_SETTINGS.svg_precision,
+        "tool_max_concurrency": MCP_SETTINGS.tool_max_concurrency,
+        "tool_deadline_seconds": MCP_SETTINGS.tool_deadline_seconds,
+    }
+    yield
+    apply_settings(saved)
+
+def test_apply_settings_updates_live_client(restore_settings):
+    """Test that the existing Kroki client is retargeted rather than replaced."""
+    client_before = utils.kroki_client
+    
+    changed = apply_settings({"kroki_server": "http://localhost:8000/", "kroki_timeout": 12.5})
+    
+    assert changed == {"kroki_server", "kroki_timeout"}
+    assert utils.kroki_client is client_before
+    assert utils.kroki_client.base_url == "http://localhost:8000"
+    assert utils.kroki_client.client.timeout.read == 12.5
+
+def test_apply_settings_resizes_tool_limits(restore_settings):
+    """Test that the rendering tools' bulkhead and deadline follow reloaded settings."""
+    from mcp_core.tools.diagram_tools import render_bulkhead, render_deadline
+    
+    apply_settings({"tool_max_concurrency": 3, "tool_deadline_seconds": 7.5})
+    
+    assert render_bulkhead.max_concurrent == 3
+    assert render_deadline.seconds == 7.5
+
+def test_invalid_settings_are_rejected(restore_settings):
+    """Test that invalid values leave the current settings untouched."""
+    precision = MCP_SETTINGS.svg_precision
+    with pytest.raises(Exception):
+        apply_settings({"svg_precision": "not a number"})
+    assert MCP_SETTINGS.svg_precision == precision
+
+def test_reload_from_file(tmp_path, restore_settings):
+    """Test reloading settings from a JSON config file and the reported status."""
+    config_file = tmp_path / "config.json"
+    config_file.write_text(json.dumps({"svg_precision": 4, "unknown_setting": True}))
+    version = get_settings_status()["version"]
+    
+    assert reload_settings(str(config_file)) == {"svg_precision"}
+    assert MCP_SETTINGS.svg_precision == 4
+    assert get_settings_status()["version"] == version + 1
+
+def test_reloader_detects_file_change(tmp_path, restore_settings):
+    """Test that the file watcher picks up a modified config file."""
+    config_file = tmp_path / "config.json"
+    config_file.write_text(json.dumps({"kroki_timeout": 7}))
+    reloader = ConfigReloader(str(config_file), poll_interval=0)
+    assert reloader.reload()
+    assert MCP_SETTINGS.kroki_timeout == 7
+    
+    config_file.write_text("{not json")
+    assert not reloader.reload()
+    assert MCP_SETTINGS.kroki_timeout == 7
+    assert get_settings_status()["last_error"]
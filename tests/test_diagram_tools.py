@@ -87,4 +87,74 @@ class TestDiagramTools:
     #     )
         
     #     # Verify result
-    #     assert result == mock_generate_diagram.return_value
\ No newline at end of file
+    #     assert result == mock_generate_diagram.return_value
+
+class TestDiagramsBatch:
+    """Test suite for the batch generation tool"""
+    
+    def test_batch_renders_concurrently_in_order(self):
+        """Test that entries render concurrently and results keep input order"""
+        import threading
+        import time
+        from mcp_core.tools.diagram_tools import generate_diagrams_batch
+        
+        active = []
+        peak = []
+        lock = threading.Lock()
+        
+        def fake_generate(diagram_type, code, output_format, output_dir):
+            with lock:
+                active.append(code)
+                peak.append(len(active))
+            time.sleep(0.05)
+            with lock:
+                active.remove(code)
+            return {"code": code, "url": f"http://kroki/{diagram_type}/{output_format}"}
+        
+        diagrams = [{"diagram_type": "class", "code": f"class A{i}", "format": "svg"} for i in range(8)]
+        with patch("mcp_core.tools.diagram_tools.generate_diagram", side_effect=fake_generate):
+            result = generate_diagrams_batch(diagrams)
+        
+        assert result["succeeded"] == 8
+        assert result["failed"] == 0
+        assert [r["code"] for r in result["results"]] == [d["code"] for d in diagrams]
+        assert all("elapsed_ms" in r for r in result["results"])
+        assert 1 < max(peak) <= result["concurrency"]
+    
+    def test_batch_reports_invalid_entries(self):
+        """Test that invalid entries fail individually without a render"""
+        from mcp_core.tools.diagram_tools import generate_diagrams_batch
+        
+        diagrams = [
+            {"diagram_type": "class", "code": "class A"},
+            {"diagram_type": "nope", "code": "x"},
+            {"diagram_type": "bpmn", "code": "<xml/>", "format": "png"},
+            {"code": "missing type"},
+        ]
+        with patch("mcp_core.tools.diagram_tools.generate_diagram", return_value={"url": "u"}) as mock_generate:
+            result = generate_diagrams_batch(diagrams)
+        
+        mock_generate.assert_called_once_with("class", "class A", "svg", None)
+        assert result["succeeded"] == 1
+        assert result["failed"] == 3
+        assert "Unsupported diagram type" in result["results"][1]["error"]
+        assert "Unsupported output format" in result["results"][2]["error"]
+    
+    def test_batch_entries_have_a_deadline(self):
+        """Test that a slow entry fails with DeadlineExceeded without holding up the others"""
+        import time
+        from mcp_core.tools.diagram_tools import generate_diagrams_batch, render_deadline
+        
+        def fake_generate(diagram_type, code, output_format, output_dir):
+            if code == "slow":
+                time.sleep(0.5)
+            return {"code": code}
+        
+        diagrams = [{"diagram_type": "class", "code": "slow"}, {"diagram_type": "class", "code": "fast"}]
+        with patch("mcp_core.tools.diagram_tools.generate_diagram", side_effect=fake_generate), \
+                patch.object(render_deadline, "seconds", 0.05):
+            result = generate_diagrams_batch(diagrams)
+        
+        assert result["results"][0]["error_type"] == "DeadlineExceeded"
+        assert result["results"][1]["code"] == "fast"
+        assert result["succeeded"] == 1
@@ -0,0 +1,58 @@
+"""
+Tests for the pre-rendered example gallery.
+"""
+import os
+
+from mcp_core.core.config import MCP_SETTINGS
+from mcp_core.core.gallery import build_gallery, gallery_view, load_index
+from mcp_core.resources import get_diagram_gallery
+
+def fake_renderer(calls):
+    def render(language, source, output_format):
+        calls.append((language, output_format))
+        return f"<{output_format}>{language}:{len(source)}</{output_format}>".encode()
+    return render
+
+def test_build_is_content_addressed_and_incremental(tmp_path):
+    """Test that renders are stored by hash and reused on rebuild."""
+    calls = []
+    index = build_gallery(str(tmp_path), formats=["svg", "png"], languages=["plantuml", "bpmn"],
+                          renderer=fake_renderer(calls), server="test")
+    
+    record = index["entries"]["examples"]["plantuml"]["svg"]
+    assert record["path"] == f"objects/{record['sha256'][:2]}/{record['sha256']}.svg"
+    assert os.path.exists(tmp_path / record["path"])
+    # bpmn only supports svg
+    assert set(index["entries"]["templates"]["bpmn"]) == {"svg"}
+    assert index["stats"]["rendered"] == len(calls)
+    
+    calls.clear()
+    again = build_gallery(str(tmp_path), formats=["svg", "png"], languages=["plantuml", "bpmn"],
+                          renderer=fake_renderer(calls), server="test")
+    assert calls == []
+    assert again["version"] == index["version"]
+    assert again["stats"]["reused"] == index["stats"]["rendered"]
+
+def test_failed_renders_are_recorded(tmp_path):
+    """Test that a failing render is reported without aborting the build."""
+    def broken(language, source, output_format):
+        raise RuntimeError("kroki down")
+    
+    index = build_gallery(str(tmp_path), formats=["svg"], languages=["mermaid"], renderer=broken, server="test")
+    assert index["stats"]["failed"] == 2
+    assert index["entries"]["examples"]["mermaid"]["svg"] == {"error": "kroki down"}
+    assert gallery_view(str(tmp_path))["entries"]["examples"] == {}
+
+def test_gallery_resource(tmp_path, monkeypatch):
+    """Test that uml://gallery reports paths or URLs and follows rebuilds."""
+    monkeypatch.setattr(MCP_SETTINGS, "gallery_dir", str(tmp_path))
+    assert get_diagram_gallery()["available"] is False
+    
+    build_gallery(str(tmp_path), formats=["svg"], languages=["mermaid"], renderer=fake_renderer([]), server="test")
+    gallery = get_diagram_gallery()
+    assert gallery["available"] is True
+    assert gallery["version"] == load_index(str(tmp_path))["version"]
+    assert gallery["entries"]["examples"]["mermaid"]["svg"].startswith(str(tmp_path))
+    
+    monkeypatch.setattr(MCP_SETTINGS, "gallery_base_url", "https://cdn.example.com/gallery/")
+    assert get_diagram_gallery()["entries"]["templates"]["mermaid"]["svg"].startswith("https://cdn.example.com/gallery/objects/")
@@ -0,0 +1,226 @@
+"""
+Tests for the streamable HTTP transport
+"""
+
+import json
+import threading
+import time
+
+import pytest
+from starlette.testclient import TestClient
+
+from mcp_core.server.http_transport import SESSION_HEADER, HTTPTransport
+
+
+def echo_handler(request):
+    if request.get("type") == "fail":
+        raise RuntimeError("boom")
+    if request.get("sleep"):
+        time.sleep(request["sleep"])
+    return {"result": request.get("value")}
+
+
+def open_session(client):
+    """Initialize a session and return the headers that use it."""
+    response = client.post("/mcp", json={"id": 0, "type": "initialize"})
+    session_id = response.headers[SESSION_HEADER]
+    assert response.json() == {"id": 0, "result": {"session_id": session_id}}
+    return {SESSION_HEADER: session_id}
+
+
+@pytest.fixture
+def transport():
+    return HTTPTransport(echo_handler, max_workers=4, session_concurrency=2, keepalive_interval=0.05)
+
+
+def test_sessions(transport):
+    """Test that sessions are opened, reused and closed."""
+    with TestClient(transport.app) as client:
+        first = client.post("/mcp", json=[{"method": "initialize"}, {"type": "tool", "value": 1}])
+        assert first.status_code == 200
+        session_id = first.headers[SESSION_HEADER]
+        assert first.json() == [{"result": {"session_id": session_id}}, {"result": 1}]
+
+        again = client.post("/mcp", json={"value": 2}, headers={SESSION_HEADER: session_id})
+        assert again.headers[SESSION_HEADER] == session_id
+        assert again.json() == {"result": 2}
+        assert open_session(client)[SESSION_HEADER] != session_id
+        assert client.get("/healthz").json()["sessions"] == 2
+
+        assert client.delete("/mcp", headers={SESSION_HEADER: session_id}).status_code == 204
+        assert client.post("/mcp", json={}, headers={SESSION_HEADER: session_id}).status_code == 404
+
+
+def test_batch_and_errors(transport):
+    """Test batched requests, handler errors and invalid bodies."""
+    with TestClient(transport.app) as client:
+        headers = open_session(client)
+        response = client.post("/mcp", json=[{"id": 1, "value": "a"}, {"id": 2, "type": "fail"}, 5], headers=headers)
+        assert response.json() == [
+            {"id": 1, "result": "a"},
+            {"id": 2, "error": "boom"},
+            {"error": "Invalid request: Request must be a JSON object"},
+        ]
+        invalid = client.post("/mcp", content=b"{not json", headers={"Content-Type": "application/json", **headers})
+        assert invalid.status_code == 400
+
+
+def test_requests_need_a_session(transport):
+    """Test that only initialize opens a session; other requests without one are rejected."""
+    with TestClient(transport.app) as client:
+        for _ in range(3):
+            response = client.post("/mcp", json={"type": "tool", "value": 1})
+            assert response.status_code == 400
+            assert SESSION_HEADER not in response.headers
+        assert client.get("/healthz").json()["sessions"] == 0
+
+
+def test_sse_responses_and_notifications(transport):
+    """Test that responses and notifications can be streamed as Server-Sent Events."""
+    with TestClient(transport.app) as client:
+        response = client.post("/mcp", json=[{"id": 1, "type": "initialize"}, {"id": 2, "value": 2}],
+                               headers={"Accept": "application/json, text/event-stream"})
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = [json.loads(line[len("data: "):]) for line in response.text.splitlines() if line.startswith("data: ")]
+        assert sorted(event["id"] for event in events) == [1, 2]
+
+        session_id = response.headers[SESSION_HEADER]
+        transport.notify({"type": "notification", "event": "resources_changed"}, session_id)
+        transport.sessions[session_id].events.put_nowait(None)
+        stream = client.get("/mcp", headers={SESSION_HEADER: session_id})
+        assert stream.text.startswith(": connected")
+        assert "resources_changed" in stream.text
+
+
+def test_sessions_run_concurrently(transport):
+    """Test that a slow request in one session does not block another session."""
+    barrier = threading.Barrier(2, timeout=5)
+
+    def handler(request):
+        barrier.wait()
+        return {"result": request["value"]}
+
+    transport.handler = handler
+    results = {}
+    with TestClient(transport.app) as client:
+        def call(value):
+            results[value] = client.post("/mcp", json={"value": value}, headers=open_session(client)).json()
+
+        threads = [threading.Thread(target=call, args=(value,)) for value in (1, 2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+    assert results == {1: {"result": 1}, 2: {"result": 2}}
+
+
+def test_graceful_shutdown(transport):
+    """Test that draining rejects new requests but lets in-flight requests finish."""
+    with TestClient(transport.app) as client:
+        headers = open_session(client)
+        slow = {}
+        thread = threading.Thread(target=lambda: slow.update(
+            client.post("/mcp", json={"value": "slow", "sleep": 0.3}, headers=headers).json()
+        ))
+        thread.start()
+        deadline = time.monotonic() + 5
+        while transport._in_flight == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        transport.begin_shutdown()
+        time.sleep(0.05)
+        rejected = client.post("/mcp", json={"value": "late"}, headers=headers)
+        assert rejected.status_code == 503
+        assert rejected.headers["Retry-After"] == "1"
+        assert client.get("/healthz").json()["status"] == "draining"
+        thread.join(5)
+    assert slow == {"result": "slow"}
+
+
+def test_idle_sessions_expire(transport):
+    """Test that idle sessions are expired and the session limit is enforced."""
+    transport.max_sessions = 1
+    transport.session_idle_timeout = 60
+    with TestClient(transport.app) as client:
+        session_id = open_session(client)[SESSION_HEADER]
+        assert client.post("/mcp", json={"type": "initialize"}).status_code == 503
+
+        transport.sessions[session_id].last_seen -= 120
+        assert client.post("/mcp", json={"type": "initialize"}).status_code == 200
+        assert session_id not in transport.sessions
+
+
+class LibraryFastMCP:
+    """Stands in for the fastmcp package's server, which has no ``_handle_request``."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def tool(self, *args, **kwargs):
+        return lambda func: func
+
+    def prompt(self, *args, **kwargs):
+        return lambda func: func
+
+    def resource(self, *args, **kwargs):
+        return lambda func: func
+
+    def run(self, *args, **kwargs):
+        raise AssertionError("start_server must serve the HTTP transport itself")
+
+
+def test_start_server_serves_http_with_library_fastmcp(tmp_path, monkeypatch):
+    """Test that HTTP serving uses our transport and request handler with the fastmcp package."""
+    from mcp_core.core import jsoncodec
+    from mcp_core.core import server as core_server
+    from mcp_core.core.config import MCP_SETTINGS
+    from mcp_core.server import fastmcp_wrapper, http_transport
+
+    monkeypatch.setattr(fastmcp_wrapper, "FastMCP", LibraryFastMCP)
+    monkeypatch.setattr(core_server, "_mcp_server", None)
+    monkeypatch.setattr(MCP_SETTINGS, "tracing_file", str(tmp_path / "spans.jsonl"))
+    monkeypatch.setattr(MCP_SETTINGS, "tracing_otlp_endpoint", "")
+    monkeypatch.setattr(MCP_SETTINGS, "profile_dir", str(tmp_path / "profiles"))
+    served = {}
+    monkeypatch.setattr(http_transport, "run_http",
+                        lambda handler, host, port: served.update(handler=handler, address=(host, port)))
+
+    core_server.start_server("http", "127.0.0.1", 8123)
+
+    assert served["address"] == ("127.0.0.1", 8123)
+    handler = served["handler"]
+    trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+    response = handler({
+        "type": "tool", "tool": "generate_diagrams_batch", "args": {"diagrams": [{"code": "x"}]},
+        "traceparent": f"00-{trace_id}-00f067aa0ba902b7-01", "profile": True,
+    })
+    assert response["result"]["failed"] == 1
+    assert response["trace_id"] == trace_id
+    assert "profiles" in response
+    resource = jsoncodec.loads(jsoncodec.dumps(handler({"type": "resource", "path": "uml://types"})))
+    assert "class" in resource["result"]
+    assert "@startuml" in handler({"type": "prompt", "prompt": "class_diagram"})["result"]
+
+
+def test_run_http_without_graceful_shutdown_timeout(monkeypatch):
+    """Test that run_http starts on uvicorn releases whose Config lacks timeout_graceful_shutdown."""
+    import uvicorn
+    from mcp_core.server.http_transport import run_http
+
+    configs = []
+
+    class OldConfig:
+        def __init__(self, app, host, port, timeout_keep_alive, log_level):
+            configs.append((host, port))
+
+    class FakeServer:
+        def __init__(self, config):
+            self.config = config
+
+        def run(self):
+            pass
+
+    monkeypatch.setattr(uvicorn, "Config", OldConfig)
+    monkeypatch.setattr(uvicorn, "Server", FakeServer)
+    run_http(echo_handler, "127.0.0.1", 8123)
+    assert configs == [("127.0.0.1", 8123)]
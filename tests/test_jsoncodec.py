@@ -0,0 +1,68 @@
+"""
+Tests for the pluggable JSON codec
+"""
+
+import json
+
+import pytest
+
+from mcp_core.core import jsoncodec
+from mcp_core.api.json_response import FastJSONResponse
+from benchmarks.json_codec import available_backends, run_benchmark
+
+PAYLOAD = {
+    "id": 7,
+    "result": {"code": "@startuml\nA -> B: héllo\n@enduml", "url": "https://kroki.io/x", "local_path": None},
+    "formats": ["svg", "png"],
+    "elapsed_ms": 1.5,
+    "ok": True,
+}
+
+
+@pytest.mark.parametrize("backend", available_backends())
+def test_backends_round_trip(backend):
+    dumps_bytes, loads = jsoncodec.load_backend(backend)
+    encoded = dumps_bytes(PAYLOAD, False)
+    assert isinstance(encoded, bytes)
+    assert loads(encoded) == PAYLOAD
+    assert loads(encoded.decode("utf-8")) == PAYLOAD
+    # Canonical output is identical across backends, so ETags do not depend on what is installed
+    assert dumps_bytes(PAYLOAD, True) == json.dumps(
+        PAYLOAD, sort_keys=True, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+    assert dumps_bytes({"big": 1e16, "small": 1e-7}, True) == b'{"big":1e+16,"small":1e-07}'
+    with pytest.raises(ValueError):
+        dumps_bytes({"value": float("nan")}, True)
+
+
+def test_module_functions():
+    assert jsoncodec.BACKEND in available_backends()
+    assert jsoncodec.loads(jsoncodec.dumps(PAYLOAD)) == PAYLOAD
+    assert jsoncodec.dumps({"b": 1, "a": 2}, sort_keys=True) == '{"a":2,"b":1}'
+    with pytest.raises(ValueError):
+        jsoncodec.loads("{not json")
+
+
+def test_raw_json_is_embedded():
+    raw = jsoncodec.RawJSON(b'{"z":1,"a":[2]}')
+    assert jsoncodec.dumps({"id": 3, "result": raw}) == '{"id":3,"result":{"z":1,"a":[2]}}'
+    assert jsoncodec.dumps_bytes([{"result": raw}, {"ok": True}]) == b'[{"result":{"z":1,"a":[2]}},{"ok":true}]'
+    assert jsoncodec.loads(jsoncodec.dumps({"b": raw, "a": 1}, sort_keys=True)) == {"a": 1, "b": {"z": 1, "a": [2]}}
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        jsoncodec.load_backend("simdjson")
+
+
+def test_fast_json_response():
+    response = FastJSONResponse({"detail": "ok", "count": 2})
+    assert response.media_type == "application/json"
+    assert json.loads(response.body) == {"detail": "ok", "count": 2}
+
+
+def test_benchmark_runs():
+    results = run_benchmark(iterations=2, rounds=1)
+    assert set(results) == {"templates", "batch", "stdio"}
+    for result in results.values():
+        assert result["backends"]["json"]["encode_speedup"] == pytest.approx(1.0)
@@ -0,0 +1,134 @@
+"""
+Tests for the local Kroki stand-in
+"""
+
+import random
+import struct
+import time
+import zlib
+
+import httpx
+import pytest
+
+from benchmarks.kroki_stub import LatencyDistribution, make_png, start_stub
+from kroki.kroki import Kroki, KrokiHTTPError, LANGUAGE_OUTPUT_SUPPORT
+
+
+@pytest.fixture
+def stub_factory():
+    servers = []
+
+    def factory(**options):
+        server = start_stub(**options)
+        servers.append(server)
+        return server
+
+    yield factory
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def _png_chunks(data):
+    assert data[:8] == b"\x89PNG\r\n\x1a\n"
+    offset, kinds = 8, []
+    while offset < len(data):
+        length = struct.unpack(">I", data[offset:offset + 4])[0]
+        kind, body = data[offset + 4:offset + 8], data[offset + 8:offset + 8 + length]
+        assert struct.unpack(">I", data[offset + 8 + length:offset + 12 + length])[0] == zlib.crc32(kind + body) & 0xFFFFFFFF
+        kinds.append(kind)
+        offset += 12 + length
+    return kinds
+
+
+def test_latency_distributions():
+    rng = random.Random(1)
+    assert LatencyDistribution(20).sample(rng) == 20
+    assert LatencyDistribution("fixed:5").sample(rng) == 5
+    assert all(10 <= LatencyDistribution("uniform:10,50").sample(rng) <= 50 for _ in range(100))
+    assert all(LatencyDistribution("normal:1,5").sample(rng) >= 0 for _ in range(100))
+    samples = [LatencyDistribution("lognormal:20,0.5").sample(rng) for _ in range(2000)]
+    assert 15 < sorted(samples)[1000] < 25
+    assert LatencyDistribution("exponential:0").sample(rng) == 0
+    for spec in ("pareto:1", "uniform:1", "fixed:a"):
+        with pytest.raises(ValueError):
+            LatencyDistribution(spec)
+
+
+def test_every_language_renders(stub_factory):
+    """Test that every supported language and format has a route."""
+    stub = stub_factory()
+    client = Kroki(stub.url)
+    for language, formats in LANGUAGE_OUTPUT_SUPPORT.items():
+        for output_format in formats:
+            assert client.render_diagram(language, "A -> B", output_format)
+    assert stub.stats()["requests"] == sum(len(formats) for formats in LANGUAGE_OUTPUT_SUPPORT.values())
+
+
+def test_routes_are_deterministic(stub_factory):
+    """Test that GET, POST and JSON POST render the same source identically."""
+    stub = stub_factory()
+    client = Kroki(stub.url)
+    source = "@startuml\nA -> B\n@enduml"
+
+    svg = client.render_diagram("plantuml", source, "svg")
+    assert svg.startswith(b"<svg") and svg == client.render_diagram("plantuml", source, "svg")
+    assert svg != client.render_diagram("plantuml", source + "\n", "svg")
+    assert httpx.post(f"{stub.url}/plantuml/svg", content=source.encode()).content == svg
+    posted = httpx.post(stub.url + "/", json={"diagram_source": source, "diagram_type": "plantuml", "output_format": "svg"})
+    assert posted.content == svg and posted.headers["content-type"] == "image/svg+xml"
+
+    png = client.render_diagram("mermaid", "graph TD; A-->B", "png")
+    assert _png_chunks(png) == [b"IHDR", b"IDAT", b"IEND"]
+
+
+def test_route_errors(stub_factory):
+    """Test Kroki-style errors for unknown languages, formats and undecodable sources."""
+    stub = stub_factory()
+    assert httpx.get(f"{stub.url}/nosuchlang/svg/eNpLAQAAYgBi").status_code == 404
+    assert httpx.get(f"{stub.url}/mermaid/pdf/eNpLAQAAYgBi").status_code == 400
+    assert httpx.get(f"{stub.url}/mermaid/svg/not-deflate").status_code == 400
+    assert httpx.post(stub.url + "/", content=b"{}").status_code == 400
+    assert stub.stats()["requests"] == 0
+
+
+def test_body_size(stub_factory):
+    """Test that SVG and PNG bodies are padded to the configured size and stay valid."""
+    stub = stub_factory(body_bytes=64 * 1024)
+    client = Kroki(stub.url)
+    svg = client.render_diagram("graphviz", "digraph { a -> b }", "svg")
+    assert 64 * 1024 <= len(svg) < 65 * 1024 and svg.endswith(b"</svg>")
+    png = client.render_diagram("graphviz", "digraph { a -> b }", "png")
+    assert len(png) == 64 * 1024
+    assert _png_chunks(png) == [b"IHDR", b"IDAT", b"tEXt", b"IEND"]
+    assert len(make_png(2, 2)) < 100
+
+
+def test_injected_errors_are_seeded(stub_factory):
+    """Test that error injection follows the error rate and repeats for the same seed."""
+    def outcomes(seed):
+        stub = stub_factory(error_rate=0.5, error_status=500, seed=seed)
+        client = Kroki(stub.url)
+        url = client.get_url("d2", "a -> b", "svg")
+        return [client.client.get(url).status_code for _ in range(40)]
+
+    first = outcomes(7)
+    assert set(first) == {200, 500}
+    assert outcomes(7) == first
+    assert outcomes(8) != first
+
+    stub = stub_factory(error_rate=1.0)
+    with pytest.raises(KrokiHTTPError):
+        Kroki(stub.url).render_diagram("mermaid", "graph TD", "svg")
+    assert stub.stats()["errors"] == 1
+
+
+def test_latency_and_health(stub_factory):
+    stub = stub_factory(latency="fixed:50")
+    start = time.perf_counter()
+    Kroki(stub.url).render_diagram("erd", "[A]", "svg")
+    assert time.perf_counter() - start >= 0.05
+    health = httpx.get(stub.url + "/health").json()
+    assert health["requests"] == 1
+    assert health["by_language"] == {"erd": 1}
+    assert health["latency"] == "fixed:50"
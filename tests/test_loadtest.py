@@ -0,0 +1,112 @@
+"""
+Tests for the trace-replay load test
+"""
+
+import json
+import threading
+import time
+
+import pytest
+
+from benchmarks import loadtest
+
+
+class FakeTarget(loadtest.Target):
+    name = "fake"
+
+    def __init__(self, delay=0.01):
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def call(self, tool, args):
+        if tool == "unsupported":
+            raise loadtest.SkipCall(tool)
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        return tool != "broken"
+
+
+def test_percentile():
+    assert loadtest.percentile([], 50) == 0.0
+    samples = list(range(1, 101))
+    assert loadtest.percentile(samples, 50) == 50
+    assert loadtest.percentile(samples, 99) == 99
+    assert loadtest.percentile(samples, 100) == 100
+
+
+def test_load_trace(tmp_path):
+    """Test that recorded timestamps become offsets and output directories are dropped."""
+    path = tmp_path / "trace.jsonl"
+    path.write_text("\n".join(json.dumps(record) for record in [
+        {"ts": 100.5, "tool": "b", "args": {"code": "y"}},
+        {"ts": 100.0, "tool": "a", "args": {"code": "x", "output_dir": "/home/someone"}},
+        {"note": "not a call"},
+    ]))
+    entries = loadtest.load_trace(str(path))
+    assert entries == [
+        {"tool": "a", "args": {"code": "x"}, "offset_ms": 0.0},
+        {"tool": "b", "args": {"code": "y"}, "offset_ms": 500.0},
+    ]
+
+
+def test_replay_closed_loop():
+    """Test that closed-loop replay respects the concurrency and counts errors and skips."""
+    target = FakeTarget()
+    entries = [{"tool": tool, "args": {}, "offset_ms": 0.0} for tool in ("ok", "broken", "unsupported")]
+    report = loadtest.replay(target, entries, concurrency=2, loops=4)
+
+    assert target.peak <= 2
+    assert report["calls"] == 8
+    assert report["errors"] == 4
+    assert report["skipped"] == {"unsupported": 4}
+    assert report["tools"]["ok"]["p50_ms"] >= 10
+    assert report["throughput_rps"] > 0
+    assert "broken" in loadtest.format_report(report)
+
+
+def test_replay_open_loop_rate():
+    """Test that open-loop replay paces calls at the requested rate."""
+    entries = [{"tool": "ok", "args": {}, "offset_ms": 0.0}]
+    report = loadtest.replay(FakeTarget(delay=0), entries, concurrency=4, loops=10, rate=100)
+    assert report["mode"] == "open"
+    assert report["calls"] == 10
+    assert report["wall_s"] >= 0.09
+
+
+def test_api_mapping():
+    assert loadtest.ApiTarget.to_request("generate_mermaid_diagram", {"code": "graph TD"}) == {
+        "lang": "mermaid", "type": "mermaid", "code": "graph TD", "output_format": "png"
+    }
+    assert loadtest.ApiTarget.to_request("generate_uml", {"diagram_type": "class", "code": "x"})["type"] == "class"
+    with pytest.raises(loadtest.SkipCall):
+        loadtest.ApiTarget.to_request("generate_diagrams_batch", {})
+
+
+def test_stdio_replay_end_to_end(tmp_path):
+    """Test a short replay against the real stdio server and the stand-in."""
+    json_path = tmp_path / "report.json"
+    assert loadtest.main(["--target", "stdio", "--loops", "1", "--concurrency", "2",
+                          "--json", str(json_path)]) == 0
+    report = json.loads(json_path.read_text())
+    assert report["calls"] == len(loadtest.BUILTIN_TOOLS)
+    assert report["errors"] == 0
+
+
+def test_synthetic_trace():
+    """Test that generated workloads become one call per kind and variant."""
+    spec = loadtest.WorkloadSpec(elements=50, nesting=1)
+    entries = loadtest.synthetic_trace(["graphviz", "erd"], spec, variants=2)
+    assert [entry["tool"] for entry in entries] == [
+        "generate_graphviz_diagram", "generate_erd_diagram", "generate_graphviz_diagram", "generate_erd_diagram",
+    ]
+    assert entries[0]["args"]["code"] != entries[2]["args"]["code"]
+    assert entries == loadtest.synthetic_trace(["graphviz", "erd"], spec, variants=2)
+
+    report = loadtest.replay(FakeTarget(delay=0), entries, concurrency=2, loops=1)
+    assert report["calls"] == 4
@@ -0,0 +1,106 @@
+"""
+Tests for memory diagnostics, the uml://memory resource and the soak harness
+"""
+
+import tracemalloc
+
+import pytest
+
+from benchmarks import soak
+from benchmarks.kroki_stub import start_stub
+from benchmarks.workload import WorkloadSpec
+from mcp_core.core import memory
+from mcp_core.core.config import MCP_SETTINGS
+from mcp_core.resources import get_memory_usage
+from mcp_core.server.fastmcp_wrapper import FastMCP
+
+
+@pytest.fixture
+def tracing():
+    tracemalloc.start(1)
+    memory._last_snapshot = None
+    yield
+    memory._last_snapshot = None
+    tracemalloc.stop()
+
+
+def test_report_without_tracing():
+    assert not tracemalloc.is_tracing()
+    report = memory.memory_report()
+    assert report["process"]["rss_bytes"] > 0
+    assert report["process"]["peak_rss_bytes"] > 0
+    assert report["tracemalloc"]["tracing"] is False
+    assert "MCP_TRACEMALLOC" in report["tracemalloc"]["hint"]
+
+
+def test_report_lists_top_sites_and_growth(tracing):
+    """Test that reports list allocation sites and the growth since the previous report."""
+    first = memory.memory_report(limit=5)["tracemalloc"]
+    assert first["tracing"] is True and first["growth_since_last_report"] is None
+    assert len(first["top"]) <= 5
+
+    retained = [bytearray(1000) for _ in range(500)]
+    second = memory.memory_report(limit=5)["tracemalloc"]
+    assert second["traced_bytes"] >= 500 * 1000
+    grown = second["growth_since_last_report"][0]
+    assert grown["site"].startswith("tests/test_memory.py:")
+    assert grown["size_diff_bytes"] >= 500 * 1000 and grown["count_diff"] >= 500
+    assert second["top"][0]["site"] == grown["site"]
+    del retained
+
+
+def test_memory_resource(tracing):
+    server = FastMCP("test")
+    server.resource("uml://memory")(get_memory_usage)
+    response = server._handle_request({"type": "resource", "path": "uml://memory"})
+    assert response["result"]["tracemalloc"]["tracing"] is True
+    assert "gc" in response["result"]
+
+
+def test_start_tracing():
+    assert memory.start_tracing(0) is False
+    try:
+        assert memory.start_tracing(2) is True
+        assert tracemalloc.get_traceback_limit() == 2
+    finally:
+        tracemalloc.stop()
+
+
+def test_find_leaks():
+    """Test that steadily growing sites are suspected and one-off growth is not."""
+    checkpoints = [
+        {"calls": calls, "sites": {"leak.py:1": calls * 10, "cache.py:2": 500_000 if calls else 0}}
+        for calls in range(0, 50_000, 10_000)
+    ]
+    growth = [
+        {"site": "cache.py:2", "size_bytes": 500_000, "size_diff_bytes": 500_000, "count": 1, "count_diff": 1},
+        {"site": "leak.py:1", "size_bytes": 400_000, "size_diff_bytes": 400_000, "count": 4, "count_diff": 4},
+        {"site": "small.py:3", "size_bytes": 100, "size_diff_bytes": 100, "count": 1, "count_diff": 1},
+    ]
+    leaks = soak.find_leaks(checkpoints, growth, min_growth=64 * 1024)
+    assert [leak["site"] for leak in leaks] == ["leak.py:1"]
+    assert leaks[0]["bytes_per_call"] == 10
+    assert leaks[0]["grew_in_intervals"] == "4/4"
+    assert soak.find_leaks(checkpoints[:2], growth) == []
+
+
+def test_soak_run(tmp_path, monkeypatch):
+    """Test a short soak through the stdio pipeline against the stand-in."""
+    from mcp_core.core import utils
+
+    stub = start_stub()
+    client = utils.get_kroki_client()
+    monkeypatch.setattr(client, "base_url", stub.url)
+    monkeypatch.setattr(MCP_SETTINGS, "output_dir", str(tmp_path))
+    try:
+        report = soak.run_soak(calls=300, interval=100, warmup=50, concurrency=4, distinct=12,
+                               spec=WorkloadSpec(elements=5))
+    finally:
+        stub.shutdown()
+        stub.server_close()
+
+    assert report["calls"] == report["responses"] == 300
+    assert report["errors"] == 0
+    assert [checkpoint["calls"] for checkpoint in report["checkpoints"]] == [50, 150, 250, 300]
+    assert not tracemalloc.is_tracing()
+    assert soak.format_report(report).startswith("300 calls in ")
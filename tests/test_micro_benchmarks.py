@@ -0,0 +1,57 @@
+"""
+Tests for the micro-benchmark suite
+"""
+
+import json
+
+from benchmarks import micro
+
+
+def test_measure():
+    calls = []
+    stats = micro.measure(lambda: calls.append(1), min_time=0.001, repeat=3)
+    assert stats["rounds"] == 3 and len(stats["samples_us"]) == 3
+    assert stats["number"] >= 1 and len(calls) >= stats["number"] * 3
+    assert stats["min_us"] <= stats["median_us"]
+    assert stats["ops_per_s"] > 0
+
+
+def test_svg_source_validates():
+    from ai_uml.src.diagram.utils.svg_validator import SVGConstraints
+    SVGConstraints().validate_svg(micro.svg_source(micro.SIZES["small"]))
+    assert len(micro.svg_source(micro.SIZES["medium"])) > 10 * len(micro.svg_source(micro.SIZES["small"]))
+
+
+def test_suite_covers_every_case(tmp_path):
+    """Test that every case runs (or is skipped) and results are written as JSON."""
+    json_path = tmp_path / "micro.json"
+    assert micro.main(["--sizes", "small", "--min-time", "0.001", "--repeat", "2", "--json", str(json_path)]) == 0
+    run = json.loads(json_path.read_text())
+
+    assert set(run["results"]) == set(micro.CASES)
+    assert run["meta"]["repeat"] == 2
+    assert run["meta"]["workload"]["edge_density"] == 1.5
+    for name, entry in run["results"].items():
+        assert entry["group"] in ("encoding", "validation", "rendering", "request-path")
+        if "skipped" not in entry:
+            stats = entry["sizes"]["small"]
+            assert stats["median_us"] > 0 and stats["input_bytes"] > 0, name
+    assert "error" not in run["results"]["generate_diagram"]["sizes"]["small"]
+
+
+def test_errors_are_reported_instead_of_timed():
+    micro.CASES["test.failing"] = ("encoding", _failing_setup)
+    try:
+        run = micro.run_suite(filters=["test.failing"], sizes=["small"], min_time=0.001, repeat=2)
+    finally:
+        del micro.CASES["test.failing"]
+    assert run["results"]["test.failing"]["sizes"]["small"] == {"input_bytes": 3, "error": "too big"}
+
+
+def _failing_setup(spec):
+    import contextlib
+
+    @contextlib.contextmanager
+    def setup():
+        yield (lambda: {"error": "too big"}), 3
+    return setup()
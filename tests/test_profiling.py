@@ -0,0 +1,195 @@
+"""
+Tests for on-demand request profiling.
+"""
+import contextvars
+import os
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+from mcp_core.core import profiling
+from mcp_core.core.config import MCP_SETTINGS
+from mcp_core.tools import middleware as mw
+from mcp_core.tools.middleware import DeadlineMiddleware, ProfilingMiddleware, wrap_tool
+
+
+def busy(seconds: float):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        sum(range(100))
+
+
+@pytest.fixture
+def profile_dir(tmp_path, monkeypatch):
+    """Enable profiling into a temporary directory."""
+    monkeypatch.setattr(MCP_SETTINGS, "profile_dir", str(tmp_path))
+    monkeypatch.setattr(MCP_SETTINGS, "profile_sample_rate", 0.0)
+    monkeypatch.setattr(MCP_SETTINGS, "profile_interval_ms", 1.0)
+    return tmp_path
+
+
+@pytest.fixture
+def isolated_middleware():
+    """Run a test with an empty middleware configuration."""
+    saved = (list(mw._global_middleware), dict(mw._category_middleware), dict(mw._tool_middleware))
+    mw.clear_middleware()
+    yield
+    mw.clear_middleware()
+    mw._global_middleware.extend(saved[0])
+    mw._category_middleware.update(saved[1])
+    mw._tool_middleware.update(saved[2])
+
+
+def read_profile(path):
+    with open(path) as f:
+        lines = f.read().splitlines()
+    stacks = {}
+    for line in lines:
+        stack, count = line.rsplit(" ", 1)
+        stacks[stack] = int(count)
+    return stacks
+
+
+def test_should_profile(profile_dir, monkeypatch):
+    """Test that profiling needs a directory and then a request flag or the sample rate."""
+    assert profiling.should_profile("1")
+    assert profiling.should_profile(True)
+    assert not profiling.should_profile("0")
+    assert not profiling.should_profile()
+    with profiling.requested():
+        assert profiling.should_profile()
+
+    monkeypatch.setattr(MCP_SETTINGS, "profile_sample_rate", 1.0)
+    assert profiling.should_profile()
+
+    monkeypatch.setattr(MCP_SETTINGS, "profile_dir", "")
+    assert not profiling.should_profile("1")
+
+
+def test_profile_writes_collapsed_stacks(profile_dir):
+    """Test that a profile samples the current thread and threads that join it."""
+    def worker():
+        with profiling.thread_scope():
+            busy(0.1)
+
+    with profiling.requested() as paths:
+        with profiling.profile("render diagram") as session:
+            thread = threading.Thread(target=contextvars.copy_context().run, args=(worker,), name="render-worker")
+            thread.start()
+            busy(0.1)
+            thread.join()
+
+    assert paths == [session.path]
+    assert os.path.basename(session.path).endswith("-render_diagram.collapsed")
+    stacks = read_profile(session.path)
+    assert sum(stacks.values()) > 0
+    roots = {stack.split(";")[0] for stack in stacks}
+    assert {threading.current_thread().name, "render-worker"} <= roots
+    assert any(stack.split(";")[-1].startswith("busy (tests/test_profiling.py:") for stack in stacks)
+    # The sampler thread stops once no profile is active
+    deadline = time.time() + 1
+    while profiling._sampler._thread is not None and time.time() < deadline:
+        time.sleep(0.01)
+    assert profiling._sampler._thread is None
+
+
+def test_profile_without_current_thread(profile_dir):
+    """Test that sample_current=False samples only threads that join the profile."""
+    with profiling.profile("loop", sample_current=False) as session:
+        busy(0.05)
+    assert session.path is None
+    assert os.listdir(profile_dir) == []
+
+
+def test_thread_scope_without_profile():
+    """Test that thread_scope is a no-op outside a profile."""
+    with profiling.thread_scope() as session:
+        assert session is None
+
+
+def test_prune_keeps_newest(tmp_path):
+    """Test that the oldest profiles are deleted beyond the limit."""
+    for index in range(5):
+        (tmp_path / f"2026010{index}T000000-1-{index:06d}-tool.collapsed").write_text("a 1\n")
+    (tmp_path / "notes.txt").write_text("keep")
+    profiling.prune(str(tmp_path), 2)
+    assert sorted(os.listdir(tmp_path)) == [
+        "20260103T000000-1-000003-tool.collapsed",
+        "20260104T000000-1-000004-tool.collapsed",
+        "notes.txt",
+    ]
+
+
+def test_tool_middleware_profiles_on_request(profile_dir, isolated_middleware):
+    """Test that tools are profiled in their deadline worker thread only when asked."""
+    mw.configure_middleware([DeadlineMiddleware(5), ProfilingMiddleware()])
+
+    def slow_tool(seconds: float):
+        busy(seconds)
+        return {"ok": True}
+
+    wrapped = wrap_tool(slow_tool, "slow_tool", "uml")
+    assert wrapped(0.05) == {"ok": True}
+    assert os.listdir(profile_dir) == []
+
+    with profiling.requested() as paths:
+        assert wrapped(0.1) == {"ok": True}
+    assert len(paths) == 1 and "slow_tool" in paths[0]
+    stacks = read_profile(paths[0])
+    assert all(stack.startswith("tool-deadline") for stack in stacks)
+    assert any("slow_tool (tests/test_profiling.py:" in stack for stack in stacks)
+
+
+def test_app_route_profile_header(profile_dir):
+    """Test that the HTTP API profiles requests with X-Profile and names the file."""
+    os.environ["TESTING"] = "true"
+    from app import app
+
+    def fake_generate(**kwargs):
+        busy(0.1)
+        return {"url": "https://kroki.io/plantuml/svg/x", "local_path": "/tmp/diagrams/x.svg"}
+
+    payload = {"lang": "plantuml", "type": "class", "code": "@startuml\nclass A\n@enduml"}
+    with patch("app.generate_diagram", side_effect=fake_generate):
+        client = TestClient(app)
+        plain = client.post("/generate_diagram", json=payload)
+        assert plain.status_code == 200
+        assert "x-profile-file" not in plain.headers
+
+        profiled = client.post("/generate_diagram", json=payload, headers={"X-Profile": "1"})
+        assert profiled.status_code == 200
+    name = profiled.headers["x-profile-file"]
+    assert os.path.basename(name) == name
+    stacks = read_profile(profile_dir / name)
+    assert any("fake_generate (tests/test_profiling.py:" in stack for stack in stacks)
+    # Only the render thread is sampled, not the event loop serving other requests
+    assert all("_render_request (app.py:" in stack for stack in stacks)
+
+
+def test_mcp_http_profile_header(profile_dir, isolated_middleware):
+    """Test that X-Profile on the MCP HTTP transport profiles the tool call and lists the file."""
+    from starlette.testclient import TestClient as StarletteClient
+    from mcp_core.server.fastmcp_wrapper import FastMCP
+    from mcp_core.server.http_transport import SESSION_HEADER, HTTPTransport
+
+    mw.configure_middleware([ProfilingMiddleware()])
+    server = FastMCP("test")
+
+    def render(seconds: float):
+        busy(seconds)
+        return "done"
+
+    server.tool()(wrap_tool(render, "render", "uml"))
+    transport = HTTPTransport(server._handle_request, max_workers=2)
+    with StarletteClient(transport.app) as client:
+        request = {"type": "tool", "tool": "render", "args": {"seconds": 0.1}}
+        session = {SESSION_HEADER: client.post("/mcp", json={"type": "initialize"}).headers[SESSION_HEADER]}
+        assert client.post("/mcp", json=request, headers=session).json() == {"result": "done"}
+        response = client.post("/mcp", json=request, headers={"X-Profile": "1", **session}).json()
+
+    assert response["result"] == "done"
+    assert len(response["profiles"]) == 1
+    assert any("render (tests/test_profiling.py:" in stack for stack in read_profile(response["profiles"][0]))
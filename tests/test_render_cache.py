@@ -0,0 +1,62 @@
+"""
+Tests for the shared render cache.
+"""
+import multiprocessing
+
+from mcp_core.core.render_cache import RenderCache
+
+def _store_in_child(path, key):
+    RenderCache(path).put(key, "https://kroki.io/x", None, b"<svg>child</svg>")
+
+def test_put_and_get(tmp_path):
+    """Test that a stored render can be read back."""
+    cache = RenderCache(str(tmp_path / "cache.db"))
+    key = RenderCache.make_key("plantuml", "svg", "@startuml\nclass A\n@enduml")
+    
+    assert cache.get(key) is None
+    cache.put(key, "https://kroki.io/plantuml/svg/abc", "https://playground", b"<svg/>")
+    
+    entry = cache.get(key)
+    assert entry == {"url": "https://kroki.io/plantuml/svg/abc", "playground": "https://playground", "content": b"<svg/>"}
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["total_bytes"] == len(b"<svg/>")
+
+def test_make_key_distinguishes_inputs():
+    """Test that keys differ by backend, format, code and server."""
+    base = RenderCache.make_key("plantuml", "svg", "code", "https://kroki.io")
+    assert base != RenderCache.make_key("plantuml", "png", "code", "https://kroki.io")
+    assert base != RenderCache.make_key("mermaid", "svg", "code", "https://kroki.io")
+    assert base != RenderCache.make_key("plantuml", "svg", "code2", "https://kroki.io")
+    assert base != RenderCache.make_key("plantuml", "svg", "code", "http://localhost:8000")
+
+def test_lru_eviction_and_resize(tmp_path):
+    """Test that least recently used entries are evicted when over the limit."""
+    cache = RenderCache(str(tmp_path / "cache.db"), max_bytes=300)
+    for index in range(3):
+        cache.put(f"key{index}", None, None, b"x" * 100)
+    assert cache.stats()["entries"] == 3
+    
+    # Fourth entry pushes the total over the limit; the oldest goes
+    cache.put("key3", None, None, b"x" * 100)
+    assert cache.get("key0") is None
+    assert cache.get("key3") is not None
+    assert cache.stats()["total_bytes"] <= 300
+    
+    cache.resize(100)
+    assert cache.stats()["total_bytes"] <= 100
+    assert cache.stats()["evictions"] >= 2
+
+def test_shared_between_processes(tmp_path):
+    """Test that a render stored by another process is a hit here."""
+    path = str(tmp_path / "cache.db")
+    cache = RenderCache(path)
+    key = RenderCache.make_key("plantuml", "svg", "shared")
+    
+    process = multiprocessing.get_context("spawn").Process(target=_store_in_child, args=(path, key))
+    process.start()
+    process.join(30)
+    assert process.exitcode == 0
+    
+    assert cache.get(key)["content"] == b"<svg>child</svg>"
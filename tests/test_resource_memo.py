@@ -0,0 +1,103 @@
+"""
+Tests for memoized, versioned MCP resources.
+"""
+import json
+import os
+import time
+import types
+
+from mcp_core.core import jsoncodec
+from mcp_core.core.config import MCP_SETTINGS, DiagramType
+from mcp_core.resources import get_diagram_templates, get_resource_registry
+from mcp_core.resources.memo import MemoizedResource, ModuleWatcher, payload_response
+from mcp_core.server.fastmcp_wrapper import FastMCP
+
+def test_memo_rebuilds_only_on_dependency_change():
+    """Test that the builder runs once per dependency state."""
+    state = {"value": 1}
+    memo = MemoizedResource("test", lambda: {"value": state["value"]}, lambda: (state["value"],))
+    
+    first = memo.get()
+    assert memo.get() is first
+    assert memo.builds == 1
+    assert first.version == 1
+    assert json.loads(first.json) == {"value": 1}
+    
+    state["value"] = 2
+    second = memo.get()
+    assert memo.builds == 2
+    assert second.version == 2
+    assert second.etag != first.etag
+
+def test_memo_keeps_version_when_content_is_unchanged():
+    """Test that rebuilding identical content keeps the version and ETag."""
+    memo = MemoizedResource("test", lambda: {"a": 1}, lambda: ())
+    first = memo.get()
+    memo.invalidate()
+    second = memo.get()
+    assert memo.builds == 2
+    assert (second.version, second.etag) == (first.version, first.etag)
+
+def test_templates_follow_diagram_types(monkeypatch):
+    """Test that uml://templates is cached and rebuilt when diagram types change."""
+    memo = get_resource_registry()["uml://templates"]["memo"]
+    assert get_diagram_templates() is get_diagram_templates()
+    builds = memo.builds
+    
+    diagram_types = dict(MCP_SETTINGS.diagram_types)
+    diagram_types["extra"] = DiagramType(backend="plantuml", description="Extra")
+    monkeypatch.setattr(MCP_SETTINGS, "diagram_types", diagram_types)
+    
+    assert "extra" in get_diagram_templates()
+    assert memo.builds == builds + 1
+
+def test_memo_notices_in_place_changes():
+    """Test that dependencies mutated in place still trigger a rebuild."""
+    diagram_types = {"class": DiagramType(backend="plantuml", description="Class")}
+    memo = MemoizedResource("test", lambda: sorted(diagram_types), lambda: (diagram_types,))
+    assert memo.get().data == ["class"]
+    
+    diagram_types["extra"] = DiagramType(backend="plantuml", description="Extra")
+    assert memo.get().data == ["class", "extra"]
+    diagram_types["extra"].backend = "mermaid"
+    memo.get()
+    assert memo.builds == 3
+
+def test_module_watcher_reloads_changed_module(tmp_path, monkeypatch):
+    """Test that a watched module is reloaded when its file changes."""
+    source = tmp_path / "watched_templates.py"
+    source.write_text("VALUE = 1\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    import watched_templates
+    
+    disabled = ModuleWatcher(watched_templates, interval=0)
+    watcher = ModuleWatcher(watched_templates, interval=0, enabled=True)
+    first = watcher.state()
+    source.write_text("VALUE = 2\n")
+    os.utime(source, (time.time() + 5, time.time() + 5))
+    
+    # Reloading is a development tool and off unless MCP_RESOURCE_RELOAD is set
+    assert not disabled.enabled
+    assert disabled.state() == first
+    assert watched_templates.VALUE == 1
+    assert watcher.state() != first
+    assert watched_templates.VALUE == 2
+
+def test_stdio_resource_etag():
+    """Test that the mock transport answers not_modified for a matching ETag."""
+    server = FastMCP("test")
+    server.resource("uml://templates")(get_resource_registry()["uml://templates"]["function"])
+    
+    response = server._handle_request({"type": "resource", "path": "uml://templates"})
+    # The result is sent as the JSON serialized when the resource was built
+    assert isinstance(response["result"], jsoncodec.RawJSON)
+    assert "class" in jsoncodec.loads(jsoncodec.dumps(response))["result"]
+    
+    again = server._handle_request({"type": "resource", "path": "uml://templates", "if_none_match": response["etag"]})
+    assert again == {"not_modified": True, "etag": response["etag"], "version": response["version"]}
+
+def test_payload_response_mismatch():
+    """Test that a stale ETag gets the full payload."""
+    memo = MemoizedResource("test", lambda: [1, 2], lambda: ())
+    response = payload_response(memo.get(), '"stale"')
+    assert jsoncodec.loads(jsoncodec.dumps_bytes([response]))[0]["result"] == [1, 2]
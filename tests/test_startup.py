@@ -0,0 +1,62 @@
+"""
+Tests for the lazy startup path of the MCP server entry point.
+"""
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks.startup import parse_importtime, top_imports, REPO_ROOT
+
+def _run(code):
+    env = dict(os.environ, MOCK_FASTMCP="true")
+    completed = subprocess.run(
+        [sys.executable, "-c", code], cwd=REPO_ROOT, env=env,
+        capture_output=True, text=True, timeout=60
+    )
+    assert completed.returncode == 0, completed.stderr
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def test_server_creation_skips_heavy_modules():
+    """Test that creating the server loads neither the HTTP client stack nor Rich."""
+    loaded = _run(
+        "import json, sys\n"
+        "from mcp_core.core.server import get_mcp_server\n"
+        "get_mcp_server()\n"
+        "print(json.dumps([m for m in ('httpx', 'httpcore', 'rich') if m in sys.modules]))"
+    )
+    assert loaded == []
+
+def test_kroki_client_created_on_first_access():
+    """Test that the Kroki client is created lazily and then reused."""
+    result = _run(
+        "import json\n"
+        "from mcp_core.core import utils\n"
+        "before = 'kroki_client' in vars(utils)\n"
+        "client = utils.kroki_client\n"
+        "print(json.dumps([before, utils.get_kroki_client() is client]))"
+    )
+    assert result == [False, True]
+
+def test_stdio_handshake():
+    """Test that the entry point answers a request over stdio."""
+    env = dict(os.environ, MOCK_FASTMCP="true")
+    completed = subprocess.run(
+        [sys.executable, os.path.join(REPO_ROOT, "mcp_server.py"), "--transport", "stdio"],
+        cwd=REPO_ROOT, env=env, input='{"type": "resource", "path": "uml://types"}\n',
+        capture_output=True, text=True, timeout=60
+    )
+    response = json.loads(completed.stdout.splitlines()[0])
+    assert "class" in response["result"]
+
+def test_parse_importtime():
+    """Test parsing of -X importtime output."""
+    stderr = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   zlib\n"
+        "import time:      3000 |       3500 | mcp_core.core.config\n"
+        "unrelated log line\n"
+    )
+    imports = parse_importtime(stderr)
+    assert imports == [("zlib", 120, 120), ("mcp_core.core.config", 3000, 3500)]
+    assert top_imports(imports, limit=1) == [{"module": "mcp_core.core.config", "self_ms": 3.0, "cumulative_ms": 3.5}]
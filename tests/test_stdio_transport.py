@@ -0,0 +1,69 @@
+"""
+Tests for the concurrent stdio transport.
+"""
+import asyncio
+import io
+import json
+import threading
+import time
+
+from mcp_core.server.stdio_transport import serve_stdio
+
+def run(handler, lines, max_workers=4):
+    stdin = io.StringIO("".join(line + "\n" for line in lines))
+    stdout = io.StringIO()
+    asyncio.run(serve_stdio(handler, stdin, stdout, max_workers=max_workers))
+    return [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+def test_slow_request_does_not_block_others():
+    """Test that responses are written in completion order with their ids."""
+    def handler(request):
+        time.sleep(request["delay"])
+        return {"result": request["delay"]}
+    
+    responses = run(handler, [
+        json.dumps({"id": "slow", "delay": 0.3}),
+        json.dumps({"id": "fast", "delay": 0.0}),
+    ])
+    assert [r["id"] for r in responses] == ["fast", "slow"]
+    assert responses[1] == {"id": "slow", "result": 0.3}
+
+def test_worker_pool_is_bounded():
+    """Test that no more than max_workers requests run at once."""
+    lock = threading.Lock()
+    active = [0]
+    peak = [0]
+    
+    def handler(request):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.02)
+        with lock:
+            active[0] -= 1
+        return {"result": request["id"]}
+    
+    responses = run(handler, [json.dumps({"id": i}) for i in range(12)], max_workers=3)
+    assert sorted(r["id"] for r in responses) == list(range(12))
+    assert peak[0] == 3
+
+def test_invalid_and_failing_requests():
+    """Test that bad input and handler errors produce error responses."""
+    def handler(request):
+        raise RuntimeError("boom")
+    
+    responses = run(handler, ["not json", "", json.dumps({"id": 7})])
+    assert responses[0]["error"].startswith("Invalid request")
+    assert responses[1] == {"id": 7, "error": "boom"}
+
+def test_unencodable_and_malformed_responses():
+    """Test that responses that cannot be sent are answered with an error carrying the id."""
+    def handler(request):
+        if request["id"] == "object":
+            return {"result": object()}
+        return ["not", "a", "dict"]
+    
+    responses = run(handler, [json.dumps({"id": "object"}), json.dumps({"id": "list"})])
+    by_id = {r["id"]: r for r in responses}
+    assert by_id["object"]["error"].startswith("Could not encode response")
+    assert "expected a response object" in by_id["list"]["error"]
@@ -0,0 +1,60 @@
+"""
+Tests for the SVG minifier.
+"""
+import xml.dom.minidom
+
+from mcp_core.core.svg_minify import minify_svg, minification_stats
+
+SAMPLE_SVG = b"""<?xml version="1.0" encoding="UTF-8" standalone="no"?>
+<svg xmlns="http://www.w3.org/2000/svg" width="120.123456px" viewBox="0 0   120.123456 50.5">
+  <!-- generated by PlantUML -->
+  <metadata><rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"/></metadata>
+  <g>
+    <rect height="36.2969" style="stroke:#181818;stroke-width:0.5;" width="86.0001" x="7" y="7.00004"/>
+    <path d="M1.0.5L2.25,3.9999"/>
+    <text x="14.0000" y="30.9951">Hello   <tspan>big</tspan> world</text>
+    <style>  .a { fill: red }  </style>
+  </g>
+<?plantuml 1.2023.10?>
+</svg>
+"""
+
+def test_minify_strips_comments_metadata_and_whitespace():
+    """Test that comments, metadata and insignificant whitespace are removed."""
+    result = minify_svg(SAMPLE_SVG).decode("utf-8")
+    
+    assert "<!--" not in result
+    assert "metadata" not in result
+    assert "<?plantuml" not in result
+    assert result.startswith('<?xml version="1.0"')
+    assert "\n" not in result
+    
+    # Output is still well-formed XML
+    xml.dom.minidom.parseString(result)
+
+def test_minify_rounds_geometry_only():
+    """Test that geometry attributes are rounded and other content is kept."""
+    result = minify_svg(SAMPLE_SVG, precision=2).decode("utf-8")
+    
+    assert 'width="120.12px"' in result
+    assert 'viewBox="0 0 120.12 50.5"' in result
+    assert 'y="7"' in result
+    # Adjacent numbers stay separated once a dot is dropped
+    assert 'd="M1 .5L2.25,4"' in result
+    # Style attributes and text content are preserved
+    assert "stroke-width:0.5;" in result
+    assert "Hello <tspan>big</tspan> world" in result
+    assert "<style>  .a { fill: red }  </style>" in result
+
+def test_minify_without_rounding():
+    """Test that rounding can be disabled."""
+    result = minify_svg(SAMPLE_SVG, precision=None).decode("utf-8")
+    assert 'height="36.2969"' in result
+
+def test_minification_stats():
+    """Test reported byte savings."""
+    minified = minify_svg(SAMPLE_SVG)
+    stats = minification_stats(SAMPLE_SVG, minified)
+    assert stats["original_bytes"] == len(SAMPLE_SVG)
+    assert stats["minified_bytes"] == len(minified)
+    assert stats["saved_bytes"] > 0
@@ -0,0 +1,199 @@
+"""
+Tests for the tool middleware pipeline.
+"""
+import threading
+import time
+import pytest
+
+from mcp_core.tools import middleware as mw
+from mcp_core.tools.middleware import (
+    wrap_tool,
+    configure_middleware,
+    ErrorNormalizationMiddleware,
+    TimingMiddleware,
+    CacheMiddleware,
+    BulkheadMiddleware,
+    DeadlineMiddleware,
+    TraceRecordingMiddleware
+)
+
+@pytest.fixture(autouse=True)
+def isolated_middleware():
+    """Run each test with an empty middleware configuration."""
+    saved = (list(mw._global_middleware), dict(mw._category_middleware), dict(mw._tool_middleware))
+    mw.clear_middleware()
+    yield
+    mw.clear_middleware()
+    mw._global_middleware.extend(saved[0])
+    mw._category_middleware.update(saved[1])
+    mw._tool_middleware.update(saved[2])
+
+def test_wrap_without_middleware_returns_function():
+    """Test that tools without middleware are registered unchanged."""
+    def tool(code: str):
+        return code
+    assert wrap_tool(tool, "tool", "default") is tool
+
+def test_chain_order_and_layers():
+    """Test that global, category and tool middleware compose in order."""
+    timing = TimingMiddleware()
+    cache = CacheMiddleware(ttl=60)
+    configure_middleware([ErrorNormalizationMiddleware()])
+    configure_middleware([cache], tool="render")
+    configure_middleware([timing], category="uml")
+    
+    calls = []
+    def render(code: str, output_dir: str = None):
+        """Render something."""
+        calls.append(code)
+        return {"code": code}
+    
+    wrapped = wrap_tool(render, "render", "uml")
+    assert wrapped.__mcp_middleware__ == ["ErrorNormalizationMiddleware", "TimingMiddleware", "CacheMiddleware"]
+    assert wrapped.__doc__ == "Render something."
+    
+    assert wrapped("a") == {"code": "a"}
+    assert wrapped(code="a") == {"code": "a"}
+    assert calls == ["a"]
+    assert cache.hits == 1
+    assert timing.stats()["render"]["calls"] == 2
+
+def test_error_normalization():
+    """Test that exceptions become structured error results."""
+    configure_middleware([ErrorNormalizationMiddleware()])
+    def broken():
+        raise ValueError("bad input")
+    
+    assert wrap_tool(broken, "broken", "default")() == {"error": "bad input", "error_type": "ValueError"}
+
+def test_cache_returns_copies_and_drops_missing_files(tmp_path):
+    """Test that cached results cannot be changed by callers and deleted files are re-rendered."""
+    configure_middleware([CacheMiddleware(ttl=60)])
+    path = tmp_path / "a.svg"
+    calls = []
+    def render(code: str):
+        calls.append(code)
+        path.write_text("<svg/>")
+        return {"code": code, "local_path": str(path)}
+    
+    wrapped = wrap_tool(render, "render", "uml")
+    first = wrapped("a")
+    first["trace_id"] = "abc"
+    second = wrapped("a")
+    assert second == {"code": "a", "local_path": str(path)}
+    second["timing"] = 1.0
+    assert "timing" not in wrapped("a")
+    assert calls == ["a"]
+    
+    path.unlink()
+    assert wrapped("a")["local_path"] == str(path)
+    assert calls == ["a", "a"]
+    assert path.exists()
+
+def test_bulkhead_limits_concurrency():
+    """Test that a full bulkhead rejects callers after the acquire timeout."""
+    configure_middleware([BulkheadMiddleware(max_concurrent=1, acquire_timeout=0.01)])
+    release = threading.Event()
+    def slow():
+        release.wait(5)
+        return "done"
+    
+    wrapped = wrap_tool(slow, "slow", "default")
+    worker = threading.Thread(target=wrapped)
+    worker.start()
+    time.sleep(0.05)
+    
+    assert wrapped()["error_type"] == "BulkheadFull"
+    release.set()
+    worker.join()
+
+def test_deadline():
+    """Test that calls exceeding their deadline return a timeout error."""
+    configure_middleware([DeadlineMiddleware(seconds=0.05)])
+    wrapped = wrap_tool(lambda: time.sleep(0.5), "sleepy", "default")
+    
+    assert wrapped()["error_type"] == "DeadlineExceeded"
+
+def test_bulkhead_holds_slot_past_deadline():
+    """Test that a call abandoned by its deadline keeps its bulkhead slot until the tool ends."""
+    bulkhead = BulkheadMiddleware(max_concurrent=1, acquire_timeout=0.01)
+    configure_middleware([bulkhead, DeadlineMiddleware(seconds=0.05)])
+    release = threading.Event()
+    wrapped = wrap_tool(lambda: release.wait(5), "stuck", "default")
+    
+    assert wrapped()["error_type"] == "DeadlineExceeded"
+    assert bulkhead.active == 1
+    assert wrapped()["error_type"] == "BulkheadFull"
+    release.set()
+    deadline = time.monotonic() + 5
+    while bulkhead.active and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert bulkhead.active == 0
+
+def test_bulkhead_resize():
+    """Test that growing the bulkhead admits waiting callers."""
+    bulkhead = BulkheadMiddleware(max_concurrent=1, acquire_timeout=5)
+    configure_middleware([bulkhead])
+    release = threading.Event()
+    wrapped = wrap_tool(lambda: release.wait(5) and "done", "slow", "default")
+    first = threading.Thread(target=wrapped)
+    first.start()
+    time.sleep(0.05)
+    
+    results = []
+    second = threading.Thread(target=lambda: results.append(wrapped()))
+    second.start()
+    time.sleep(0.05)
+    assert bulkhead.active == 1
+    bulkhead.resize(2)
+    time.sleep(0.05)
+    assert bulkhead.active == 2
+    release.set()
+    first.join()
+    second.join()
+    assert results == ["done"]
+
+def test_argument_validation():
+    """Test that arguments are validated and coerced before dispatch."""
+    from typing import Optional
+    from mcp_core.tools.validation import build_argument_model, DiagramTypeName
+    
+    def render(diagram_type: DiagramTypeName, scale: int, output_dir: Optional[str] = None):
+        return {"diagram_type": diagram_type, "scale": scale, "output_dir": output_dir}
+    
+    model = build_argument_model(render, "render")
+    wrapped = wrap_tool(render, "render", "default", model)
+    
+    assert wrapped("class", "2") == {"diagram_type": "class", "scale": 2, "output_dir": None}
+    
+    result = wrapped("nope", scale="big")
+    assert result["error_type"] == "ValidationError"
+    assert {detail["field"] for detail in result["details"]} == {"diagram_type", "scale"}
+    assert "Unsupported diagram type: nope" in result["error"]
+    
+    assert wrapped("class")["details"][0] == {"field": "scale", "message": "Field required", "type": "missing"}
+    assert wrapped("class", 1, colour="red")["error_type"] == "ValidationError"
+
+def test_trace_recording(tmp_path):
+    """Test that each call is appended to the trace file with its arguments and outcome."""
+    import json
+    trace_path = tmp_path / "trace.jsonl"
+    recorder = TraceRecordingMiddleware(str(trace_path))
+    configure_middleware([ErrorNormalizationMiddleware(), recorder])
+
+    def tool(code: str, fail: bool = False):
+        if fail:
+            raise ValueError("bad code")
+        return {"code": code}
+
+    wrapped = wrap_tool(tool, "tool", "default")
+    wrapped("A -> B")
+    wrapped("C", fail=True)
+    recorder.close()
+
+    records = [json.loads(line) for line in trace_path.read_text().splitlines()]
+    assert [(r["tool"], r["args"], r["ok"]) for r in records] == [
+        ("tool", {"code": "A -> B"}, True),
+        ("tool", {"code": "C", "fail": True}, False),
+    ]
+    assert all(r["elapsed_ms"] >= 0 and r["ts"] > 0 for r in records)
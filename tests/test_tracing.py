@@ -0,0 +1,186 @@
+"""
+Tests for request tracing spans.
+"""
+import json
+import os
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.testclient import TestClient as StarletteClient
+from unittest.mock import patch
+
+from benchmarks.kroki_stub import start_stub
+from benchmarks.otlp_collector import start_collector
+from mcp_core.core import tracing
+from mcp_core.core.config import MCP_SETTINGS
+
+INCOMING_TRACE = "4bf92f3577b34da6a3ce929d0e0e4736"
+INCOMING_SPAN = "00f067aa0ba902b7"
+INCOMING = f"00-{INCOMING_TRACE}-{INCOMING_SPAN}-01"
+
+
+@pytest.fixture
+def span_file(tmp_path, monkeypatch):
+    """Export spans to a JSONL file."""
+    path = tmp_path / "spans.jsonl"
+    monkeypatch.setattr(MCP_SETTINGS, "tracing_file", str(path))
+    monkeypatch.setattr(MCP_SETTINGS, "tracing_otlp_endpoint", "")
+    return path
+
+
+def read_spans(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_traceparent_parsing():
+    """Test that only valid W3C traceparent values are accepted."""
+    assert tracing.parse_traceparent(INCOMING) == (INCOMING_TRACE, INCOMING_SPAN)
+    assert tracing.parse_traceparent(INCOMING.upper()) == (INCOMING_TRACE, INCOMING_SPAN)
+    assert tracing.parse_traceparent(None) is None
+    assert tracing.parse_traceparent("00-abc-def-01") is None
+    assert tracing.parse_traceparent(f"00-{'0' * 32}-{INCOMING_SPAN}-01") is None
+    assert tracing.parse_traceparent(f"ff-{INCOMING_TRACE}-{INCOMING_SPAN}-01") is None
+
+
+def test_disabled_spans_record_nothing(monkeypatch):
+    """Test that spans are inert without an exporter."""
+    monkeypatch.setattr(MCP_SETTINGS, "tracing_file", "")
+    monkeypatch.setattr(MCP_SETTINGS, "tracing_otlp_endpoint", "")
+    with tracing.span("work") as span:
+        assert span is tracing.NON_RECORDING_SPAN
+        span.set_attribute("ignored", 1)
+        assert tracing.inject() == {}
+    assert tracing.current_span() is tracing.NON_RECORDING_SPAN
+
+
+def test_nested_spans_and_errors(span_file):
+    """Test parent links, propagation of an incoming traceparent and error status."""
+    with tracing.span("outer", kind="server", parent=INCOMING) as outer:
+        assert tracing.inject({"accept": "*/*"}) == {"accept": "*/*", "traceparent": outer.traceparent()}
+        with pytest.raises(ValueError):
+            with tracing.span("inner", size=3):
+                raise ValueError("bad input")
+
+    inner, outer = read_spans(span_file)
+    assert outer["trace_id"] == inner["trace_id"] == INCOMING_TRACE
+    assert outer["parent_id"] == INCOMING_SPAN
+    assert inner["parent_id"] == outer["span_id"]
+    assert outer["kind"] == "server" and outer["status"] == "ok"
+    assert inner["status"] == "error" and inner["error"] == "bad input"
+    assert inner["attributes"] == {"size": 3, "error.type": "ValueError"}
+    assert outer["duration_ms"] >= inner["duration_ms"]
+
+
+def test_tool_pipeline_spans(span_file, tmp_path, monkeypatch):
+    """Test the span chain from an MCP HTTP request down to Kroki and the file write."""
+    from mcp_core.core import utils
+    from mcp_core.server.fastmcp_wrapper import FastMCP
+    from mcp_core.server.http_transport import SESSION_HEADER, HTTPTransport
+    from mcp_core.tools.diagram_tools import register_diagram_tools
+
+    stub = start_stub()
+    monkeypatch.setattr(utils.get_kroki_client(), "base_url", stub.url)
+    server = FastMCP("test")
+    register_diagram_tools(server)
+    transport = HTTPTransport(server._handle_request, max_workers=2)
+    request = {"type": "tool", "tool": "generate_uml",
+               "args": {"diagram_type": "class", "code": "class A", "output_dir": str(tmp_path)}}
+    try:
+        with StarletteClient(transport.app) as client:
+            session_id = client.post("/mcp", json={"type": "initialize"}).headers[SESSION_HEADER]
+            response = client.post("/mcp", json=request,
+                                   headers={"traceparent": INCOMING, SESSION_HEADER: session_id}).json()
+    finally:
+        stub.shutdown()
+        stub.server_close()
+
+    assert response["trace_id"] == INCOMING_TRACE
+    assert os.path.exists(response["result"]["local_path"])
+    spans = {span["name"]: span for span in read_spans(span_file)}
+    chain = ["mcp tool generate_uml", "tool generate_uml", "generate_diagram", "kroki.render"]
+    assert spans[chain[0]]["parent_id"] == INCOMING_SPAN
+    for parent, child in zip(chain, chain[1:]):
+        assert spans[child]["parent_id"] == spans[parent]["span_id"]
+    assert spans["file.write"]["parent_id"] == spans["generate_diagram"]["span_id"]
+    assert {span["trace_id"] for span in spans.values()} == {INCOMING_TRACE}
+    assert spans["generate_diagram"]["attributes"]["diagram.type"] == "class"
+    assert spans["kroki.render"]["kind"] == "client"
+    assert spans["kroki.render"]["attributes"]["kroki.response_bytes"] > 0
+    # Kroki received the render span as the parent of its own work
+    assert stub.last_traceparent == f"00-{INCOMING_TRACE}-{spans['kroki.render']['span_id']}-01"
+
+
+def test_tool_error_result_marks_span(span_file):
+    """Test that tools returning an error result produce a failed span."""
+    from mcp_core.tools.middleware import ErrorNormalizationMiddleware, TracingMiddleware, ToolCall
+
+    def failing(_call):
+        raise RuntimeError("render failed")
+
+    call = ToolCall("generate_uml", "uml", {})
+    result = ErrorNormalizationMiddleware()(call, lambda c: TracingMiddleware()(c, failing))
+    assert result["error_type"] == "RuntimeError"
+    (span,) = read_spans(span_file)
+    assert span["name"] == "tool generate_uml"
+    assert span["status"] == "error" and span["error"] == "render failed"
+
+
+def test_otlp_export_to_collector(monkeypatch):
+    """Test that spans reach an OTLP/HTTP collector with their attributes."""
+    collector = start_collector()
+    monkeypatch.setattr(MCP_SETTINGS, "tracing_file", "")
+    monkeypatch.setattr(MCP_SETTINGS, "tracing_otlp_endpoint", collector.url)
+    try:
+        with tracing.span("request", kind="server", route="/generate_diagram") as root:
+            with tracing.span("kroki.render", kind="client", cached=False, bytes=512, ratio=0.5):
+                pass
+        tracing.flush()
+        spans = collector.spans(root.trace_id)
+    finally:
+        monkeypatch.setattr(MCP_SETTINGS, "tracing_otlp_endpoint", "")
+        tracing.get_exporters()
+        collector.shutdown()
+        collector.server_close()
+
+    render, request = spans
+    assert request["name"] == "request" and request["kind"] == "server" and request["parent_id"] is None
+    assert render["parent_id"] == request["span_id"]
+    assert render["attributes"] == {"cached": False, "bytes": 512, "ratio": 0.5}
+    assert render["service"] == MCP_SETTINGS.tracing_service_name
+
+
+def test_otlp_flush_waits_for_batches_in_flight(monkeypatch):
+    """Test that flush returns only after the batch taken off the queue has been sent."""
+    exporter = tracing.OtlpExporter("http://127.0.0.1:9", "test", interval=60)
+    sent = []
+
+    def slow_send(client, batch):
+        time.sleep(0.2)
+        sent.extend(batch)
+
+    monkeypatch.setattr(exporter, "_send", slow_send)
+    try:
+        exporter.export([tracing.Span("work", INCOMING_TRACE)])
+        assert exporter.flush()
+        assert [span.name for span in sent] == ["work"]
+    finally:
+        exporter.close()
+
+
+def test_app_route_continues_trace(span_file):
+    """Test that the HTTP API continues an incoming trace and returns the trace id."""
+    os.environ["TESTING"] = "true"
+    from app import app
+
+    result = {"url": "https://kroki.io/plantuml/svg/x", "local_path": "/tmp/diagrams/x.svg"}
+    payload = {"lang": "plantuml", "type": "class", "code": "@startuml\nclass A\n@enduml"}
+    with patch("app.generate_diagram", return_value=result):
+        response = TestClient(app).post("/generate_diagram", json=payload, headers={"traceparent": INCOMING})
+    assert response.status_code == 200
+    assert response.headers["x-trace-id"] == INCOMING_TRACE
+    (span,) = read_spans(span_file)
+    assert span["name"] == "POST /generate_diagram"
+    assert span["parent_id"] == INCOMING_SPAN
+    assert span["attributes"]["http.status_code"] == 200
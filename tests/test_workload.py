@@ -0,0 +1,89 @@
+"""
+Tests for the synthetic diagram workload generator
+"""
+
+import re
+
+import pytest
+
+from benchmarks.workload import KINDS, TOOLS, WorkloadSpec, generate, main
+
+
+@pytest.mark.parametrize("kind", list(KINDS))
+def test_generated_sources_are_reproducible(kind):
+    spec = WorkloadSpec(elements=30, nesting=2, seed=4)
+    assert generate(kind, spec) == generate(kind, spec)
+    assert generate(kind, spec) != generate(kind, spec, seed=5)
+    assert kind in TOOLS
+
+
+@pytest.mark.parametrize("kind", list(KINDS))
+def test_size_knobs_scale_sources(kind):
+    small, large = generate(kind, elements=10), generate(kind, elements=1000)
+    assert len(large) > 50 * len(small)
+    assert len(generate(kind, elements=100, label_length=60)) > len(generate(kind, elements=100, label_length=6))
+    assert len(generate(kind, elements=100, edge_density=4)) > len(generate(kind, elements=100, edge_density=0.5))
+
+
+def test_element_and_edge_counts():
+    """Test that element counts, edge density and connectivity follow the knobs."""
+    source = generate("graphviz", elements=50, edge_density=2.0, nesting=0)
+    nodes = re.findall(r"^\s+n(\d+) \[label=", source, re.M)
+    edges = re.findall(r"^\s+n(\d+) -> n(\d+)", source, re.M)
+    assert len(nodes) == 50 and len(edges) == 100
+    assert all(source_node != target for source_node, target in edges)
+    # The first elements - 1 edges form a spanning tree
+    reached = {0}
+    for source_node, target in edges[:49]:
+        assert int(source_node) in reached
+        reached.add(int(target))
+    assert len(reached) == 50
+
+    assert len(re.findall(r"^C\d+ ", generate("plantuml-class", elements=40, edge_density=0.25), re.M)) == 10
+    assert len(re.findall(r" -> P\d+ :", generate("plantuml-sequence", elements=40, edge_density=3), re.M)) == 120
+
+
+def test_nesting_and_labels():
+    """Test that nested groups are balanced and labels respect the length."""
+    for kind, opener, closer in (
+        ("plantuml-class", re.compile(r"\{$"), re.compile(r"^\s*\}$")),
+        ("graphviz", re.compile(r"\{$"), re.compile(r"^\s*\}$")),
+        ("mermaid", re.compile(r"^\s*subgraph "), re.compile(r"^\s*end$")),
+        ("plantuml-sequence", re.compile(r"^\s*group "), re.compile(r"^\s*end$")),
+    ):
+        lines = generate(kind, elements=60, nesting=3).splitlines()
+        depth = deepest = 0
+        for line in lines:
+            if opener.search(line):
+                depth += 1
+                deepest = max(deepest, depth)
+            elif closer.search(line):
+                depth -= 1
+            assert depth >= 0, kind
+        assert depth == 0, kind
+        assert deepest >= 3, kind
+
+    d2 = generate("d2", elements=60, nesting=3)
+    assert re.search(r"^group_\d\.group_\d_\d\.group_\d_\d_\d\.n\d+: ", d2, re.M)
+    assert "group_" not in generate("d2", elements=60, nesting=0)
+
+    labels = re.findall(r'label="([^"]*)"', generate("graphviz", elements=50, label_length=7))
+    assert labels and all(0 < len(label) <= 7 for label in labels)
+    assert all(re.fullmatch(r"[a-z ]+", label) for label in labels)
+
+
+def test_erd_entities_and_relationships():
+    source = generate("erd", elements=8, edge_density=1.0)
+    assert len(re.findall(r"^\[E\d+\]", source, re.M)) == 8
+    assert len(re.findall(r"^E\d+ [1?*+]--[1?*+] E\d+", source, re.M)) == 8
+    assert len(re.findall(r"^\*\w+$", source, re.M)) == 8
+
+
+def test_cli_writes_files(tmp_path, capsys):
+    assert main(["--kind", "all", "--elements", "5", "--out", str(tmp_path)]) == 0
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "d2.d2", "erd.er", "graphviz.dot", "mermaid.mmd", "plantuml-class.puml", "plantuml-sequence.puml",
+    ]
+    assert (tmp_path / "graphviz.dot").read_text().startswith("digraph G {")
+    with pytest.raises(SystemExit):
+        main(["--kind", "nosuch"])